@@ -0,0 +1,197 @@
+
+import re
+import struct
+
+from .exceptions import ELFParseError
+from .streams import BufferStream
+
+
+_NUL = re.compile(b'\x00')
+
+
+def _make_structs(byte_order):
+    return dict((size, struct.Struct(byte_order + fmt))
+                for size, fmt in ((2, 'H'), (4, 'I'), (8, 'Q'),
+                                  (-1, 'b'), (-2, 'h'), (-4, 'i'), (-8, 'q')))
+
+_STRUCTS = {True: _make_structs('<'), False: _make_structs('>')}
+
+
+def decode_uleb128(data, offset):
+    """ Decode the unsigned LEB128 number at |offset| in the bytes-like
+        |data|. Return (value, offset after the number). Raise IndexError if
+        data ends first.
+    """
+    byte = data[offset]
+    offset += 1
+    if byte < 0x80:
+        return byte, offset
+    value = byte & 0x7F
+    shift = 7
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+def decode_sleb128(data, offset):
+    """ Decode the signed LEB128 number at |offset| in the bytes-like |data|.
+        Return (value, offset after the number). Raise IndexError if data
+        ends first.
+    """
+    byte = data[offset]
+    if byte < 0x80:
+        return (byte - 0x80 if byte & 0x40 else byte), offset + 1
+    value, end = decode_uleb128(data, offset)
+    if data[end - 1] & 0x40:
+        # negative -> sign extend
+        value |= -(1 << (7 * (end - offset)))
+    return value, end
+
+
+class BufferReader(object):
+    """ Reads numbers and strings from a buffer held in memory, at an offset
+        that moves forward past each value read. This is how the DWARF
+        parsers read their sections, instead of a seek and a read on a stream
+        for every field.
+
+        data:
+            The buffer, any bytes-like object
+
+        offset:
+            The position of the next read. It can be assigned to move around.
+
+        little_endian:
+            Byte order of the multi-byte numbers
+
+        Reading past the end of data raises ELFParseError, like struct_parse
+        does.
+    """
+    def __init__(self, data, offset=0, little_endian=True):
+        self.data = data
+        self.offset = offset
+        self.little_endian = little_endian
+        # Keyed by size, negative for signed numbers
+        self._structs = structs = _STRUCTS[little_endian]
+        self._u16 = structs[2]
+        self._u32 = structs[4]
+        self._u64 = structs[8]
+
+    @classmethod
+    def from_stream(cls, stream, offset=0, little_endian=True):
+        """ Create a BufferReader over the whole contents of |stream|. The
+            buffer of an io.BytesIO is used in place; other streams are read
+            into memory (see stream_contents).
+        """
+        return cls(stream_contents(stream), offset, little_endian)
+
+    def u8(self):
+        offset = self.offset
+        try:
+            value = self.data[offset]
+        except IndexError:
+            raise self._error(1)
+        self.offset = offset + 1
+        return value
+
+    def u16(self):
+        return self._unpack(self._u16)
+
+    def u32(self):
+        return self._unpack(self._u32)
+
+    def u64(self):
+        return self._unpack(self._u64)
+
+    def uint(self, size):
+        """ Read an unsigned number of |size| bytes (1, 2, 4 or 8)
+        """
+        if size == 1:
+            return self.u8()
+        return self._unpack(self._structs[size])
+
+    def sint(self, size):
+        """ Read a signed number of |size| bytes (1, 2, 4 or 8)
+        """
+        return self._unpack(self._structs[-size])
+
+    def uleb(self):
+        """ Read an unsigned LEB128 number
+        """
+        try:
+            value, self.offset = decode_uleb128(self.data, self.offset)
+        except IndexError:
+            raise self._error('LEB128')
+        return value
+
+    def sleb(self):
+        """ Read a signed LEB128 number
+        """
+        try:
+            value, self.offset = decode_sleb128(self.data, self.offset)
+        except IndexError:
+            raise self._error('LEB128')
+        return value
+
+    def cstring(self):
+        """ Read a NUL-terminated string; return its bytes without the NUL
+        """
+        data = self.data
+        offset = self.offset
+        if isinstance(data, bytes):
+            end = data.find(b'\x00', offset)
+        else:
+            match = _NUL.search(data, offset)
+            end = match.start() if match else -1
+        if end < 0:
+            raise self._error('string')
+        self.offset = end + 1
+        return bytes(data[offset:end])
+
+    def read(self, size):
+        """ Read |size| bytes
+        """
+        offset = self.offset
+        if size < 0 or offset + size > len(self.data):
+            raise self._error(size)
+        self.offset = offset + size
+        return bytes(self.data[offset:offset + size])
+
+    def at_end(self):
+        """ Whether the offset reached the end of data
+        """
+        return self.offset >= len(self.data)
+
+    #------ PRIVATE ------#
+
+    def _unpack(self, fields):
+        offset = self.offset
+        try:
+            value, = fields.unpack_from(self.data, offset)
+        except struct.error:
+            raise self._error(fields.size)
+        self.offset = offset + fields.size
+        return value
+
+    def _error(self, what):
+        return ELFParseError('expected %s %s at offset %#x, data ends first' % (
+            what, 'bytes' if isinstance(what, int) else 'value', self.offset))
+
+
+def stream_contents(stream):
+    """ Get the whole contents of |stream| as a bytes-like object, without
+        copying when the stream is an io.BytesIO or a BufferStream
+    """
+    if isinstance(stream, BufferStream):
+        return stream.buffer
+    getvalue = getattr(stream, 'getvalue', None)
+    if getvalue is not None:
+        return getvalue()
+    pos = stream.tell()
+    stream.seek(0)
+    data = stream.read()
+    stream.seek(pos)
+    return data
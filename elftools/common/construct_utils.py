@@ -1,8 +1,9 @@
 
 from ..construct import (
-    Subconstruct, ConstructError, ArrayError, Adapter, Field, RepeatUntil,
-    Rename, SizeofError, Construct
+    Subconstruct, ConstructError, ArrayError, FieldError, SizeofError,
+    Construct
     )
+from .bufferreader import decode_uleb128, decode_sleb128
 
 
 class RepeatUntilExcluding(Subconstruct):
@@ -34,48 +35,44 @@ class RepeatUntilExcluding(Subconstruct):
         raise SizeofError("can't calculate size")
 
 
-def _LEB128_reader():
-    """ Read LEB128 variable-length data from the stream. The data is terminated
-        by a byte with 0 in its highest bit.
+class _LEB128(Construct):
+    """ A LEB128 variable-length number, read from the stream up to the byte
+        with 0 in its highest bit and decoded with |decoder|, one of the
+        bufferreader decode_*leb128 functions.
     """
-    return RepeatUntil(
-                lambda obj, ctx: ord(obj) < 0x80,
-                Field(None, 1))
-
-
-class _ULEB128Adapter(Adapter):
-    """ An adapter for ULEB128, given a sequence of bytes in a sub-construct.
-    """
-    def _decode(self, obj, context):
-        value = 0
-        for b in reversed(obj):
-            value = (value << 7) + (ord(b) & 0x7F)
-        return value
-
-
-class _SLEB128Adapter(Adapter):
-    """ An adapter for SLEB128, given a sequence of bytes in a sub-construct.
-    """
-    def _decode(self, obj, context):
-        value = 0
-        for b in reversed(obj):
-            value = (value << 7) + (ord(b) & 0x7F)
-        if ord(obj[-1]) & 0x40:
-            # negative -> sign extend
-            value |= - (1 << (7 * len(obj)))
-        return value
+    __slots__ = ["decoder"]
+    def __init__(self, name, decoder):
+        Construct.__init__(self, name)
+        self.decoder = decoder
+        self._set_flag(self.FLAG_DYNAMIC)
+    def _parse(self, stream, context):
+        data = stream.read(1)
+        # Most numbers fit in a single byte
+        while data[-1:] >= b'\x80':
+            byte = stream.read(1)
+            if not byte:
+                break
+            data += byte
+        try:
+            return self.decoder(data, 0)[0]
+        except IndexError:
+            raise FieldError("expected LEB128 value, stream ends first")
+    def _build(self, obj, stream, context):
+        raise NotImplementedError('no building')
+    def _sizeof(self, context):
+        raise SizeofError("can't calculate size")
 
 
 def ULEB128(name):
     """ A construct creator for ULEB128 encoding.
     """
-    return Rename(name, _ULEB128Adapter(_LEB128_reader()))
+    return _LEB128(name, decode_uleb128)
 
 
 def SLEB128(name):
     """ A construct creator for SLEB128 encoding.
     """
-    return Rename(name, _SLEB128Adapter(_LEB128_reader()))
+    return _LEB128(name, decode_sleb128)
 
 class StreamOffset(Construct):
     """
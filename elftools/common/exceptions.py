@@ -1,4 +1,5 @@
 
+class ELFError(Exception):
     pass
 
 class ELFRelocationError(ELFError):
@@ -0,0 +1,138 @@
+
+import io
+import mmap
+
+
+class BufferStream(object):
+    """ A read-only, seekable binary stream over a bytes-like buffer.
+
+        Behaves like a BytesIO for the purposes of the parsers (read, seek,
+        tell), but never copies the underlying buffer. Besides the regular
+        stream interface, view(offset, size) hands out memoryview slices of
+        the buffer, which is what makes zero-copy section and segment data
+        possible.
+    """
+    def __init__(self, buffer):
+        self._buffer = memoryview(buffer).cast('B')
+        self._size = len(self._buffer)
+        self._pos = 0
+
+    @property
+    def buffer(self):
+        """ A memoryview of the whole underlying buffer
+        """
+        return self._buffer
+
+    def view(self, offset, size):
+        """ Return a memoryview slice of |size| bytes starting at |offset|.
+            Like read(), the slice is truncated at the end of the buffer.
+        """
+        return self._buffer[offset:offset + size]
+
+    def read(self, size=-1):
+        start = self._pos
+        if size is None or size < 0:
+            end = self._size
+        else:
+            end = min(start + size, self._size)
+        if end <= start:
+            return b''
+        self._pos = end
+        return self._buffer[start:end].tobytes()
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == io.SEEK_END:
+            pos = self._size + offset
+        else:
+            raise ValueError('invalid whence (%r)' % whence)
+        if pos < 0:
+            raise ValueError('negative seek position %r' % pos)
+        self._pos = pos
+        return pos
+
+    def tell(self):
+        return self._pos
+
+    def seekable(self):
+        return True
+
+    def readable(self):
+        return True
+
+    def close(self):
+        self._buffer.release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+
+
+class MappedFileStream(BufferStream):
+    """ A BufferStream backed by a read-only memory mapping of a file.
+
+        Pages are brought in by the OS on demand, so opening a multi-gigabyte
+        file costs neither a read of the whole file nor the memory to hold
+        it.
+    """
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0,
+                                   access=mmap.ACCESS_READ)
+        except:
+            self._file.close()
+            raise
+        super(MappedFileStream, self).__init__(self._mmap)
+
+    def close(self):
+        super(MappedFileStream, self).close()
+        try:
+            self._mmap.close()
+        except BufferError:
+            # Section data handed out by view() is still referenced somewhere;
+            # the mapping goes away when the last of those views does.
+            pass
+        self._file.close()
+
+
+class LazyStream(object):
+    """ A stream whose contents are only produced when it's first used.
+
+        loader is a function returning the actual stream; it is called on the
+        first access to any stream method or attribute, and every access is
+        then forwarded to the stream it returned.
+    """
+    def __init__(self, loader):
+        self._loader = loader
+        self._stream = None
+
+    @property
+    def loaded(self):
+        """ Whether the underlying stream was produced yet
+        """
+        return self._stream is not None
+
+    def load(self):
+        """ Produce the underlying stream if that wasn't done yet, and return
+            it
+        """
+        if self._stream is None:
+            self._stream = self._loader()
+            self._loader = None
+            # Shortcut the methods parsers call all the time
+            self.read = self._stream.read
+            self.seek = self._stream.seek
+            self.tell = self._stream.tell
+        return self._stream
+
+    def __getattr__(self, name):
+        # Only called for attributes not found on the LazyStream itself
+        if name.startswith('__') or name in ('_loader', '_stream'):
+            raise AttributeError(name)
+        return getattr(self.load(), name)
@@ -0,0 +1,75 @@
+
+import re
+
+
+_NUL = re.compile(b'\x00')
+
+
+class StringTable(object):
+    """ A table of NUL-terminated strings held in memory, looked up by
+        offset.
+
+        data:
+            The table contents, any bytes-like object. A memoryview (for
+            example a slice of a memory-mapped file) is searched in place,
+            without copying.
+
+        encoding, errors:
+            How get_string() decodes strings
+
+        fallback:
+            Optional function called with an offset for which no complete
+            string was found in data (the offset is past the end, or the
+            string isn't terminated within the table). It should return the
+            bytes of the string or None.
+
+        maxsize:
+            How many decoded strings get_string() remembers at most, by
+            offset. The memo is emptied when it is full. 0 disables it.
+    """
+    def __init__(self, data, encoding='utf-8', errors='strict', fallback=None,
+                 maxsize=4096):
+        self._data = data
+        if isinstance(data, (bytes, bytearray)):
+            self._find_nul = lambda offset: data.find(b'\x00', offset)
+        else:
+            search = _NUL.search
+            def find_nul(offset):
+                match = search(data, offset)
+                return match.start() if match else -1
+            self._find_nul = find_nul
+        self._size = len(data)
+        self._encoding = encoding
+        self._errors = errors
+        self._fallback = fallback
+        self._strings = {} if maxsize else None
+        self._maxsize = maxsize
+
+    def get_bytes(self, offset):
+        """ Get the string at |offset| as bytes, without the terminating NUL.
+            Return None if there is no such string.
+        """
+        if 0 <= offset < self._size:
+            end = self._find_nul(offset)
+            if end >= 0:
+                return bytes(self._data[offset:end])
+        if self._fallback is not None:
+            return self._fallback(offset)
+        return None
+
+    def get_string(self, offset):
+        """ Get the string at |offset|, decoded. Missing and empty strings
+            are both returned as ''.
+        """
+        strings = self._strings
+        if strings is not None:
+            string = strings.get(offset)
+            if string is not None:
+                return string
+        s = self.get_bytes(offset)
+        string = s.decode(self._encoding, self._errors) if s else ''
+        if strings is not None:
+            if len(strings) >= self._maxsize:
+                strings.clear()
+            strings[offset] = string
+        return string
@@ -2,6 +2,7 @@
 from contextlib import contextmanager
 from .exceptions import ELFParseError, ELFError, DWARFError
 from ..construct import ConstructError, ULInt8
+from .streams import BufferStream
 import os
 
 
@@ -85,6 +86,16 @@ def read_blob(stream, length):
     """
     return [struct_parse(ULInt8(''), stream) for i in range(length)]
 
+def read_stream_data(stream, offset, size):
+    """ Read |size| bytes at |offset| in stream. For buffer-backed streams
+        (see BufferStream) this returns a memoryview slice of the buffer
+        instead of copying.
+    """
+    if isinstance(stream, BufferStream):
+        return stream.view(offset, size)
+    stream.seek(offset)
+    return stream.read(size)
+
 def save_dwarf_section(section, filename):
     """Debug helper: dump section contents into a file
     Section is expected to be one of the debug_xxx_sec elements of DWARFInfo
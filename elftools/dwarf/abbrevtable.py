@@ -1,5 +1,9 @@
 
-from ..common.utils import struct_parse, dwarf_assert
+from ..common.utils import dwarf_assert
+from ..common.bufferreader import BufferReader
+from ..common.exceptions import ELFParseError
+from ..construct.lib.container import Container
+from .attrdecoder import make_attr_decoder
 
 
 class AbbrevTable(object):
@@ -29,19 +33,44 @@ class AbbrevTable(object):
         return self._abbrev_map[code]
 
     def _parse_abbrev_table(self):
-        """ Parse the abbrev table from the stream
+        """ Parse the abbrev table from the stream. The declarations are
+            Containers laid out like structs.Dwarf_abbrev_declaration.
         """
         map = {}
-        self.stream.seek(self.offset)
+        # Unknown tags, attribute names and forms are kept as numbers, like
+        # the Enums of Dwarf_abbrev_declaration do
+        tag_names, children_names, at_names, form_names = \
+            self.structs.Dwarf_abbrev_names
+        reader = BufferReader.from_stream(
+            self.stream, self.offset, self.structs.little_endian)
         while True:
-            decl_code = struct_parse(
-                struct=self.structs.Dwarf_uleb128(''),
-                stream=self.stream)
+            decl_code = reader.uleb()
             if decl_code == 0:
                 break
-            declaration = struct_parse(
-                struct=self.structs.Dwarf_abbrev_declaration,
-                stream=self.stream)
+            tag = reader.uleb()
+            children_flag = reader.u8()
+            if children_flag not in children_names:
+                raise ELFParseError(
+                    'no decoding mapping for %r [children_flag]' % (
+                        children_flag,))
+            attr_spec = []
+            while True:
+                name = reader.uleb()
+                form = reader.uleb()
+                if name == 0 and form == 0:
+                    break
+                form = form_names.get(form, form)
+                value = None
+                if form == 'DW_FORM_implicit_const':
+                    value = reader.sleb()
+                attr_spec.append(Container(
+                    name=at_names.get(name, name),
+                    form=form,
+                    value=value))
+            declaration = Container(
+                tag=tag_names.get(tag, tag),
+                children_flag=children_names[children_flag],
+                attr_spec=attr_spec)
             map[decl_code] = AbbrevDecl(decl_code, declaration)
         return map
 
@@ -51,15 +80,60 @@ class AbbrevDecl(object):
         dict-like access, and adding some convenience methods.
 
         The abbreviation declaration represents an "entry" that points to it.
+
+        tag:
+            The tag of the entries using this declaration
+
+        attr_names, attr_forms:
+            Tuples with the name and form of each attribute specification, in
+            order. DIEs using this declaration share them.
+
+        attr_index:
+            Maps each attribute name to its position in attr_names (the last
+            one, should a name appear twice). Iterating it yields the names
+            without duplicates, in the order they first appear.
     """
     def __init__(self, code, decl):
         self.code = code
         self.decl = decl
+        self.tag = decl['tag']
+        self._has_children = decl['children_flag'] == 'DW_CHILDREN_yes'
+        self.attr_names = tuple(spec.name for spec in decl['attr_spec'])
+        self.attr_forms = tuple(spec.form for spec in decl['attr_spec'])
+        self.attr_index = {}
+        for i, name in enumerate(self.attr_names):
+            self.attr_index[name] = i
+        # The decoders by layout of the DWARFStructs they were made for
+        # (see _get_layout): all the CUs sharing this declaration with the
+        # same layout use the same decoder
+        self._decoders = {}
 
     def has_children(self):
         """ Does the entry have children?
         """
-        return self['children_flag'] == 'DW_CHILDREN_yes'
+        return self._has_children
+
+    def get_decoder(self, structs):
+        """ Get the AttrDecoder for the attribute values of entries using
+            this declaration, in data described by |structs| (a
+            DWARFStructs), or None if there can't be one (see
+            make_attr_decoder). It's compiled on first use.
+        """
+        layout = _get_layout(structs)
+        try:
+            return self._decoders[layout]
+        except KeyError:
+            decoder = make_attr_decoder(self['attr_spec'], structs)
+            self._decoders[layout] = decoder
+            return decoder
+
+    def get_fixed_size(self, structs):
+        """ Get the size in bytes of the attribute values of entries using
+            this declaration if all of them have the same (see
+            AttrDecoder.fixed_size), in data described by |structs|, or None
+        """
+        decoder = self.get_decoder(structs)
+        return decoder.fixed_size if decoder is not None else None
 
     def iter_attr_specs(self):
         """ Iterate over the attribute specifications for the entry. Yield
@@ -70,3 +144,11 @@ class AbbrevDecl(object):
 
     def __getitem__(self, entry):
         return self.decl[entry]
+
+
+def _get_layout(structs):
+    """ The parameters of |structs| that the layout of the data it describes
+        depends on
+    """
+    return (structs.little_endian, structs.dwarf_format, structs.address_size,
+            structs.dwarf_version)
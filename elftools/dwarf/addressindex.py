@@ -0,0 +1,138 @@
+
+from array import array
+from bisect import bisect_right
+import heapq
+
+from .dwarf_util import _get_DIE_ranges
+
+
+# The DIEs of the code scopes in the index, and those that are frames
+_SCOPE_TAGS = frozenset((
+    'DW_TAG_subprogram', 'DW_TAG_inlined_subroutine', 'DW_TAG_lexical_block'))
+_FRAME_TAGS = frozenset(('DW_TAG_subprogram', 'DW_TAG_inlined_subroutine'))
+
+
+class AddressIndex(object):
+    """ Maps addresses to the DIEs of the code scopes covering them, across
+        all CUs: subprograms, inlined subroutines and lexical blocks, from
+        their DW_AT_low_pc/DW_AT_high_pc or DW_AT_ranges attributes. Create
+        it with DWARFInfo.get_address_index().
+
+        The address space is cut into segments where the same scopes are
+        active. Each segment holds its innermost scope; the enclosing ones
+        are found by following the parent links of the scopes, so a lookup
+        is a binary search on the segments.
+    """
+    def __init__(self, dwarfinfo):
+        self.dwarfinfo = dwarfinfo
+
+        # The scopes: their DIEs and the number of their enclosing scope
+        # (-1 for none)
+        self._dies = []
+        self._parents = array('l')
+
+        # The segments: start addresses, end addresses and innermost scopes,
+        # sorted by address. There are no segments for the gaps.
+        self._starts = array('Q')
+        self._ends = array('Q')
+        self._scopes = array('l')
+
+        self._build()
+
+    def scopes_at(self, address):
+        """ Get the list of the DIEs of the scopes covering |address|,
+            innermost first: the lexical blocks and inlined subroutines down
+            to the subprogram. The list is empty if no scope covers it.
+        """
+        i = bisect_right(self._starts, address) - 1
+        if i < 0 or address >= self._ends[i]:
+            return []
+        dies = []
+        scope = self._scopes[i]
+        while scope >= 0:
+            dies.append(self._dies[scope])
+            scope = self._parents[scope]
+        return dies
+
+    def frames_at(self, address):
+        """ Get the list of the DIEs of the frames at |address|, innermost
+            first: the DW_TAG_inlined_subroutine DIEs of the inline chain,
+            then the DW_TAG_subprogram of the function they are inlined in.
+            The list is empty if no function covers it.
+        """
+        return [die for die in self.scopes_at(address)
+                if die.tag in _FRAME_TAGS]
+
+    #------ PRIVATE ------#
+
+    def _build(self):
+        """ Collect the address ranges of all the scopes, then cut them into
+            segments
+        """
+        range_lists = self.dwarfinfo.range_lists()
+        # (begin, end, depth, scope number) of the ranges
+        ranges = []
+        for cu in self.dwarfinfo.iter_CUs():
+            low_pc = cu.get_top_DIE().attributes.get('DW_AT_low_pc')
+            base_address = low_pc.value if low_pc is not None else 0
+            # Ranges running past the end of the address space, like those
+            # of the code the linker discarded and moved to address -1, are
+            # left out (their end wouldn't fit in self._ends either)
+            address_limit = 1 << (8 * cu['address_size'])
+
+            # The scopes enclosing the current DIE: (depth, scope number)
+            stack = []
+            for die, depth in cu.iter_DIEs(with_depth=True, tags=_SCOPE_TAGS):
+                while stack and stack[-1][0] >= depth:
+                    stack.pop()
+                die_ranges = _get_DIE_ranges(die, range_lists, base_address)
+                if not die_ranges:
+                    # Abstract instances and declarations have no code
+                    continue
+                scope = len(self._dies)
+                self._dies.append(die)
+                # A subprogram nested in another one (in a local class, say)
+                # is a function of its own, not part of its parent's code
+                if stack and die.tag != 'DW_TAG_subprogram':
+                    self._parents.append(stack[-1][1])
+                else:
+                    self._parents.append(-1)
+                stack.append((depth, scope))
+                for begin, end in die_ranges:
+                    if begin < end < address_limit:
+                        ranges.append((begin, end, depth, scope))
+        self._make_segments(ranges)
+
+    def _make_segments(self, ranges):
+        """ Sweep the boundaries of |ranges|, finding the innermost scope
+            active between each pair. When scopes overlap without nesting,
+            the deepest one wins, then the one starting last.
+        """
+        ranges.sort()
+        boundaries = sorted(set([begin for begin, _, _, _ in ranges] +
+                                [end for _, end, _, _ in ranges]))
+        # The active ranges by their index in ranges, and a heap of their
+        # (end, index) to retire them
+        active = {}
+        ending = []
+        next_range = 0
+        for start, end in zip(boundaries, boundaries[1:]):
+            while ending and ending[0][0] <= start:
+                del active[heapq.heappop(ending)[1]]
+            while next_range < len(ranges) and \
+                    ranges[next_range][0] <= start:
+                begin, range_end, depth, scope = ranges[next_range]
+                active[next_range] = (depth, begin, scope)
+                heapq.heappush(ending, (range_end, next_range))
+                next_range += 1
+            if not active:
+                continue
+
+            scope = max(active.values())[2]
+            if self._ends and self._ends[-1] == start and \
+                    self._scopes[-1] == scope:
+                self._ends[-1] = end
+            else:
+                self._starts.append(start)
+                self._ends.append(end)
+                self._scopes.append(scope)
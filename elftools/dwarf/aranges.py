@@ -1,6 +1,7 @@
 
 from collections import namedtuple
 from ..common.utils import struct_parse
+from ..common.bufferreader import BufferReader
 from bisect import bisect_right
 import math
 
@@ -59,20 +60,21 @@ class ARanges(object):
         self.stream.seek(0)
         entries = []
         offset = 0
+        reader = BufferReader.from_stream(
+            self.stream, little_endian=self.structs.little_endian)
 
         # one loop == one "set" == one CU
         while offset < self.size :
             aranges_header = struct_parse(self.structs.Dwarf_aranges_header,
                 self.stream, offset)
-            addr_size = self._get_addr_size_struct(aranges_header["address_size"])
+            addr_size = self._get_addr_size(aranges_header["address_size"])
 
             # No segmentation
             if aranges_header["segment_size"] == 0:
                 # pad to nearest multiple of tuple size
                 tuple_size = aranges_header["address_size"] * 2
                 fp = self.stream.tell()
-                seek_to = int(math.ceil(fp/float(tuple_size)) * tuple_size)
-                self.stream.seek(seek_to)
+                reader.offset = int(math.ceil(fp/float(tuple_size)) * tuple_size)
 
                 # We now have a binary with empty arange sections - nothing but a NULL entry.
                 # To keep compatibility with readelf, we need to return those.
@@ -80,8 +82,8 @@ class ARanges(object):
                 got_entries = False
 
                 # entries in this set/CU
-                addr = struct_parse(addr_size('addr'), self.stream)
-                length = struct_parse(addr_size('length'), self.stream)
+                addr = reader.uint(addr_size)
+                length = reader.uint(addr_size)
                 while addr != 0 or length != 0 or (not got_entries and need_empty):
                     # 'begin_addr length info_offset version address_size segment_size'
                     entries.append(
@@ -94,8 +96,8 @@ class ARanges(object):
                             segment_size=aranges_header["segment_size"]))
                     got_entries = True
                     if addr != 0 or length != 0:
-                        addr = struct_parse(addr_size('addr'), self.stream)
-                        length = struct_parse(addr_size('length'), self.stream)
+                        addr = reader.uint(addr_size)
+                        length = reader.uint(addr_size)
                     
             # Segmentation exists in executable
             elif aranges_header["segment_size"] != 0:
@@ -107,12 +109,9 @@ class ARanges(object):
 
         return entries
 
-    def _get_addr_size_struct(self, addr_header_value):
+    def _get_addr_size(self, addr_header_value):
         """ Given this set's header value (int) for the address size,
-            get the Construct representation of that size
+            check it's a supported size and return it
         """
-        if addr_header_value == 4:
-            return self.structs.Dwarf_uint32
-        else:
-            assert addr_header_value == 8
-            return self.structs.Dwarf_uint64
+        assert addr_header_value in (4, 8)
+        return addr_header_value
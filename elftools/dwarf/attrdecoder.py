@@ -0,0 +1,212 @@
+
+import struct
+
+from ..common.bufferreader import decode_uleb128, decode_sleb128
+from ..construct import FormatField
+
+
+# Forms whose values DIE._translate_attr_value may turn into something other
+# than the raw value
+TRANSLATED_FORMS = frozenset((
+    'DW_FORM_strp', 'DW_FORM_line_strp', 'DW_FORM_GNU_strp_alt',
+    'DW_FORM_strp_sup', 'DW_FORM_flag', 'DW_FORM_flag_present',
+    'DW_FORM_indirect', 'DW_FORM_addrx', 'DW_FORM_addrx1', 'DW_FORM_addrx2',
+    'DW_FORM_addrx3', 'DW_FORM_addrx4', 'DW_FORM_strx', 'DW_FORM_strx1',
+    'DW_FORM_strx2', 'DW_FORM_strx3', 'DW_FORM_strx4', 'DW_FORM_loclistx',
+    'DW_FORM_rnglistx'))
+
+_ULEB128_FORMS = frozenset((
+    'DW_FORM_udata', 'DW_FORM_ref_udata', 'DW_FORM_addrx', 'DW_FORM_loclistx',
+    'DW_FORM_rnglistx'))
+
+# Block forms, with the struct format of their length (None for ULEB128)
+_BLOCK_FORMS = {
+    'DW_FORM_block1': 'B',
+    'DW_FORM_block2': 'H',
+    'DW_FORM_block4': 'I',
+    'DW_FORM_block': None,
+    'DW_FORM_exprloc': None,
+}
+
+# Operations of a decoder
+_FIXED, _CONST, _ULEB128, _SLEB128, _CSTRING, _BLOCK, _DATA16 = range(7)
+
+
+def make_attr_decoder(attr_specs, structs):
+    """ Create an AttrDecoder for a list of attribute specifications (of an
+        abbreviation declaration), for data described by |structs| (a
+        DWARFStructs). Return None if one of the forms can't be decoded by an
+        AttrDecoder (DW_FORM_indirect, for one); such values have to be
+        parsed from the stream with structs.Dwarf_dw_form.
+    """
+    byte_order = '<' if structs.little_endian else '>'
+    ops = []
+    translated = []
+    # Pending run of fixed size values: struct format and relative offsets
+    run_format = ''
+    run_offsets = []
+
+    def flush_run():
+        if run_format:
+            ops.append((_FIXED, (struct.Struct(byte_order + run_format),
+                                 tuple(run_offsets))))
+            del run_offsets[:]
+        return ''
+
+    for i, spec in enumerate(attr_specs):
+        form = spec.form
+        if form == 'DW_FORM_indirect':
+            return None
+        if form in TRANSLATED_FORMS:
+            translated.append(i)
+
+        if form == 'DW_FORM_implicit_const':
+            run_format = flush_run()
+            ops.append((_CONST, spec.value))
+            continue
+
+        field = structs.Dwarf_dw_form.get(form)
+        if field is None:
+            return None
+        if isinstance(field, FormatField):
+            # Dwarf_dw_form has the authoritative size of each form
+            run_offsets.append(struct.calcsize(byte_order + run_format))
+            run_format += field.packer.format[-1:]
+            continue
+
+        run_format = flush_run()
+        if form == 'DW_FORM_flag_present':
+            ops.append((_CONST, b''))
+        elif form in _ULEB128_FORMS:
+            ops.append((_ULEB128, None))
+        elif form == 'DW_FORM_sdata':
+            ops.append((_SLEB128, None))
+        elif form == 'DW_FORM_string':
+            ops.append((_CSTRING, None))
+        elif form in _BLOCK_FORMS:
+            length_format = _BLOCK_FORMS[form]
+            ops.append((_BLOCK, length_format and
+                                struct.Struct(byte_order + length_format)))
+        elif form == 'DW_FORM_data16':
+            ops.append((_DATA16, None))
+        else:
+            return None
+    flush_run()
+    return AttrDecoder(ops, translated)
+
+
+class AttrDecoder(object):
+    """ Decodes the attribute values of DIEs sharing an abbreviation
+        declaration, from the section data in memory. Created by
+        make_attr_decoder().
+
+        The forms are compiled into a list of operations: runs of fixed size
+        forms are read with a single struct.Struct, and variable size forms
+        (LEB128, strings and blocks) are decoded inline.
+
+        translated:
+            The indices of the attributes whose forms need translation (see
+            TRANSLATED_FORMS); the other attributes' values are their raw
+            values.
+
+        fixed_size:
+            The size of the attribute values in bytes if it's the same for
+            all entries (no LEB128, string or block forms), None otherwise
+    """
+    def __init__(self, ops, translated):
+        self._ops = ops
+        self.translated = tuple(translated)
+        self.fixed_size = 0
+        for op, arg in ops:
+            if op == _FIXED:
+                self.fixed_size += arg[0].size
+            elif op == _DATA16:
+                self.fixed_size += 16
+            elif op != _CONST:
+                self.fixed_size = None
+                break
+
+    def decode(self, data, offset, base):
+        """ Decode the attribute values at |offset| in the bytes object
+            |data|. Return (raw_values, attr_offsets, end_offset) where
+            attr_offsets are relative to |base|.
+
+            Raise IndexError or struct.error if data ends too soon.
+        """
+        values = []
+        offsets = []
+        for op, arg in self._ops:
+            if op == _FIXED:
+                fields, field_offsets = arg
+                values.extend(fields.unpack_from(data, offset))
+                start = offset - base
+                offsets.extend([start + field_offset
+                                for field_offset in field_offsets])
+                offset += fields.size
+                continue
+
+            offsets.append(offset - base)
+            if op == _CONST:
+                values.append(arg)
+            elif op == _ULEB128:
+                value, offset = decode_uleb128(data, offset)
+                values.append(value)
+            elif op == _SLEB128:
+                value, offset = decode_sleb128(data, offset)
+                values.append(value)
+            elif op == _CSTRING:
+                end = data.find(b'\x00', offset)
+                if end < 0:
+                    raise IndexError('unterminated string')
+                values.append(data[offset:end])
+                offset = end + 1
+            else:
+                if op == _DATA16:
+                    length = 16
+                elif arg is None:
+                    length, offset = decode_uleb128(data, offset)
+                else:
+                    length, = arg.unpack_from(data, offset)
+                    offset += arg.size
+                if offset + length > len(data):
+                    raise IndexError('block past the end of data')
+                values.append(list(data[offset:offset + length]))
+                offset += length
+        return values, offsets, offset
+
+    def skip(self, data, offset):
+        """ Return the offset following the attribute values at |offset| in
+            the bytes object |data|, without decoding them.
+
+            Raise IndexError or struct.error if data ends too soon.
+        """
+        if self.fixed_size is not None:
+            offset += self.fixed_size
+            if offset > len(data):
+                raise IndexError('attribute values past the end of data')
+            return offset
+
+        for op, arg in self._ops:
+            if op == _FIXED:
+                offset += arg[0].size
+            elif op == _ULEB128 or op == _SLEB128:
+                while data[offset] & 0x80:
+                    offset += 1
+                offset += 1
+            elif op == _CSTRING:
+                end = data.find(b'\x00', offset)
+                if end < 0:
+                    raise IndexError('unterminated string')
+                offset = end + 1
+            elif op == _DATA16:
+                offset += 16
+            elif op == _BLOCK:
+                if arg is None:
+                    length, offset = decode_uleb128(data, offset)
+                else:
+                    length, = arg.unpack_from(data, offset)
+                    offset += arg.size
+                offset += length
+        if offset > len(data):
+            raise IndexError('attribute values past the end of data')
+        return offset
@@ -3,6 +3,7 @@ import copy
 from collections import namedtuple
 from ..common.utils import (
     struct_parse, dwarf_assert, preserve_stream_pos, iterbytes)
+from ..common.bufferreader import BufferReader
 from ..construct import Struct, Switch
 from .enums import DW_EH_encoding_flags
 from .structs import DWARFStructs
@@ -49,6 +50,7 @@ class CallFrameInfo(object):
         # offset. Useful for assigning CIE to FDEs according to the CIE_pointer
         # header field which contains a stream offset.
         self._entry_cache = {}
+        self._reader = None
 
         # The .eh_frame and .debug_frame section use almost the same CFI
         # encoding, but there are tiny variations we need to handle during
@@ -175,9 +177,15 @@ class CallFrameInfo(object):
             the offset and until (not including) end_offset.
             Return a list of CallFrameInstruction objects.
         """
+        if self._reader is None:
+            self._reader = BufferReader.from_stream(
+                self.stream, little_endian=self.base_structs.little_endian)
+        reader = self._reader
+        reader.offset = offset
+        address_size = structs.address_size
         instructions = []
-        while offset < end_offset:
-            opcode = struct_parse(structs.Dwarf_uint8(''), self.stream, offset)
+        while reader.offset < end_offset:
+            opcode = reader.u8()
             args = []
 
             primary = opcode & _PRIMARY_MASK
@@ -185,9 +193,7 @@ class CallFrameInfo(object):
             if primary == DW_CFA_advance_loc:
                 args = [primary_arg]
             elif primary == DW_CFA_offset:
-                args = [
-                    primary_arg,
-                    struct_parse(structs.Dwarf_uleb128(''), self.stream)]
+                args = [primary_arg, reader.uleb()]
             elif primary == DW_CFA_restore:
                 args = [primary_arg]
             # primary == 0 and real opcode is extended
@@ -195,45 +201,38 @@ class CallFrameInfo(object):
                             DW_CFA_restore_state):
                 args = []
             elif opcode == DW_CFA_set_loc:
-                args = [
-                    struct_parse(structs.Dwarf_target_addr(''), self.stream)]
+                args = [reader.uint(address_size)]
             elif opcode == DW_CFA_advance_loc1:
-                args = [struct_parse(structs.Dwarf_uint8(''), self.stream)]
+                args = [reader.u8()]
             elif opcode == DW_CFA_advance_loc2:
-                args = [struct_parse(structs.Dwarf_uint16(''), self.stream)]
+                args = [reader.u16()]
             elif opcode == DW_CFA_advance_loc4:
-                args = [struct_parse(structs.Dwarf_uint32(''), self.stream)]
+                args = [reader.u32()]
             elif opcode in (DW_CFA_offset_extended, DW_CFA_register,
                             DW_CFA_def_cfa, DW_CFA_val_offset):
-                args = [
-                    struct_parse(structs.Dwarf_uleb128(''), self.stream),
-                    struct_parse(structs.Dwarf_uleb128(''), self.stream)]
+                args = [reader.uleb(), reader.uleb()]
             elif opcode in (DW_CFA_restore_extended, DW_CFA_undefined,
                             DW_CFA_same_value, DW_CFA_def_cfa_register,
                             DW_CFA_def_cfa_offset):
-                args = [struct_parse(structs.Dwarf_uleb128(''), self.stream)]
+                args = [reader.uleb()]
             elif opcode == DW_CFA_def_cfa_offset_sf:
-                args = [struct_parse(structs.Dwarf_sleb128(''), self.stream)]
+                args = [reader.sleb()]
             elif opcode == DW_CFA_def_cfa_expression:
-                args = [struct_parse(
-                    structs.Dwarf_dw_form['DW_FORM_block'], self.stream)]
+                args = [list(reader.read(reader.uleb()))]
             elif opcode in (DW_CFA_expression, DW_CFA_val_expression):
-                args = [
-                    struct_parse(structs.Dwarf_uleb128(''), self.stream),
-                    struct_parse(
-                        structs.Dwarf_dw_form['DW_FORM_block'], self.stream)]
+                args = [reader.uleb(), list(reader.read(reader.uleb()))]
             elif opcode in (DW_CFA_offset_extended_sf,
                             DW_CFA_def_cfa_sf, DW_CFA_val_offset_sf):
-                args = [
-                    struct_parse(structs.Dwarf_uleb128(''), self.stream),
-                    struct_parse(structs.Dwarf_sleb128(''), self.stream)]
+                args = [reader.uleb(), reader.sleb()]
             elif opcode == DW_CFA_GNU_args_size:
-                args = [struct_parse(structs.Dwarf_uleb128(''), self.stream)]
+                args = [reader.uleb()]
             else:
                 dwarf_assert(False, 'Unknown CFI opcode: 0x%x' % opcode)
 
             instructions.append(CallFrameInstruction(opcode=opcode, args=args))
-            offset = self.stream.tell()
+        # Leave the stream after the instructions, like the rest of the
+        # parsing does
+        self.stream.seek(reader.offset)
         return instructions
 
     def _parse_cie_for_fde(self, fde_offset, fde_header, entry_structs):
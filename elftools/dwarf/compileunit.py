@@ -1,6 +1,8 @@
 
-from bisect import bisect_right
+import struct
+
 from .die import DIE
+from ..common.bufferreader import decode_uleb128
 from ..common.utils import dwarf_assert
 
 
@@ -48,16 +50,18 @@ class CompileUnit(object):
         # requested.
         self._abbrev_table = None
 
-        # A list of DIEs belonging to this CU.
-        # This list is lazily constructed as DIEs are iterated over.
-        self._dielist = []
-        # A list of file offsets, corresponding (by index) to the DIEs
-        # in `self._dielist`. This list exists separately from
-        # `self._dielist` to make it binary searchable, enabling the
-        # DIE population strategy used in `iter_DIE_children`.
-        # Like `self._dielist`, this list is lazily constructed
-        # as DIEs are iterated over.
-        self._diemap = []
+        # The DIEs of this CU parsed so far, by offset in the stream.
+        self._dies = {}
+
+        # Maps the offset of the first child of DIEs whose subtrees were
+        # skipped to the offset following the subtree.
+        self._children_ends = {}
+
+        # All the DIEs of this CU in order of their appearance, null DIEs
+        # included. Set by parse_all(), which also maps the offset of each
+        # DIE to its index in the list in self._diemap.
+        self._dielist = None
+        self._diemap = None
 
     def dwarf_format(self):
         """ Get the DWARF format (32 or 64) for this CU
@@ -77,18 +81,16 @@ class CompileUnit(object):
             DW_TAG_partial_unit) of this CU
         """
 
-        # Note that a top DIE always has minimal offset and is therefore
-        # at the beginning of our lists, so no bisect is required.
-        if len(self._diemap) > 0:
-            return self._dielist[0]
+        top = self._dies.get(self.cu_die_offset)
+        if top is not None:
+            return top
 
         top = DIE(
                 cu=self,
                 stream=self.dwarfinfo.debug_info_sec.stream,
                 offset=self.cu_die_offset)
 
-        self._dielist.insert(0, top)
-        self._diemap.insert(0, self.cu_die_offset)
+        self._dies[self.cu_die_offset] = top
 
         top._translate_indirect_attributes() # Can't translate indirect attributes until the top DIE has been parsed to the end
 
@@ -98,7 +100,7 @@ class CompileUnit(object):
         """ Returns whether the top DIE in this CU has already been parsed and cached.
             No parsing on demand!
         """
-        return len(self._diemap) > 0        
+        return self.cu_die_offset in self._dies
 
     @property
     def size(self):
@@ -122,11 +124,58 @@ class CompileUnit(object):
 
         return self._get_cached_DIE(refaddr)
 
-    def iter_DIEs(self):
+    def parse_all(self):
+        """ Parse all the DIEs of the CU in a single pass over its data,
+            linking each DIE to its parent and each list of children to its
+            null DIE terminator. Afterwards, the DIEs are served from memory.
+        """
+        if self._dielist is None:
+            for _ in self._parse_DIEs():
+                pass
+
+    def iter_DIEs(self, with_depth=False, tags=None, prune=None):
         """ Iterate over all the DIEs in the CU, in order of their appearance.
             Note that null DIEs will also be returned.
+
+            with_depth:
+                If True, yield (DIE, depth) pairs instead, where the depth of
+                the top DIE is 0, that of its children 1 and so on. A null
+                DIE has the depth of the list of children it terminates.
+
+            tags:
+                If given, a collection of tags: only DIEs with one of these
+                tags are returned (so no null DIEs).
+
+            prune:
+                If given, a function called with the tag of each DIE that has
+                children. When it returns True, the subtree below that DIE
+                is skipped.
+
+            The first full iteration parses the whole CU (see parse_all).
+            With tags or prune, the DIEs that aren't returned are only
+            decoded as far as needed to find where they end, and subtrees are
+            skipped by their DW_AT_sibling attribute when possible.
         """
-        return self._iter_DIE_subtree(self.get_top_DIE())
+        if tags is not None or prune is not None:
+            if (self._dielist is None and
+                    not self.dwarfinfo.supplementary_dwarfinfo):
+                dies = self._scan_DIEs(tags, prune)
+            else:
+                dies = _filter_DIEs(self.iter_DIEs(with_depth=True), tags,
+                                    prune)
+            if not with_depth:
+                dies = (die for die, _ in dies)
+            return dies
+
+        if self._dielist is None:
+            dies = self._parse_DIEs()
+        else:
+            dies = iter(self._dielist)
+        if self.dwarfinfo.supplementary_dwarfinfo:
+            dies = self._iter_imported_units(dies)
+        if with_depth:
+            dies = _iter_with_depth(dies)
+        return dies
 
     def iter_DIE_children(self, die):
         """ Given a DIE, yields either its children, without null DIE list
@@ -156,29 +205,18 @@ class CompileUnit(object):
                 cur_offset += child.size
             elif "DW_AT_sibling" in child.attributes:
                 sibling = child.attributes["DW_AT_sibling"]
-                if sibling.form in ('DW_FORM_ref1', 'DW_FORM_ref2',
-                                    'DW_FORM_ref4', 'DW_FORM_ref8',
-                                    'DW_FORM_ref', 'DW_FORM_ref_udata'):
-                    cur_offset = sibling.value + self.cu_offset
-                elif sibling.form == 'DW_FORM_ref_addr':
-                    cur_offset = sibling.value
-                else:
-                    raise NotImplementedError('sibling in form %s' % sibling.form)
+                cur_offset = self._get_sibling_offset(sibling.form,
+                                                      sibling.value)
+            elif child._terminator is not None:
+                cur_offset = child._terminator.offset + child._terminator.size
             else:
                 # If no DW_AT_sibling attribute is provided by the producer
-                # then the whole child subtree must be parsed to find its next
-                # sibling. There is one zero byte representing null DIE
-                # terminating children list. It is used to locate child subtree
-                # bounds.
-
-                # If children are not parsed yet, this instruction will manage
-                # to recursive call of this function which will result in
-                # setting of `_terminator` attribute of the `child`.
-                if child._terminator is None:
-                    for _ in self.iter_DIE_children(child):
-                        pass
-
-                cur_offset = child._terminator.offset + child._terminator.size
+                # then the whole child subtree must be scanned to find its
+                # next sibling, up to the null DIE terminating its children.
+                # The DIEs in it are skipped without being created.
+                cur_offset = self._skip_DIE_children(
+                    self.dwarfinfo.get_section_data('debug_info_sec'),
+                    child.offset + child.size)
 
     #------ PRIVATE ------#
 
@@ -187,20 +225,220 @@ class CompileUnit(object):
         """
         return self.header[name]
 
+    def _parse_DIEs(self):
+        """ Parse and yield all the DIEs of the CU, like _iter_DIE_subtree
+            from the top DIE. Once this is done, set self._dielist and
+            self._diemap.
+        """
+        dies = []
+        diemap = {}
+        for die in self._iter_DIE_subtree(self.get_top_DIE()):
+            diemap[die.offset] = len(dies)
+            dies.append(die)
+            yield die
+        self._dielist = dies
+        self._diemap = diemap
+
     def _iter_DIE_subtree(self, die):
         """ Given a DIE, this yields it with its subtree including null DIEs
             (child list terminators).
         """
-        # If the die is an imported unit, replace it with what it refers to if
-        # we can
-        if die.tag == 'DW_TAG_imported_unit' and self.dwarfinfo.supplementary_dwarfinfo:
-            die = die.get_DIE_from_attribute('DW_AT_import')
+        if self._diemap is not None:
+            start = self._diemap[die.offset]
+            end = start + 1
+            if die.has_children:
+                end = self._diemap[die._terminator.offset] + 1
+            return iter(self._dielist[start:end])
+        return self._parse_DIE_subtree(die)
+
+    def _parse_DIE_subtree(self, die):
+        """ Yield |die| and its subtree, parsing the DIEs one after the other
+            and linking them to their parent and null DIE terminator on the
+            way.
+        """
         yield die
+        if not die.has_children:
+            return
+
+        stream = die.stream
+        cache = self._dies
+        # The DIEs whose lists of children are being parsed
+        parents = [die]
+        offset = die.offset + die.size
+        while parents:
+            die = cache.get(offset)
+            if die is None:
+                die = DIE(cu=self, stream=stream, offset=offset)
+                cache[offset] = die
+            parent = parents[-1]
+            die.set_parent(parent)
+            if die.is_null():
+                parent._terminator = die
+                parents.pop()
+            elif die.has_children:
+                parents.append(die)
+            yield die
+            offset += die.size
+
+    def _scan_DIEs(self, tags, prune):
+        """ Yield (DIE, depth) pairs for iter_DIEs with |tags| and |prune|,
+            scanning the data of the CU. The DIEs that aren't returned aren't
+            created (unless they can't be scanned otherwise).
+        """
+        top = self.get_top_DIE()
+        data = self.dwarfinfo.get_section_data('debug_info_sec')
+        abbrev_table = self.get_abbrev_table()
+        offset = top.offset
+        depth = 0
+        while True:
+            die = self._dies.get(offset)
+            if die is None:
+                # Get the tag to know if the DIE is wanted
+                try:
+                    abbrev_code, _ = decode_uleb128(data, offset)
+                except IndexError:
+                    abbrev_code = None
+                tag = None
+                if abbrev_code:
+                    tag = abbrev_table.get_abbrev(abbrev_code).tag
+                if abbrev_code is None or tags is None or tag in tags:
+                    die = self._get_cached_DIE(offset)
+            if die is not None:
+                if tags is None or die.tag in tags:
+                    yield die, depth
+                tag = die.tag
+                has_children = die.has_children
+                end = die.offset + die.size
+                sibling = None
+                if has_children and 'DW_AT_sibling' in die.attributes:
+                    sibling = die.attributes['DW_AT_sibling']
+                    sibling = self._get_sibling_offset(sibling.form,
+                                                       sibling.value)
+            else:
+                tag, has_children, end, sibling = self._get_DIE_extent(
+                    data, offset)
+
+            if tag is None:
+                depth -= 1
+            elif has_children:
+                if prune is not None and prune(tag):
+                    if sibling is None:
+                        sibling = self._skip_DIE_children(data, end)
+                    end = sibling
+                else:
+                    depth += 1
+            if depth == 0:
+                return
+            offset = end
+
+    def _get_DIE_extent(self, data, offset):
+        """ Decode the DIE at |offset| in |data| (the contents of the
+            .debug_info stream) as far as needed to find where it ends.
+            Return (tag, has_children, end offset, sibling offset), the
+            latter being the offset of the next sibling of a DIE with
+            children when known (from DW_AT_sibling or its null DIE
+            terminator), None otherwise. The tag of a null DIE is None.
+        """
+        die = self._dies.get(offset)
+        if die is None:
+            abbrev_code, attr_offset = decode_uleb128(data, offset)
+            if abbrev_code == 0:
+                return None, False, attr_offset, None
+            abbrev_decl = self.get_abbrev_table().get_abbrev(abbrev_code)
+            decoder = abbrev_decl.get_decoder(self.structs)
+            try:
+                if decoder is not None:
+                    i = abbrev_decl.attr_index.get('DW_AT_sibling')
+                    if i is None:
+                        # Just skip the values, which is a single addition
+                        # for fixed size declarations
+                        return (abbrev_decl.tag, abbrev_decl.has_children(),
+                                decoder.skip(data, attr_offset), None)
+                    raw_values, _, end = decoder.decode(data, attr_offset,
+                                                        offset)
+                    return (abbrev_decl.tag, abbrev_decl.has_children(), end,
+                            self._get_sibling_offset(abbrev_decl.attr_forms[i],
+                                                     raw_values[i]))
+            except (IndexError, struct.error):
+                pass
+            # Parsing the DIE deals with the rest, truncated data included
+            die = self._get_cached_DIE(offset)
+
+        sibling = None
         if die.has_children:
-            for c in die.iter_children():
-                for d in die.cu._iter_DIE_subtree(c):
+            if die._terminator is not None:
+                sibling = die._terminator.offset + die._terminator.size
+            elif 'DW_AT_sibling' in die.attributes:
+                sibling = die.attributes['DW_AT_sibling']
+                sibling = self._get_sibling_offset(sibling.form,
+                                                   sibling.value)
+        return die.tag, die.has_children, die.offset + die.size, sibling
+
+    def _skip_DIE_children(self, data, offset):
+        """ Given the offset of the first child of a DIE, return the offset
+            following the null DIE that terminates its children. The DIEs in
+            between are skipped over, jumping to the next sibling of those
+            having children when it's known.
+        """
+        first_child = offset
+        end = self._children_ends.get(first_child)
+        if end is not None:
+            return end
+        depth = 1
+        while depth:
+            tag, has_children, offset, sibling = self._get_DIE_extent(
+                data, offset)
+            if tag is None:
+                depth -= 1
+            elif has_children:
+                if sibling is None:
+                    depth += 1
+                else:
+                    offset = sibling
+        self._children_ends[first_child] = offset
+        return offset
+
+    def _get_sibling_offset(self, form, value):
+        """ Get the offset of a DIE's sibling from the form and value of its
+            DW_AT_sibling attribute
+        """
+        if form in ('DW_FORM_ref1', 'DW_FORM_ref2', 'DW_FORM_ref4',
+                    'DW_FORM_ref8', 'DW_FORM_ref', 'DW_FORM_ref_udata'):
+            return value + self.cu_offset
+        elif form == 'DW_FORM_ref_addr':
+            return value
+        else:
+            raise NotImplementedError('sibling in form %s' % form)
+
+    def _iter_imported_units(self, dies, importing=frozenset()):
+        """ Given an iterator over DIEs in order, replace the imported units
+            among them with the subtrees of the DIEs they refer to, in which
+            imported units are replaced in turn.
+
+            importing:
+                The DIEs whose subtrees are being imported around |dies|. An
+                imported unit referring to one of them is dropped, to break
+                the cycle.
+        """
+        for die in dies:
+            if die.tag != 'DW_TAG_imported_unit':
+                yield die
+                continue
+            imported = die.get_DIE_from_attribute('DW_AT_import')
+            if imported not in importing:
+                subtree = imported.cu._iter_DIE_subtree(imported)
+                for d in imported.cu._iter_imported_units(
+                        subtree, importing | {imported}):
                     yield d
-            yield die._terminator
+            if die.has_children:
+                # Skip the subtree of the imported unit DIE
+                depth = 1
+                while depth:
+                    die = next(dies)
+                    if die.is_null():
+                        depth -= 1
+                    elif die.has_children:
+                        depth += 1
 
     def _get_cached_DIE(self, offset):
         """ Given a DIE offset, look it up in the cache.  If not present,
@@ -214,25 +452,43 @@ class CompileUnit(object):
 
             See also get_DIE_from_refaddr(self, refaddr).
         """
-        # The top die must be in the cache if any DIE is in the cache.
-        # The stream is the same for all DIEs in this CU, so populate
-        # the top DIE and obtain a reference to its stream.
-        top_die_stream = self.get_top_DIE().stream
-
-        # `offset` is the offset in the stream of the DIE we want to return.
-        # The map is maintined as a parallel array to the list.  We call
-        # bisect each time to ensure new DIEs are inserted in the correct
-        # order within both `self._dielist` and `self._diemap`.
-        i = bisect_right(self._diemap, offset)
-
-        # Note that `self._diemap` cannot be empty because a the top DIE
-        # was inserted by the call to .get_top_DIE().  Also it has the minimal
-        # offset, so the bisect_right insert point will always be at least 1.
-        if offset == self._diemap[i - 1]:
-            die = self._dielist[i - 1]
-        else:
-            die = DIE(cu=self, stream=top_die_stream, offset=offset)
-            self._dielist.insert(i, die)
-            self._diemap.insert(i, offset)
-
+        die = self._dies.get(offset)
+        if die is None:
+            # The top DIE must be parsed before any other DIE. The stream is
+            # the same for all DIEs in this CU, so populate the top DIE and
+            # obtain a reference to its stream.
+            top = self.get_top_DIE()
+            if offset == top.offset:
+                return top
+            die = DIE(cu=self, stream=top.stream, offset=offset)
+            self._dies[offset] = die
         return die
+
+
+def _iter_with_depth(dies):
+    """ Given an iterator over the DIEs of a tree in order, null DIEs
+        included, yield (DIE, depth) pairs
+    """
+    depth = 0
+    for die in dies:
+        yield die, depth
+        if die.is_null():
+            depth -= 1
+        elif die.has_children:
+            depth += 1
+
+
+def _filter_DIEs(dies, tags, prune):
+    """ Given an iterator over the (DIE, depth) pairs of a tree in order,
+        yield those for iter_DIEs with |tags| and |prune|
+    """
+    pruned_depth = None
+    for die, depth in dies:
+        if pruned_depth is not None:
+            if depth > pruned_depth:
+                continue
+            pruned_depth = None
+        if tags is None or die.tag in tags:
+            yield die, depth
+        if die.has_children and prune is not None and prune(die.tag):
+            pruned_depth = depth
@@ -1,7 +1,10 @@
 
 from collections import namedtuple, OrderedDict
+from collections.abc import MutableMapping
 import os
+import struct
 
+from ..common.bufferreader import decode_uleb128
 from ..common.exceptions import DWARFError
 from ..common.utils import bytes2str, struct_parse, preserve_stream_pos
 from .enums import DW_FORM_raw2name
@@ -12,6 +15,16 @@ from .dwarf_util import _resolve_via_offset_table, _get_base_offset
 AttributeValue = namedtuple(
     'AttributeValue', 'name form value raw_value offset')
 
+# Stands for the value of an attribute that isn't translated yet
+_UNTRANSLATED = object()
+
+# Forms whose values in the top DIE are translated once it's fully parsed
+_INDIRECT_FORMS = frozenset((
+    'DW_FORM_strx', 'DW_FORM_strx1', 'DW_FORM_strx2', 'DW_FORM_strx3',
+    'DW_FORM_strx4', 'DW_FORM_addrx', 'DW_FORM_addrx1', 'DW_FORM_addrx2',
+    'DW_FORM_addrx3', 'DW_FORM_addrx4', 'DW_FORM_loclistx',
+    'DW_FORM_rnglistx'))
+
 
 class DIE(object):
     """ A DWARF debugging information entry. On creation, parses itself from
@@ -29,8 +42,9 @@ class DIE(object):
                 The offset of this DIE in the stream
 
             attributes:
-                An ordered dictionary mapping attribute names to values. It's
-                ordered to preserve the order of attributes in the section
+                A dictionary-like object mapping attribute names to values
+                (AttributeValue objects). It's ordered to preserve the order
+                of attributes in the section
 
             has_children:
                 Specifies whether this DIE has children
@@ -41,7 +55,24 @@ class DIE(object):
                 interacts with its abbreviation table transparently).
 
         See also the public methods.
+
+        DIEs are numerous, so they are kept small: the attribute names and
+        forms are shared with the abbreviation declaration, and only the
+        values are stored in the DIE. The attributes object is a view
+        building AttributeValue objects on access; modifying it turns it into
+        an OrderedDict owned by the DIE.
+
+        With a lazy DWARFInfo, creating a DIE only reads its abbreviation
+        code and finds its size. The attribute values are decoded when the
+        attributes are first accessed, and each value is translated (strings
+        fetched, indices resolved and so on) the first time it's used.
+        Otherwise the values are decoded and translated on creation.
     """
+    __slots__ = (
+        'cu', 'stream', 'offset', 'tag', 'has_children', 'abbrev_code',
+        'size', '_abbrev_decl', '_values', '_raw_values', '_attr_offsets',
+        '_attributes', '_terminator', '_parent')
+
     def __init__(self, cu, stream, offset):
         """ cu:
                 CompileUnit object this DIE belongs to. Used to obtain context
@@ -51,15 +82,25 @@ class DIE(object):
                 The stream and offset into it where this DIE's data is located
         """
         self.cu = cu
-        self.dwarfinfo = self.cu.dwarfinfo # get DWARFInfo context
         self.stream = stream
         self.offset = offset
 
-        self.attributes = OrderedDict()
         self.tag = None
         self.has_children = None
         self.abbrev_code = None
         self.size = 0
+        # Attribute values, in the order of the abbreviation declaration's
+        # attr_names. _raw_values is the same tuple as _values when no value
+        # needs translating; otherwise _values is a list in which the values
+        # not translated yet are _UNTRANSLATED. _attr_offsets are relative to
+        # self.offset, which keeps them small. All three are None until the
+        # values are decoded.
+        self._abbrev_decl = None
+        self._values = ()
+        self._raw_values = ()
+        self._attr_offsets = ()
+        # Set once the attributes are modified or replaced
+        self._attributes = None
         # Null DIE terminator. It can be used to obtain offset range occupied
         # by this DIE including its whole subtree.
         self._terminator = None
@@ -67,6 +108,22 @@ class DIE(object):
 
         self._parse_DIE()
 
+    @property
+    def dwarfinfo(self):
+        """ The DWARFInfo this DIE belongs to
+        """
+        return self.cu.dwarfinfo
+
+    @property
+    def attributes(self):
+        if self._attributes is not None:
+            return self._attributes
+        return DIEAttributes(self)
+
+    @attributes.setter
+    def attributes(self, attributes):
+        self._attributes = attributes
+
     def is_null(self):
         """ Is this a null entry?
         """
@@ -144,6 +201,31 @@ class DIE(object):
 
     #------ PRIVATE ------#
 
+    def _get_attribute(self, i):
+        """ Build the AttributeValue of the i-th attribute specification
+        """
+        decl = self._abbrev_decl
+        if self._values is None:
+            self._decode_attributes()
+        value = self._values[i]
+        if value is _UNTRANSLATED:
+            value = self._values[i] = self._translate_attr_value(
+                decl.attr_forms[i], self._raw_values[i])
+        return AttributeValue(
+            name=decl.attr_names[i],
+            form=decl.attr_forms[i],
+            value=value,
+            raw_value=self._raw_values[i],
+            offset=self.offset + self._attr_offsets[i])
+
+    def _own_attributes(self):
+        """ Copy the attributes into an OrderedDict that replaces the view,
+            so that they can be modified
+        """
+        if self._attributes is None:
+            self._attributes = OrderedDict(DIEAttributes(self).items())
+        return self._attributes
+
     def _search_ancestor_offspring(self):
         """ Search our ancestors identifying their offspring to find our parent.
 
@@ -194,6 +276,74 @@ class DIE(object):
         """ Parses the DIE info from the section, based on the abbreviation
             table of the CU
         """
+        # Decode the DIE from the section data in memory when its attribute
+        # forms allow it. Parsing from the stream deals with everything else,
+        # including reporting truncated data.
+        data = self.dwarfinfo.get_section_data('debug_info_sec')
+        try:
+            if self._decode_DIE(data):
+                return
+        except (IndexError, struct.error):
+            pass
+        self._parse_DIE_from_stream()
+
+    def _decode_DIE(self, data):
+        """ Decode the DIE from |data|, the contents of its stream, with the
+            AttrDecoder of its abbreviation declaration. Return False if the
+            declaration has no decoder.
+
+            With a lazy DWARFInfo, only the size of the attribute values is
+            found here; they are decoded by _decode_attributes on access.
+        """
+        self.abbrev_code, attr_start = decode_uleb128(data, self.offset)
+        if self.abbrev_code == 0:
+            self.size = attr_start - self.offset
+            return True
+
+        abbrev_decl = self.cu.get_abbrev_table().get_abbrev(self.abbrev_code)
+        decoder = abbrev_decl.get_decoder(self.cu.structs)
+        if decoder is None:
+            return False
+
+        self._abbrev_decl = abbrev_decl
+        self.tag = abbrev_decl.tag
+        self.has_children = abbrev_decl.has_children()
+        if self.dwarfinfo.lazy:
+            end = decoder.skip(data, attr_start)
+            self._values = self._raw_values = self._attr_offsets = None
+        else:
+            end = self._decode_attributes(data, attr_start, translate=True)
+        self.size = end - self.offset
+        return True
+
+    def _decode_attributes(self, data=None, attr_start=None, translate=False):
+        """ Decode the attribute values of a DIE created by _decode_DIE, at
+            attr_start in data (found again if not given). Return the offset
+            following them. Unless translate is True, the values needing
+            translation are left _UNTRANSLATED.
+        """
+        if data is None:
+            data = self.dwarfinfo.get_section_data('debug_info_sec')
+            _, attr_start = decode_uleb128(data, self.offset)
+        decoder = self._abbrev_decl.get_decoder(self.cu.structs)
+        raw_values, attr_offsets, end = decoder.decode(data, attr_start,
+                                                       self.offset)
+        self._raw_values = tuple(raw_values)
+        if decoder.translated:
+            forms = self._abbrev_decl.attr_forms
+            for i in decoder.translated:
+                raw_values[i] = (
+                    self._translate_attr_value(forms[i], raw_values[i])
+                    if translate else _UNTRANSLATED)
+            self._values = tuple(raw_values) if translate else raw_values
+        else:
+            self._values = self._raw_values
+        self._attr_offsets = tuple(attr_offsets)
+        return end
+
+    def _parse_DIE_from_stream(self):
+        """ Parse the DIE from the stream, one attribute at a time
+        """
         structs = self.cu.structs
 
         # A DIE begins with the abbreviation code. Read it and use it to
@@ -209,15 +359,19 @@ class DIE(object):
             return
 
         abbrev_decl = self.cu.get_abbrev_table().get_abbrev(self.abbrev_code)
-        self.tag = abbrev_decl['tag']
+        self._abbrev_decl = abbrev_decl
+        self.tag = abbrev_decl.tag
         self.has_children = abbrev_decl.has_children()
 
         # Guided by the attributes listed in the abbreviation declaration, parse
         # values from the stream.
+        values = []
+        raw_values = []
+        attr_offsets = []
+        translated = False
         for spec in abbrev_decl['attr_spec']:
             form = spec.form
-            name = spec.name
-            attr_offset = self.stream.tell()
+            attr_offsets.append(self.stream.tell() - self.offset)
             # Special case here: the attribute value is stored in the attribute
             # definition in the abbreviation spec, not in the DIE itself.
             if form == 'DW_FORM_implicit_const':
@@ -226,13 +380,13 @@ class DIE(object):
             else:
                 raw_value = struct_parse(structs.Dwarf_dw_form[form], self.stream)
                 value = self._translate_attr_value(form, raw_value)
-            self.attributes[name] = AttributeValue(
-                name=name,
-                form=form,
-                value=value,
-                raw_value=raw_value,
-                offset=attr_offset)
+                translated = translated or value is not raw_value
+            values.append(value)
+            raw_values.append(raw_value)
 
+        self._values = tuple(values)
+        self._raw_values = tuple(raw_values) if translated else self._values
+        self._attr_offsets = tuple(attr_offsets)
         self.size = self.stream.tell() - self.offset
 
     def _translate_attr_value(self, form, raw_value):
@@ -296,15 +450,82 @@ class DIE(object):
             reference to the DW_AT_xxx_base attribute in the same DIE that may
             not have been parsed yet.
         """
-        for key in self.attributes:
-            attr = self.attributes[key]
-            if attr.form in ('DW_FORM_strx', 'DW_FORM_strx1', 'DW_FORM_strx2', 'DW_FORM_strx3', 'DW_FORM_strx4',
-                'DW_FORM_addrx', 'DW_FORM_addrx1', 'DW_FORM_addrx2', 'DW_FORM_addrx3', 'DW_FORM_addrx4',
-                'DW_FORM_loclistx', 'DW_FORM_rnglistx'):
-                # Can't change value in place, got to replace the whole attribute record
-                self.attributes[key] = AttributeValue(
-                    name=attr.name,
-                    form=attr.form,
-                    value=self._translate_attr_value(attr.form, attr.raw_value),
-                    raw_value=attr.raw_value,
-                    offset=attr.offset)        
+        if self._attributes is not None:
+            for key in self._attributes:
+                attr = self._attributes[key]
+                if attr.form in _INDIRECT_FORMS:
+                    # Can't change value in place, got to replace the whole attribute record
+                    self._attributes[key] = attr._replace(
+                        value=self._translate_attr_value(attr.form, attr.raw_value))
+            return
+
+        if self._abbrev_decl is None or self._values is None:
+            # The values are translated when accessed, by then with the top
+            # DIE in place
+            return
+        values = list(self._values)
+        for i, form in enumerate(self._abbrev_decl.attr_forms):
+            if form in _INDIRECT_FORMS:
+                values[i] = self._translate_attr_value(form,
+                                                       self._raw_values[i])
+        self._values = tuple(values)
+
+
+class DIEAttributes(MutableMapping):
+    """ The attributes of a DIE, as returned by DIE.attributes: maps the
+        attribute names to AttributeValue objects, in the order of the
+        section, like an OrderedDict would.
+
+        The AttributeValue objects are made on access, from the values stored
+        in the DIE. Modifying the attributes makes the DIE switch to an
+        OrderedDict holding a copy of them.
+    """
+    __slots__ = ('_die',)
+
+    def __init__(self, die):
+        self._die = die
+
+    def __getitem__(self, name):
+        die = self._die
+        if die._attributes is not None:
+            return die._attributes[name]
+        if die._abbrev_decl is None:
+            raise KeyError(name)
+        return die._get_attribute(die._abbrev_decl.attr_index[name])
+
+    def __contains__(self, name):
+        die = self._die
+        if die._attributes is not None:
+            return name in die._attributes
+        return (die._abbrev_decl is not None and
+                name in die._abbrev_decl.attr_index)
+
+    def __iter__(self):
+        die = self._die
+        if die._attributes is not None:
+            return iter(die._attributes)
+        if die._abbrev_decl is None:
+            return iter(())
+        return iter(die._abbrev_decl.attr_index)
+
+    def __len__(self):
+        die = self._die
+        if die._attributes is not None:
+            return len(die._attributes)
+        if die._abbrev_decl is None:
+            return 0
+        return len(die._abbrev_decl.attr_index)
+
+    def __setitem__(self, name, value):
+        self._die._own_attributes()[name] = value
+
+    def __delitem__(self, name):
+        del self._die._own_attributes()[name]
+
+    def copy(self):
+        """ Return the attributes as an OrderedDict
+        """
+        return OrderedDict(self.items())
+
+    def __repr__(self):
+        return '%s(%r)' % (self.__class__.__name__, list(self.items()))        
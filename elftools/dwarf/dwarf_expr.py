@@ -1,8 +1,7 @@
 
 from collections import namedtuple
-from io import BytesIO
 
-from ..common.utils import struct_parse, bytelist2string, read_blob
+from ..common.bufferreader import BufferReader
 
 
 # DWARF expression opcodes. name -> opcode mapping
@@ -118,6 +117,7 @@ class DWARFExprParser(object):
     """
 
     def __init__(self, structs):
+        self._little_endian = structs.little_endian
         self._dispatch_table = _init_dispatch_table(structs)
 
     def parse_expr(self, expr):
@@ -125,24 +125,21 @@ class DWARFExprParser(object):
 
         The list can potentially be nested.
         """
-        stream = BytesIO(bytelist2string(expr))
+        reader = BufferReader(bytes(expr), 0, self._little_endian)
         parsed = []
 
-        while True:
-            # Get the next opcode from the stream. If nothing is left in the
-            # stream, we're done.
-            offset = stream.tell()
-            byte = stream.read(1)
-            if len(byte) == 0:
-                break
+        while not reader.at_end():
+            # Get the next opcode; when nothing is left in the expression,
+            # we're done.
+            offset = reader.offset
+            op = reader.u8()
 
             # Decode the opcode and its name.
-            op = ord(byte)
             op_name = DW_OP_opcode2name.get(op, 'OP:0x%x' % op)
 
             # Use dispatch table to parse args.
             arg_parser = self._dispatch_table[op]
-            args = arg_parser(stream)
+            args = arg_parser(reader)
 
             parsed.append(DWARFExprOp(op=op, op_name=op_name, args=args, offset=offset))
 
@@ -152,60 +149,70 @@ class DWARFExprParser(object):
 def _init_dispatch_table(structs):
     """Creates a dispatch table for parsing args of an op.
 
-    Returns a dict mapping opcode to a function. The function accepts a stream
-    and return a list of parsed arguments for the opcode from the stream;
-    the stream is advanced by the function as needed.
+    Returns a dict mapping opcode to a function. The function accepts a
+    BufferReader over the expression and returns a list of parsed arguments
+    for the opcode; the reader is advanced by the function as needed.
     """
     table = {}
     def add(opcode_name, func):
         table[DW_OP_name2opcode[opcode_name]] = func
 
+    # Readers of the argument types
+    uint8 = BufferReader.u8
+    uint16 = BufferReader.u16
+    uint32 = BufferReader.u32
+    uint64 = BufferReader.u64
+    int8 = lambda reader: reader.sint(1)
+    int16 = lambda reader: reader.sint(2)
+    int32 = lambda reader: reader.sint(4)
+    int64 = lambda reader: reader.sint(8)
+    uleb128 = BufferReader.uleb
+    sleb128 = BufferReader.sleb
+    section_offset = lambda reader: reader.uint(structs.dwarf_format // 8)
+
     def parse_noargs():
-        return lambda stream: []
+        return lambda reader: []
 
     def parse_op_addr():
-        return lambda stream: [struct_parse(structs.Dwarf_target_addr(''),
-                                            stream)]
+        return lambda reader: [reader.uint(structs.address_size)]
 
-    def parse_arg_struct(arg_struct):
-        return lambda stream: [struct_parse(arg_struct, stream)]
+    def parse_arg(arg_reader):
+        return lambda reader: [arg_reader(reader)]
 
-    def parse_arg_struct2(arg1_struct, arg2_struct):
-        return lambda stream: [struct_parse(arg1_struct, stream),
-                               struct_parse(arg2_struct, stream)]
+    def parse_args2(arg1_reader, arg2_reader):
+        return lambda reader: [arg1_reader(reader), arg2_reader(reader)]
 
     # ULEB128, then an expression of that length
     def parse_nestedexpr():
-        def parse(stream):
-            size = struct_parse(structs.Dwarf_uleb128(''), stream)
-            nested_expr_blob = read_blob(stream, size)
+        def parse(reader):
+            nested_expr_blob = reader.read(reader.uleb())
             return [DWARFExprParser(structs).parse_expr(nested_expr_blob)]
         return parse
 
     # ULEB128, then a blob of that size
     def parse_blob():
-        return lambda stream: [read_blob(stream, struct_parse(structs.Dwarf_uleb128(''), stream))]
+        return lambda reader: [list(reader.read(reader.uleb()))]
 
     # ULEB128 with datatype DIE offset, then byte, then a blob of that size
     def parse_typedblob():
-        return lambda stream: [struct_parse(structs.Dwarf_uleb128(''), stream), read_blob(stream, struct_parse(structs.Dwarf_uint8(''), stream))]
+        return lambda reader: [reader.uleb(), list(reader.read(reader.u8()))]
 
     add('DW_OP_addr', parse_op_addr())
-    add('DW_OP_addrx', parse_arg_struct(structs.Dwarf_uleb128('')))
-    add('DW_OP_const1u', parse_arg_struct(structs.Dwarf_uint8('')))
-    add('DW_OP_const1s', parse_arg_struct(structs.Dwarf_int8('')))
-    add('DW_OP_const2u', parse_arg_struct(structs.Dwarf_uint16('')))
-    add('DW_OP_const2s', parse_arg_struct(structs.Dwarf_int16('')))
-    add('DW_OP_const4u', parse_arg_struct(structs.Dwarf_uint32('')))
-    add('DW_OP_const4s', parse_arg_struct(structs.Dwarf_int32('')))
-    add('DW_OP_const8u', parse_arg_struct(structs.Dwarf_uint64('')))
-    add('DW_OP_const8s', parse_arg_struct(structs.Dwarf_int64('')))
-    add('DW_OP_constu', parse_arg_struct(structs.Dwarf_uleb128('')))
-    add('DW_OP_consts', parse_arg_struct(structs.Dwarf_sleb128('')))
-    add('DW_OP_pick', parse_arg_struct(structs.Dwarf_uint8('')))
-    add('DW_OP_plus_uconst', parse_arg_struct(structs.Dwarf_uleb128('')))
-    add('DW_OP_bra', parse_arg_struct(structs.Dwarf_int16('')))
-    add('DW_OP_skip', parse_arg_struct(structs.Dwarf_int16('')))
+    add('DW_OP_addrx', parse_arg(uleb128))
+    add('DW_OP_const1u', parse_arg(uint8))
+    add('DW_OP_const1s', parse_arg(int8))
+    add('DW_OP_const2u', parse_arg(uint16))
+    add('DW_OP_const2s', parse_arg(int16))
+    add('DW_OP_const4u', parse_arg(uint32))
+    add('DW_OP_const4s', parse_arg(int32))
+    add('DW_OP_const8u', parse_arg(uint64))
+    add('DW_OP_const8s', parse_arg(int64))
+    add('DW_OP_constu', parse_arg(uleb128))
+    add('DW_OP_consts', parse_arg(sleb128))
+    add('DW_OP_pick', parse_arg(uint8))
+    add('DW_OP_plus_uconst', parse_arg(uleb128))
+    add('DW_OP_bra', parse_arg(int16))
+    add('DW_OP_skip', parse_arg(int16))
 
     for opname in [ 'DW_OP_deref', 'DW_OP_dup', 'DW_OP_drop', 'DW_OP_over',
                     'DW_OP_swap', 'DW_OP_swap', 'DW_OP_rot', 'DW_OP_xderef',
@@ -222,39 +229,31 @@ def _init_dispatch_table(structs):
     for n in range(0, 32):
         add('DW_OP_lit%s' % n, parse_noargs())
         add('DW_OP_reg%s' % n, parse_noargs())
-        add('DW_OP_breg%s' % n, parse_arg_struct(structs.Dwarf_sleb128('')))
-
-    add('DW_OP_fbreg', parse_arg_struct(structs.Dwarf_sleb128('')))
-    add('DW_OP_regx', parse_arg_struct(structs.Dwarf_uleb128('')))
-    add('DW_OP_bregx', parse_arg_struct2(structs.Dwarf_uleb128(''),
-                                         structs.Dwarf_sleb128('')))
-    add('DW_OP_piece', parse_arg_struct(structs.Dwarf_uleb128('')))
-    add('DW_OP_bit_piece', parse_arg_struct2(structs.Dwarf_uleb128(''),
-                                             structs.Dwarf_uleb128('')))
-    add('DW_OP_deref_size', parse_arg_struct(structs.Dwarf_int8('')))
-    add('DW_OP_xderef_size', parse_arg_struct(structs.Dwarf_int8('')))
-    add('DW_OP_call2', parse_arg_struct(structs.Dwarf_uint16('')))
-    add('DW_OP_call4', parse_arg_struct(structs.Dwarf_uint32('')))
-    add('DW_OP_call_ref', parse_arg_struct(structs.Dwarf_offset('')))
+        add('DW_OP_breg%s' % n, parse_arg(sleb128))
+
+    add('DW_OP_fbreg', parse_arg(sleb128))
+    add('DW_OP_regx', parse_arg(uleb128))
+    add('DW_OP_bregx', parse_args2(uleb128, sleb128))
+    add('DW_OP_piece', parse_arg(uleb128))
+    add('DW_OP_bit_piece', parse_args2(uleb128, uleb128))
+    add('DW_OP_deref_size', parse_arg(int8))
+    add('DW_OP_xderef_size', parse_arg(int8))
+    add('DW_OP_call2', parse_arg(uint16))
+    add('DW_OP_call4', parse_arg(uint32))
+    add('DW_OP_call_ref', parse_arg(section_offset))
     add('DW_OP_implicit_value', parse_blob())
     add('DW_OP_entry_value', parse_nestedexpr())
     add('DW_OP_const_type', parse_typedblob())
-    add('DW_OP_regval_type', parse_arg_struct2(structs.Dwarf_uleb128(''),
-                                                   structs.Dwarf_uleb128('')))
-    add('DW_OP_deref_type', parse_arg_struct2(structs.Dwarf_uint8(''),
-                                              structs.Dwarf_uleb128('')))
-    add('DW_OP_implicit_pointer', parse_arg_struct2(structs.Dwarf_offset(''),
-                                                        structs.Dwarf_sleb128('')))
-    add('DW_OP_convert', parse_arg_struct(structs.Dwarf_uleb128('')))
+    add('DW_OP_regval_type', parse_args2(uleb128, uleb128))
+    add('DW_OP_deref_type', parse_args2(uint8, uleb128))
+    add('DW_OP_implicit_pointer', parse_args2(section_offset, sleb128))
+    add('DW_OP_convert', parse_arg(uleb128))
     add('DW_OP_GNU_entry_value', parse_nestedexpr())
     add('DW_OP_GNU_const_type', parse_typedblob())
-    add('DW_OP_GNU_regval_type', parse_arg_struct2(structs.Dwarf_uleb128(''),
-                                                   structs.Dwarf_uleb128('')))
-    add('DW_OP_GNU_deref_type', parse_arg_struct2(structs.Dwarf_uint8(''),
-                                                   structs.Dwarf_uleb128('')))
-    add('DW_OP_GNU_implicit_pointer', parse_arg_struct2(structs.Dwarf_offset(''),
-                                                        structs.Dwarf_sleb128('')))
-    add('DW_OP_GNU_parameter_ref', parse_arg_struct(structs.Dwarf_offset('')))
-    add('DW_OP_GNU_convert', parse_arg_struct(structs.Dwarf_uleb128('')))
+    add('DW_OP_GNU_regval_type', parse_args2(uleb128, uleb128))
+    add('DW_OP_GNU_deref_type', parse_args2(uint8, uleb128))
+    add('DW_OP_GNU_implicit_pointer', parse_args2(section_offset, sleb128))
+    add('DW_OP_GNU_parameter_ref', parse_arg(section_offset))
+    add('DW_OP_GNU_convert', parse_arg(uleb128))
 
     return table
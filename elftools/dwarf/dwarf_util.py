@@ -53,3 +53,39 @@ def _iter_CUs_in_section(stream, structs, parser):
         yield header
         offset = header.offset_after_length + header.unit_length   
 
+
+def _get_DIE_ranges(die, range_lists, base_address):
+    """Get the address ranges covered by a DIE as a list of (begin, end)
+    pairs, from its DW_AT_low_pc/DW_AT_high_pc or DW_AT_ranges attributes.
+    The list is empty if the DIE has none of them.
+
+    range_lists is the RangeLists object of the DWARF info (may be None if
+    there isn't any) and base_address the base address of the DIE's CU, for
+    the range list entries relative to it.
+    """
+    attributes = die.attributes
+    if 'DW_AT_ranges' in attributes:
+        if range_lists is None:
+            raise DWARFError("The DIE at offset 0x%x has DW_AT_ranges, but "
+                             "there are no range lists" % die.offset)
+        ranges = []
+        for entry in range_lists.get_range_list_at_offset(
+                attributes['DW_AT_ranges'].value, die.cu):
+            if hasattr(entry, 'base_address'):
+                base_address = entry.base_address
+            elif entry.is_absolute:
+                ranges.append((entry.begin_offset, entry.end_offset))
+            else:
+                ranges.append((base_address + entry.begin_offset,
+                               base_address + entry.end_offset))
+        return ranges
+
+    low_pc = attributes.get('DW_AT_low_pc')
+    high_pc = attributes.get('DW_AT_high_pc')
+    if low_pc is None or high_pc is None:
+        return []
+    # DW_AT_high_pc is an address (its value with the DW_FORM_addrx forms),
+    # or a constant: an offset from DW_AT_low_pc
+    if high_pc.form.startswith('DW_FORM_addr'):
+        return [(low_pc.value, high_pc.value)]
+    return [(low_pc.value, low_pc.value + high_pc.value)]
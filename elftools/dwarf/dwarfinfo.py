@@ -2,21 +2,26 @@
 import os
 from collections import namedtuple
 from bisect import bisect_right
+import heapq
 
 from ..construct.lib.container import Container
 from ..common.exceptions import DWARFError
 from ..common.utils import (struct_parse, dwarf_assert,
                             parse_cstring_from_stream)
+from ..common.bufferreader import stream_contents
+from ..common.stringtable import StringTable
 from .structs import DWARFStructs
 from .compileunit import CompileUnit
 from .abbrevtable import AbbrevTable
 from .lineprogram import LineProgram
+from .lineindex import LineIndex
+from .addressindex import AddressIndex
 from .callframe import CallFrameInfo
 from .locationlists import LocationLists, LocationListsPair
 from .ranges import RangeLists, RangeListsPair
 from .aranges import ARanges
 from .namelut import NameLUT
-from .dwarf_util import _get_base_offset
+from .dwarf_util import _get_base_offset, _get_DIE_ranges
 
 
 # Describes a debug section
@@ -74,7 +79,8 @@ class DWARFInfo(object):
             debug_loclists_sec,
             debug_rnglists_sec,
             debug_sup_sec,
-            gnu_debugaltlink_sec
+            gnu_debugaltlink_sec,
+            lazy=False
             ):
         """ config:
                 A DwarfConfig object
@@ -83,8 +89,15 @@ class DWARFInfo(object):
                 DebugSectionDescriptor for a section. Pass None for sections
                 that don't exist. These arguments are best given with
                 keyword syntax.
+
+            lazy:
+                If True, the attribute values of a DIE are only decoded when
+                its attributes are first accessed, so the section streams
+                must stay usable meanwhile (see ELFFile.get_dwarf_info).
+                Otherwise they are decoded when the DIE is created.
         """
         self.config = config
+        self.lazy = lazy
         self.debug_info_sec = debug_info_sec
         self.debug_aranges_sec = debug_aranges_sec
         self.debug_abbrev_sec = debug_abbrev_sec
@@ -121,12 +134,36 @@ class DWARFInfo(object):
         self._abbrevtable_cache = {}
         # Cache for program lines tables: a dict keyed by offset
         self._linetable_cache = {}
+        # The LineIndex made by build_line_index()
+        self._line_index = None
+        # The AddressIndex made by get_address_index()
+        self._address_index = None
+
+        # For cu_for_address(): the ARanges (False if there are none that
+        # can be used), then the (begin, end, CU) address ranges of the top
+        # DIEs of the CUs, in the order of the CUs. They are read from the
+        # CUs yielded by _cu_ranges_iter (None once exhausted), as lookups
+        # missing in aranges need them. The first _cu_segments_count of them
+        # are cut into segments covered by a single CU (see
+        # _make_cu_segments): their start and end addresses and CUs, sorted.
+        self._cu_aranges = None
+        self._cu_ranges = []
+        self._cu_ranges_iter = None
+        self._cu_segments_count = 0
+        self._cu_segment_starts = []
+        self._cu_segment_ends = []
+        self._cu_segment_cus = []
  
         # Cache of compile units and map of their offsets for bisect lookup.
         # Access with .iter_CUs(), .get_CU_containing(), and/or .get_CU_at().
         self._cu_cache = []
         self._cu_offsets_map = []
 
+        # In-memory string tables and section contents, by section
+        # attribute name
+        self._string_tables = {}
+        self._section_data = {}
+
     @property
     def has_debug_info(self):
         """ Return whether this contains debug information.
@@ -245,13 +282,13 @@ class DWARFInfo(object):
         """ Obtain a string from the string table section, given an offset
             relative to the section.
         """
-        return parse_cstring_from_stream(self.debug_str_sec.stream, offset)
+        return self._get_string_table('debug_str_sec').get_bytes(offset)
 
     def get_string_from_linetable(self, offset):
         """ Obtain a string from the string table section, given an offset
             relative to the section.
         """
-        return parse_cstring_from_stream(self.debug_line_str_sec.stream, offset)
+        return self._get_string_table('debug_line_str_sec').get_bytes(offset)
 
     def line_program_for_CU(self, CU):
         """ Given a CU object, fetch the line program it points to from the
@@ -275,6 +312,24 @@ class DWARFInfo(object):
         else:
             return None
 
+    def build_line_index(self):
+        """ Get a LineIndex mapping the (path, line) pairs of the source files
+            of all CUs to address ranges. The index is made once; the line
+            programs of the CUs are decoded as its lookups need them.
+        """
+        if self._line_index is None:
+            self._line_index = LineIndex(self)
+        return self._line_index
+
+    def get_address_index(self):
+        """ Get an AddressIndex mapping addresses to the DIEs of the
+            functions, inlined subroutines and lexical blocks covering them.
+            The index is made on the first call, reading the DIEs of all CUs.
+        """
+        if self._address_index is None:
+            self._address_index = AddressIndex(self)
+        return self._address_index
+
     def has_CFI(self):
         """ Does this dwarf info have a dwarf_frame CFI section?
         """
@@ -349,6 +404,44 @@ class DWARFInfo(object):
         else:
             return None
 
+    def cu_for_address(self, address):
+        """ Get the CU whose code covers the given address, or None if
+            there isn't any.
+
+            The address is looked up in the .debug_aranges section first.
+            If it isn't found there (aranges may list only some of the CUs,
+            or only part of their code), or the section is missing or can't
+            be read, the CUs are found by the address ranges of their top DIE
+            (DW_AT_low_pc/DW_AT_high_pc or DW_AT_ranges). These are read
+            once, CU by CU, until a lookup finds its address, and no DIE
+            besides the top DIE is parsed. When they overlap, the first CU
+            wins.
+        """
+        if self._cu_aranges is None:
+            try:
+                self._cu_aranges = self.get_aranges() or False
+            except NotImplementedError:
+                # Segmented address ranges
+                self._cu_aranges = False
+            self._cu_ranges_iter = self.iter_CUs()
+
+        if self._cu_aranges and self._cu_aranges.entries:
+            offset = self._cu_aranges.cu_offset_at_addr(address)
+            if offset is not None:
+                return self.get_CU_at(offset)
+
+        cu = self._find_cu_range(address)
+        if cu is None and self._cu_ranges_iter is not None:
+            cu = self._read_cu_ranges(address)
+        # Cut the ranges into segments again when their number has doubled,
+        # and once they are all read
+        count = len(self._cu_ranges)
+        if count > 2 * self._cu_segments_count or (
+                self._cu_ranges_iter is None and
+                count > self._cu_segments_count):
+            self._make_cu_segments()
+        return cu
+
     def location_lists(self):
         """ Get a LocationLists object representing the .debug_loc/debug_loclists section of
             the DWARF data, or None if this section doesn't exist.
@@ -379,6 +472,21 @@ class DWARFInfo(object):
         else:
             return None
 
+    def get_section_data(self, section_name):
+        """ Get the whole contents of a debug section as a bytes object,
+            given the name of its attribute (such as 'debug_info_sec').
+            They are read on the first call only. The bytes of an io.BytesIO
+            stream made from a bytes object, as ELFFile makes them, are used
+            without a copy.
+        """
+        data = self._section_data.get(section_name)
+        if data is None:
+            data = stream_contents(getattr(self, section_name).stream)
+            if not isinstance(data, bytes):
+                data = bytes(data)
+            self._section_data[section_name] = data
+        return data
+
     def get_addr(self, cu, addr_index):
         """Provided a CU and an index, retrieves an address from the debug_addr section
         """
@@ -390,6 +498,98 @@ class DWARFInfo(object):
 
     #------ PRIVATE ------#
 
+    def _find_cu_range(self, address):
+        """ Find the CU with a top DIE address range covering address, among
+            those read so far for cu_for_address(). Return None if not found.
+        """
+        i = bisect_right(self._cu_segment_starts, address) - 1
+        if i >= 0 and address < self._cu_segment_ends[i]:
+            return self._cu_segment_cus[i]
+        # The ranges read since the segments were made
+        ranges = self._cu_ranges
+        for i in range(self._cu_segments_count, len(ranges)):
+            begin, end, cu = ranges[i]
+            if begin <= address < end:
+                return cu
+        return None
+
+    def _read_cu_ranges(self, address):
+        """ Read the top DIE address ranges of the next CUs for
+            cu_for_address(), until one covers address. Return its CU, or
+            None if none does.
+        """
+        range_lists = None
+        for cu in self._cu_ranges_iter:
+            top_DIE = cu.get_top_DIE()
+            if 'DW_AT_ranges' in top_DIE.attributes and range_lists is None:
+                range_lists = self.range_lists()
+            low_pc = top_DIE.attributes.get('DW_AT_low_pc')
+            base_address = low_pc.value if low_pc is not None else 0
+            found = False
+            for begin, end in _get_DIE_ranges(
+                    top_DIE, range_lists, base_address):
+                if begin < end:
+                    self._cu_ranges.append((begin, end, cu))
+                    found = found or begin <= address < end
+            if found:
+                return cu
+        self._cu_ranges_iter = None
+        return None
+
+    def _make_cu_segments(self):
+        """ Sweep the boundaries of the top DIE address ranges read for
+            cu_for_address(), finding the CU covering the addresses between
+            each pair: the first one, should ranges overlap.
+        """
+        ranges = self._cu_ranges
+        order = sorted(range(len(ranges)), key=lambda i: ranges[i][0])
+        boundaries = sorted(set([begin for begin, _, _ in ranges] +
+                                [end for _, end, _ in ranges]))
+        starts = []
+        ends = []
+        cus = []
+        # A heap of the (number, end address) of the ranges started so far.
+        # Those that ended are dropped once they reach the top.
+        active = []
+        next_range = 0
+        for start, end in zip(boundaries, boundaries[1:]):
+            while next_range < len(order) and \
+                    ranges[order[next_range]][0] <= start:
+                i = order[next_range]
+                heapq.heappush(active, (i, ranges[i][1]))
+                next_range += 1
+            while active and active[0][1] <= start:
+                heapq.heappop(active)
+            if not active:
+                continue
+
+            cu = ranges[active[0][0]][2]
+            if ends and ends[-1] == start and cus[-1] is cu:
+                ends[-1] = end
+            else:
+                starts.append(start)
+                ends.append(end)
+                cus.append(cu)
+        self._cu_segments_count = len(ranges)
+        self._cu_segment_starts = starts
+        self._cu_segment_ends = ends
+        self._cu_segment_cus = cus
+
+    def _get_string_table(self, section_name):
+        """ Get the StringTable for the debug section in attribute
+            |section_name|, loading it on first use.
+        """
+        table = self._string_tables.get(section_name)
+        if table is None:
+            section = getattr(self, section_name)
+            stream = section.stream
+            table = StringTable(
+                self.get_section_data(section_name),
+                fallback=lambda offset: parse_cstring_from_stream(stream,
+                                                                  offset))
+            self._string_tables[section_name] = table
+        return table
+
     def _parse_CUs_iter(self, offset=0):
         """ Iterate CU objects in order of appearance in the debug_info section.
 
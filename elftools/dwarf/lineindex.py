@@ -0,0 +1,185 @@
+
+from collections import defaultdict
+import posixpath
+
+from ..common.utils import bytes2str
+
+
+class LineIndex(object):
+    """ Maps source lines to the address ranges of their code, across the
+        line programs of all the CUs of a DWARFInfo. Create it with
+        DWARFInfo.build_line_index().
+
+        The files of the line programs are known by their resolved paths:
+        the file name joined to its include directory and to the compilation
+        directory of the CU, normalized. Each path is interned once, and
+        lookups work on path numbers.
+
+        Only the line program headers are read up front. The rows of a CU's
+        line program are decoded and indexed the first time a lookup asks for
+        one of the files listed in its header.
+    """
+    def __init__(self, dwarfinfo):
+        self.dwarfinfo = dwarfinfo
+
+        # Interned paths: a list indexed by path number and the reverse map
+        self._paths = []
+        self._path_numbers = {}
+        # Path numbers by basename, for the lookups of partial paths
+        self._basename_paths = defaultdict(list)
+
+        # For each CU with a line program: [CU, line program, path numbers of
+        # its file register values, whether its rows are indexed]
+        self._units = None
+        # Numbers of the units listing each path, by path number
+        self._path_units = defaultdict(list)
+        # Address ranges of the indexed units, by (path number, line)
+        self._ranges = defaultdict(list)
+
+    def get_paths(self, prefix=''):
+        """ Get the sorted list of the resolved paths of the source files
+            that start with |prefix| (all the paths by default)
+        """
+        self._load_units()
+        return sorted(path for path in self._paths if path.startswith(prefix))
+
+    def match_paths(self, path):
+        """ Get the sorted list of the resolved paths matching |path|.
+
+            A full path matches itself. Otherwise |path| is taken as the
+            trailing part of paths, one or more of their components: 'foo.c'
+            and 'src/foo.c' both match '/home/me/src/foo.c'.
+        """
+        return sorted(self._paths[number]
+                      for number in self._match_path_numbers(path))
+
+    def lookup_line(self, path, line):
+        """ Get the address ranges of the code of |line| in the source files
+            matching |path| (see match_paths), as a sorted list of
+            (begin, end) tuples with adjacent ranges merged. The list is empty
+            when no code was generated for that line.
+        """
+        ranges = []
+        for number in self._match_path_numbers(path):
+            for unit_number in self._path_units[number]:
+                self._index_unit(unit_number)
+            ranges.extend(self._ranges.get((number, line), ()))
+
+        ranges.sort()
+        merged = []
+        for begin, end in ranges:
+            if merged and begin <= merged[-1][1]:
+                if end > merged[-1][1]:
+                    merged[-1] = (merged[-1][0], end)
+            else:
+                merged.append((begin, end))
+        return merged
+
+    #------ PRIVATE ------#
+
+    def _match_path_numbers(self, path):
+        """ The numbers of the interned paths matching |path|
+        """
+        self._load_units()
+        if isinstance(path, bytes):
+            path = bytes2str(path)
+        path = posixpath.normpath(path)
+
+        number = self._path_numbers.get(path)
+        if number is not None:
+            return [number]
+        suffix = '/' + path
+        return [number
+                for number in self._basename_paths.get(
+                    posixpath.basename(path), ())
+                if self._paths[number].endswith(suffix)]
+
+    def _intern_path(self, path):
+        """ Get the number of |path|, interning it if it's new
+        """
+        number = self._path_numbers.get(path)
+        if number is None:
+            number = len(self._paths)
+            self._paths.append(path)
+            self._path_numbers[path] = number
+            self._basename_paths[posixpath.basename(path)].append(number)
+        return number
+
+    def _load_units(self):
+        """ Read the line program header of every CU, interning the paths of
+            the files they list
+        """
+        if self._units is not None:
+            return
+        self._units = []
+        for cu in self.dwarfinfo.iter_CUs():
+            lineprog = self.dwarfinfo.line_program_for_CU(cu)
+            if lineprog is None:
+                continue
+            file_paths = self._get_file_paths(cu, lineprog)
+            unit_number = len(self._units)
+            self._units.append([cu, lineprog, file_paths, False])
+            for number in set(file_paths):
+                if number is not None:
+                    self._path_units[number].append(unit_number)
+
+    def _get_file_paths(self, cu, lineprog):
+        """ Get a list of the path numbers of the files of |lineprog|,
+            indexed by the values of the file register
+        """
+        comp_dir = cu.get_top_DIE().attributes.get('DW_AT_comp_dir')
+        comp_dir = _to_str(comp_dir.value) if comp_dir is not None else ''
+        include_directory = lineprog['include_directory']
+
+        # Since DWARFv5, files and directories are numbered from 0, and
+        # directory 0 is the compilation directory. Before that, they are
+        # numbered from 1, directory 0 standing for the compilation directory.
+        if lineprog['version'] >= 5:
+            numbers = []
+            dir_base = 0
+        else:
+            numbers = [None]
+            dir_base = 1
+
+        for file_entry in lineprog['file_entry']:
+            dir_index = (file_entry.dir_index or 0) - dir_base
+            if 0 <= dir_index < len(include_directory):
+                directory = posixpath.join(
+                    comp_dir, _to_str(include_directory[dir_index]))
+            else:
+                directory = comp_dir
+            path = posixpath.join(directory, _to_str(file_entry.name))
+            numbers.append(self._intern_path(posixpath.normpath(path)))
+        return numbers
+
+    def _index_unit(self, unit_number):
+        """ Decode the rows of a unit's line program and add the address
+            ranges of its lines to the index
+        """
+        unit = self._units[unit_number]
+        cu, lineprog, file_paths, indexed = unit
+        if indexed:
+            return
+        sequences = lineprog.get_sequences()
+        # Files defined with DW_LNE_define_file are only known after decoding
+        if len(file_paths) < len(lineprog['file_entry']) + (
+                lineprog['version'] < 5):
+            file_paths = self._get_file_paths(cu, lineprog)
+
+        ranges = self._ranges
+        for seq in sequences:
+            addresses = seq.address
+            ends = addresses[1:]
+            ends.append(seq.end_address)
+            # A row covers the addresses up to the next row
+            for begin, end, file, line in zip(
+                    addresses, ends, seq.file, seq.line):
+                if begin < end and file < len(file_paths):
+                    number = file_paths[file]
+                    if number is not None:
+                        ranges[number, line].append((begin, end))
+        unit[3] = True
+
+
+def _to_str(name):
+    return bytes2str(name) if isinstance(name, bytes) else str(name)
@@ -1,9 +1,14 @@
 
-import os
+from array import array
+from bisect import bisect_right
 import copy
+import heapq
 from collections import namedtuple
 
 from ..common.utils import struct_parse, dwarf_assert
+from ..common.bufferreader import (
+    BufferReader, decode_uleb128, decode_sleb128)
+from ..common.exceptions import ELFParseError
 from .constants import *
 
 
@@ -11,6 +16,18 @@ from .constants import *
 LineProgramEntry = namedtuple(
     'LineProgramEntry', 'command is_extended args state')
 
+# A row of the line table, as returned by LineProgram.lookup
+LineTableRow = namedtuple(
+    'LineTableRow',
+    'address file line column is_stmt basic_block prologue_end '
+    'epilogue_begin')
+
+# Bits of LineTableSequence.flags
+LINE_FLAG_IS_STMT = 1
+LINE_FLAG_BASIC_BLOCK = 2
+LINE_FLAG_PROLOGUE_END = 4
+LINE_FLAG_EPILOGUE_BEGIN = 8
+
 
 class LineState(object):
     """ Represents a line program state (or a "row" in the matrix
@@ -42,6 +59,63 @@ class LineState(object):
         return '\n'.join(a) + '>\n'
 
 
+class LineTableSequence(object):
+    """ The rows of a sequence of the line table: a run of increasing
+        addresses ended by DW_LNE_end_sequence. The rows are stored column by
+        column, in arrays indexed by row number.
+
+        Accessible attributes:
+
+            address, file, line, column:
+                The registers of each row
+
+            flags:
+                The boolean registers of each row, as LINE_FLAG_* bits
+
+            end_address:
+                The address of the end_sequence row: the first byte after
+                the sequence. That row is not stored, the other registers
+                being meaningless for it.
+
+            index:
+                The number of the sequence in the order of the line program
+    """
+    def __init__(self):
+        self.address = array('Q')
+        self.file = array('Q')
+        self.line = array('q')
+        self.column = array('Q')
+        self.flags = array('B')
+        self.end_address = None
+        self.index = None
+
+    def __len__(self):
+        return len(self.address)
+
+    def get_row(self, n):
+        """ Get row #n as a LineTableRow
+        """
+        flags = self.flags[n]
+        return LineTableRow(
+            address=self.address[n],
+            file=self.file[n],
+            line=self.line[n],
+            column=self.column[n],
+            is_stmt=bool(flags & LINE_FLAG_IS_STMT),
+            basic_block=bool(flags & LINE_FLAG_BASIC_BLOCK),
+            prologue_end=bool(flags & LINE_FLAG_PROLOGUE_END),
+            epilogue_begin=bool(flags & LINE_FLAG_EPILOGUE_BEGIN))
+
+    def lookup(self, address):
+        """ Get the number of the row describing |address|, or None if the
+            sequence doesn't cover it
+        """
+        if not self.address or not (
+                self.address[0] <= address < self.end_address):
+            return None
+        return bisect_right(self.address, address) - 1
+
+
 class LineProgram(object):
     """ Builds a "line table", which is essentially the matrix described
         in section 6.2 of DWARFv3. It's a list of LineState objects,
@@ -74,6 +148,17 @@ class LineProgram(object):
         self.program_start_offset = program_start_offset
         self.program_end_offset = program_end_offset
         self._decoded_entries = None
+        self._sequences = None
+        # The address space cut into segments covered by the same sequence:
+        # their start and end addresses, and the number of that sequence in
+        # self._sequences, sorted by address
+        self._segment_starts = None
+        self._segment_ends = None
+        self._segment_sequences = None
+        # Set once the file entries of DW_LNE_define_file instructions were
+        # appended to the header
+        self._defined_files = False
+        self._special_opcodes = None
 
     def get_entries(self):
         """ Get the decoded entries for this line program. Return a list of
@@ -88,6 +173,34 @@ class LineProgram(object):
             self._decoded_entries = self._decode_line_program()
         return self._decoded_entries
 
+    def get_sequences(self):
+        """ Get the line table as a list of LineTableSequence objects, sorted
+            by address. Only the rows are decoded, which is much cheaper than
+            get_entries(). Sequences with addresses past the end of the
+            address space (those of discarded code moved to address -1) are
+            left out.
+        """
+        if self._sequences is None:
+            sequences = self._decode_rows()
+            sequences.sort(key=lambda seq: (seq.address[0], seq.index))
+            self._sequences = sequences
+            self._make_segments(sequences)
+        return self._sequences
+
+    def lookup(self, address):
+        """ Find the row of the line table describing |address|. Return a
+            LineTableRow, or None if no sequence covers the address.
+
+            This is a binary search over the segments covered by the same
+            sequence (see _make_segments), then over the rows of the sequence.
+        """
+        sequences = self.get_sequences()
+        i = bisect_right(self._segment_starts, address) - 1
+        if i < 0 or address >= self._segment_ends[i]:
+            return None
+        seq = sequences[self._segment_sequences[i]]
+        return seq.get_row(seq.lookup(address))
+
     #------ PRIVATE ------#
 
     def __getitem__(self, name):
@@ -113,12 +226,12 @@ class LineProgram(object):
             # Add an entry that doesn't visibly set a new state
             entries.append(LineProgramEntry(cmd, is_extended, args, None))
 
-        offset = self.program_start_offset
-        while offset < self.program_end_offset:
-            opcode = struct_parse(
-                self.structs.Dwarf_uint8(''),
-                self.stream,
-                offset)
+        reader = BufferReader.from_stream(
+            self.stream, self.program_start_offset,
+            self.structs.little_endian)
+        address_size = self.structs.address_size
+        while reader.offset < self.program_end_offset:
+            opcode = reader.u8()
 
             # As an exercise in avoiding premature optimization, if...elif
             # chains are used here for standard and extended opcodes instead
@@ -143,10 +256,8 @@ class LineProgram(object):
             elif opcode == 0:
                 # Extended opcode: start with a zero byte, followed by
                 # instruction size and the instruction itself.
-                inst_len = struct_parse(self.structs.Dwarf_uleb128(''),
-                                        self.stream)
-                ex_opcode = struct_parse(self.structs.Dwarf_uint8(''),
-                                         self.stream)
+                inst_len = reader.uleb()
+                ex_opcode = reader.u8()
 
                 if ex_opcode == DW_LNE_end_sequence:
                     state.end_sequence = True
@@ -155,48 +266,40 @@ class LineProgram(object):
                     # reset state
                     state = LineState(self.header['default_is_stmt'])
                 elif ex_opcode == DW_LNE_set_address:
-                    operand = struct_parse(self.structs.Dwarf_target_addr(''),
-                                           self.stream)
+                    operand = reader.uint(address_size)
                     state.address = operand
                     add_entry_old_state(ex_opcode, [operand], is_extended=True)
                 elif ex_opcode == DW_LNE_define_file:
-                    operand = struct_parse(
-                        self.structs.Dwarf_lineprog_file_entry, self.stream)
-                    self['file_entry'].append(operand)
+                    operand = self._define_file(reader)
                     add_entry_old_state(ex_opcode, [operand], is_extended=True)
                 elif ex_opcode == DW_LNE_set_discriminator:
-                    operand = struct_parse(self.structs.Dwarf_uleb128(''),
-                                           self.stream)
+                    operand = reader.uleb()
                     state.discriminator = operand
                 else:
                     # Unknown, but need to roll forward the stream because the
                     # length is specified. Seek forward inst_len - 1 because
                     # we've already read the extended opcode, which takes part
                     # in the length.
-                    self.stream.seek(inst_len - 1, os.SEEK_CUR)
+                    reader.offset += inst_len - 1
             else: # 0 < opcode < opcode_base
                 # Standard opcode
                 if opcode == DW_LNS_copy:
                     add_entry_new_state(opcode, [])
                 elif opcode == DW_LNS_advance_pc:
-                    operand = struct_parse(self.structs.Dwarf_uleb128(''),
-                                           self.stream)
+                    operand = reader.uleb()
                     address_addend = (
                         operand * self.header['minimum_instruction_length'])
                     state.address += address_addend
                     add_entry_old_state(opcode, [address_addend])
                 elif opcode == DW_LNS_advance_line:
-                    operand = struct_parse(self.structs.Dwarf_sleb128(''),
-                                           self.stream)
+                    operand = reader.sleb()
                     state.line += operand
                 elif opcode == DW_LNS_set_file:
-                    operand = struct_parse(self.structs.Dwarf_uleb128(''),
-                                           self.stream)
+                    operand = reader.uleb()
                     state.file = operand
                     add_entry_old_state(opcode, [operand])
                 elif opcode == DW_LNS_set_column:
-                    operand = struct_parse(self.structs.Dwarf_uleb128(''),
-                                           self.stream)
+                    operand = reader.uleb()
                     state.column = operand
                     add_entry_old_state(opcode, [operand])
                 elif opcode == DW_LNS_negate_stmt:
@@ -212,8 +315,7 @@ class LineProgram(object):
                     state.address += address_addend
                     add_entry_old_state(opcode, [address_addend])
                 elif opcode == DW_LNS_fixed_advance_pc:
-                    operand = struct_parse(self.structs.Dwarf_uint16(''),
-                                           self.stream)
+                    operand = reader.u16()
                     state.address += operand
                     add_entry_old_state(opcode, [operand])
                 elif opcode == DW_LNS_set_prologue_end:
@@ -223,12 +325,234 @@ class LineProgram(object):
                     state.epilogue_begin = True
                     add_entry_old_state(opcode, [])
                 elif opcode == DW_LNS_set_isa:
-                    operand = struct_parse(self.structs.Dwarf_uleb128(''),
-                                           self.stream)
+                    operand = reader.uleb()
                     state.isa = operand
                     add_entry_old_state(opcode, [operand])
                 else:
                     dwarf_assert(False, 'Invalid standard line program opcode: %s' % (
                         opcode,))
-            offset = self.stream.tell()
+        self._defined_files = True
         return entries
+
+    def _decode_rows(self):
+        """ Run the line program, keeping only the rows of the line table.
+            Return a list of LineTableSequence objects, in program order.
+
+            This walks the program bytes directly. Special opcodes, the bulk
+            of a program, are looked up in the table made by
+            _get_special_opcodes.
+        """
+        sequences = []
+        header = self.header
+        default_is_stmt = header['default_is_stmt']
+        opcode_base = header['opcode_base']
+        line_range = header['line_range']
+        min_inst_length = header['minimum_instruction_length']
+        max_ops = header['maximum_operations_per_instruction']
+        special_opcodes = self._get_special_opcodes()
+        const_add_pc = ((255 - opcode_base) // line_range) * min_inst_length
+
+        reader = BufferReader.from_stream(
+            self.stream, self.program_start_offset,
+            self.structs.little_endian)
+        data = reader.data
+        offset = reader.offset
+        end_offset = self.program_end_offset
+        address_size = self.structs.address_size
+        # Sequences running past the end of the address space are dropped:
+        # the code the linker discarded may be moved to address -1
+        address_limit = 1 << (8 * address_size)
+
+        # The rows of the current sequence
+        addresses = []
+        files = []
+        lines = []
+        columns = []
+        row_flags = []
+
+        address = op_index = column = 0
+        file = line = 1
+        is_stmt = LINE_FLAG_IS_STMT if default_is_stmt else 0
+        flags = 0
+        try:
+            while offset < end_offset:
+                opcode = data[offset]
+                offset += 1
+                if opcode >= opcode_base:
+                    if max_ops == 1:
+                        address_advance, line_advance = special_opcodes[opcode]
+                        address += address_advance
+                        line += line_advance
+                    else:
+                        # VLIW: follow the recipe in 6.2.5.1
+                        adjusted_opcode = opcode - opcode_base
+                        operation_advance = adjusted_opcode // line_range
+                        address += min_inst_length * (
+                            (op_index + operation_advance) // max_ops)
+                        op_index = (op_index + operation_advance) % max_ops
+                        line += special_opcodes[opcode][1]
+                elif opcode == DW_LNS_advance_pc:
+                    operand = data[offset]
+                    offset += 1
+                    if operand >= 0x80:
+                        operand, offset = decode_uleb128(data, offset - 1)
+                    address += operand * min_inst_length
+                    continue
+                elif opcode == DW_LNS_advance_line:
+                    operand, offset = decode_sleb128(data, offset)
+                    line += operand
+                    continue
+                elif opcode == DW_LNS_set_column:
+                    column = data[offset]
+                    offset += 1
+                    if column >= 0x80:
+                        column, offset = decode_uleb128(data, offset - 1)
+                    continue
+                elif opcode == DW_LNS_negate_stmt:
+                    is_stmt ^= LINE_FLAG_IS_STMT
+                    continue
+                elif opcode == DW_LNS_copy:
+                    pass
+                elif opcode == DW_LNS_const_add_pc:
+                    address += const_add_pc
+                    continue
+                elif opcode == DW_LNS_set_file:
+                    file, offset = decode_uleb128(data, offset)
+                    continue
+                elif opcode == 0:
+                    inst_len, offset = decode_uleb128(data, offset)
+                    ex_opcode = data[offset]
+                    offset += 1
+                    if ex_opcode == DW_LNE_end_sequence:
+                        if addresses and address <= address_limit and \
+                                max(addresses) < address_limit:
+                            seq = LineTableSequence()
+                            seq.address.extend(addresses)
+                            seq.file.extend(files)
+                            seq.line.extend(lines)
+                            seq.column.extend(columns)
+                            seq.flags.extend(row_flags)
+                            seq.end_address = address
+                            seq.index = len(sequences)
+                            sequences.append(seq)
+                        del addresses[:], files[:], lines[:]
+                        del columns[:], row_flags[:]
+                        address = op_index = column = 0
+                        file = line = 1
+                        is_stmt = LINE_FLAG_IS_STMT if default_is_stmt else 0
+                        flags = 0
+                    else:
+                        reader.offset = offset
+                        if ex_opcode == DW_LNE_set_address:
+                            address = reader.uint(address_size)
+                        elif ex_opcode == DW_LNE_define_file:
+                            self._define_file(reader)
+                        else:
+                            # Includes DW_LNE_set_discriminator
+                            reader.offset += inst_len - 1
+                        offset = reader.offset
+                    continue
+                elif opcode == DW_LNS_fixed_advance_pc:
+                    reader.offset = offset
+                    address += reader.u16()
+                    offset = reader.offset
+                    continue
+                elif opcode == DW_LNS_set_basic_block:
+                    flags |= LINE_FLAG_BASIC_BLOCK
+                    continue
+                elif opcode == DW_LNS_set_prologue_end:
+                    flags |= LINE_FLAG_PROLOGUE_END
+                    continue
+                elif opcode == DW_LNS_set_epilogue_begin:
+                    flags |= LINE_FLAG_EPILOGUE_BEGIN
+                    continue
+                elif opcode == DW_LNS_set_isa:
+                    _, offset = decode_uleb128(data, offset)
+                    continue
+                else:
+                    dwarf_assert(False, 'Invalid standard line program opcode: %s' % (
+                        opcode,))
+
+                # Special opcodes and DW_LNS_copy append a row
+                addresses.append(address)
+                files.append(file)
+                lines.append(line)
+                columns.append(column)
+                row_flags.append(flags | is_stmt)
+                flags = 0
+        except IndexError:
+            raise ELFParseError(
+                'line program at offset %#x ends past the end of the section'
+                % self.program_start_offset)
+
+        self._defined_files = True
+        return sequences
+
+    def _make_segments(self, sequences):
+        """ Sweep the boundaries of |sequences| (sorted by address), finding
+            the sequence covering the addresses between each pair. Sequences
+            may overlap (code discarded by the linker ends up at address 0,
+            for one): the first covering an address in the program wins.
+        """
+        starts = []
+        ends = []
+        numbers = []
+        boundaries = sorted(set(
+            [seq.address[0] for seq in sequences] +
+            [seq.end_address for seq in sequences]))
+        # A heap of the (index, end address, number) of the sequences started
+        # so far. Those that ended are dropped once they reach the top.
+        active = []
+        next_seq = 0
+        for start, end in zip(boundaries, boundaries[1:]):
+            while next_seq < len(sequences) and \
+                    sequences[next_seq].address[0] <= start:
+                seq = sequences[next_seq]
+                heapq.heappush(active, (seq.index, seq.end_address, next_seq))
+                next_seq += 1
+            while active and active[0][1] <= start:
+                heapq.heappop(active)
+            if not active:
+                continue
+
+            number = active[0][2]
+            if ends and ends[-1] == start and numbers[-1] == number:
+                ends[-1] = end
+            else:
+                starts.append(start)
+                ends.append(end)
+                numbers.append(number)
+        self._segment_starts = starts
+        self._segment_ends = ends
+        self._segment_sequences = numbers
+
+    def _get_special_opcodes(self):
+        """ Get a table of the (address advance, line advance) made by each
+            special opcode, indexed by opcode (None below opcode_base). The
+            address advances are for maximum_operations_per_instruction = 1.
+        """
+        if self._special_opcodes is None:
+            opcode_base = self['opcode_base']
+            line_range = self['line_range']
+            table = [None] * 256
+            for opcode in range(opcode_base, 256):
+                adjusted_opcode = opcode - opcode_base
+                table[opcode] = (
+                    (adjusted_opcode // line_range) *
+                        self['minimum_instruction_length'],
+                    self['line_base'] + adjusted_opcode % line_range)
+            self._special_opcodes = table
+        return self._special_opcodes
+
+    def _define_file(self, reader):
+        """ Parse the file entry of a DW_LNE_define_file instruction at the
+            offset of |reader|, and move past it. The entry is appended to
+            the header's file_entry the first time the program is run.
+        """
+        operand = struct_parse(
+            self.structs.Dwarf_lineprog_file_entry, self.stream,
+            reader.offset)
+        reader.offset = self.stream.tell()
+        if not self._defined_files:
+            self['file_entry'].append(operand)
+        return operand
@@ -3,6 +3,7 @@ import os
 from collections import namedtuple
 from ..common.exceptions import DWARFError
 from ..common.utils import struct_parse
+from ..common.bufferreader import BufferReader
 from .dwarf_util import _iter_CUs_in_section
 
 LocationExpr = namedtuple('LocationExpr', 'loc_expr')
@@ -79,6 +80,7 @@ class LocationLists(object):
         self.dwarfinfo = dwarfinfo
         self.version = version
         self._max_addr = 2 ** (self.structs.address_size * 8) - 1
+        self._reader = None
 
     def get_location_list_at_offset(self, offset, die=None):
         """ Get a location list at the given offset in the section.
@@ -193,29 +195,37 @@ class LocationLists(object):
 
     #------ PRIVATE ------#
 
+    def _get_reader(self):
+        """ Get a BufferReader over the section
+        """
+        if self._reader is None:
+            self._reader = BufferReader.from_stream(
+                self.stream, little_endian=self.structs.little_endian)
+        return self._reader
+
     def _parse_location_list_from_stream(self):
+        # Parse from the current stream position, and leave the stream after
+        # the list
+        reader = self._get_reader()
+        reader.offset = self.stream.tell()
+        address_size = self.structs.address_size
         lst = []
         while True:
-            entry_offset = self.stream.tell()
-            begin_offset = struct_parse(
-                self.structs.Dwarf_target_addr(''), self.stream)
-            end_offset = struct_parse(
-                self.structs.Dwarf_target_addr(''), self.stream)
+            entry_offset = reader.offset
+            begin_offset = reader.uint(address_size)
+            end_offset = reader.uint(address_size)
             if begin_offset == 0 and end_offset == 0:
                 # End of list - we're done.
                 break
             elif begin_offset == self._max_addr:
                 # Base address selection entry
-                entry_length = self.stream.tell() - entry_offset
+                entry_length = reader.offset - entry_offset
                 lst.append(BaseAddressEntry(entry_offset=entry_offset, entry_length=entry_length, base_address=end_offset))
             else:
                 # Location list entry
-                expr_len = struct_parse(
-                    self.structs.Dwarf_uint16(''), self.stream)
-                loc_expr = [struct_parse(self.structs.Dwarf_uint8(''),
-                                         self.stream)
-                                for i in range(expr_len)]
-                entry_length = self.stream.tell() - entry_offset
+                expr_len = reader.u16()
+                loc_expr = list(reader.read(expr_len))
+                entry_length = reader.offset - entry_offset
                 lst.append(LocationEntry(
                     entry_offset=entry_offset,
                     entry_length=entry_length,
@@ -223,6 +233,7 @@ class LocationLists(object):
                     end_offset=end_offset,
                     loc_expr=loc_expr,
                     is_absolute = False))
+        self.stream.seek(reader.offset)
         return lst
 
     def _parse_location_list_from_stream_v5(self, cu=None):
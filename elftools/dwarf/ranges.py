@@ -3,6 +3,7 @@ import os
 from collections import namedtuple
 
 from ..common.utils import struct_parse
+from ..common.bufferreader import BufferReader
 from ..common.exceptions import DWARFError
 from .dwarf_util import _iter_CUs_in_section
 
@@ -89,6 +90,7 @@ class RangeLists(object):
         self._max_addr = 2 ** (self.structs.address_size * 8) - 1
         self.version = version
         self._dwarfinfo = dwarfinfo
+        self._reader = None
 
     def get_range_list_at_offset(self, offset, cu=None):
         """ Get a range list at the given offset in the section.
@@ -145,19 +147,28 @@ class RangeLists(object):
 
     #------ PRIVATE ------#
 
+    def _get_reader(self):
+        """ Get a BufferReader over the section
+        """
+        if self._reader is None:
+            self._reader = BufferReader.from_stream(
+                self.stream, little_endian=self.structs.little_endian)
+        return self._reader
+
     def _parse_range_list_from_stream(self, cu):
         if self.version >= 5:
             return list(entry_translate[entry.entry_type](entry, cu)
                 for entry
                 in struct_parse(self.structs.Dwarf_rnglists_entries, self.stream))
         else:
+            reader = self._get_reader()
+            reader.offset = self.stream.tell()
+            address_size = self.structs.address_size
             lst = []
             while True:
-                entry_offset = self.stream.tell()
-                begin_offset = struct_parse(
-                    self.structs.Dwarf_target_addr(''), self.stream)
-                end_offset = struct_parse(
-                    self.structs.Dwarf_target_addr(''), self.stream)
+                entry_offset = reader.offset
+                begin_offset = reader.uint(address_size)
+                end_offset = reader.uint(address_size)
                 if begin_offset == 0 and end_offset == 0:
                     # End of list - we're done.
                     break
@@ -168,8 +179,9 @@ class RangeLists(object):
                     # Range entry
                     lst.append(RangeEntry(
                         entry_offset=entry_offset,
-                        entry_length=self.stream.tell() - entry_offset,
+                        entry_length=reader.offset - entry_offset,
                         begin_offset=begin_offset,
                         end_offset=end_offset,
                         is_absolute=False))
+            self.stream.seek(reader.offset)
             return lst
@@ -49,6 +49,10 @@ class DWARFStructs(object):
                 Abbreviation table declaration - doesn't include the initial
                 code, only the contents.
 
+            Dwarf_abbrev_names:
+                The (tag, children_flag, attribute name, form) value to name
+                mappings of the Enums of Dwarf_abbrev_declaration
+
             Dwarf_dw_form (+):
                 A dictionary mapping 'DW_FORM_*' keys into construct Structs
                 that parse such forms. These Structs have already been given
@@ -226,6 +230,12 @@ class DWARFStructs(object):
                     Enum(self.Dwarf_uleb128('form'), **ENUM_DW_FORM),
                     If(lambda ctx: ctx['form'] == 'DW_FORM_implicit_const',
                         self.Dwarf_sleb128('value')))))
+        # The same value to name mappings, for AbbrevTable to decode tables
+        # without going through construct
+        self.Dwarf_abbrev_names = tuple(
+            dict((v, k) for k, v in enum.items() if k != '_default_')
+            for enum in (ENUM_DW_TAG, ENUM_DW_CHILDREN, ENUM_DW_AT,
+                         ENUM_DW_FORM))
 
     def _create_debugsup(self):
         # We don't care about checksums, for now.
@@ -8,22 +8,38 @@ from .enums import ENUM_D_TAG
 from .segments import Segment
 from .relocation import RelocationTable
 from ..common.exceptions import ELFError
-from ..common.utils import elf_assert, struct_parse, parse_cstring_from_stream
+from ..common.stringtable import StringTable
+from ..common.utils import (elf_assert, struct_parse,
+    parse_cstring_from_stream, read_stream_data)
 
 
 class _DynamicStringTable(object):
     """ Bare string table based on values found via ELF dynamic tags and
         loadable segments only.  Good enough for get_string() only.
+
+        If the size of the table is known (from DT_STRSZ), it is loaded into
+        memory on first use.
     """
-    def __init__(self, stream, table_offset):
+    def __init__(self, stream, table_offset, size=None):
         self._stream = stream
         self._table_offset = table_offset
+        self._size = size
+        self._table = None
 
     def get_string(self, offset):
         """ Get the string stored at the given offset in this string table.
         """
-        s = parse_cstring_from_stream(self._stream, self._table_offset + offset)
-        return s.decode('utf-8') if s else ''
+        if self._table is None:
+            data = b''
+            if self._size is not None:
+                data = read_stream_data(self._stream, self._table_offset,
+                                        self._size)
+            self._table = StringTable(data, fallback=self._read_string)
+        return self._table.get_string(offset)
+
+    def _read_string(self, offset):
+        return parse_cstring_from_stream(self._stream,
+                                         self._table_offset + offset)
 
 
 class DynamicTag(object):
@@ -34,17 +50,21 @@ class DynamicTag(object):
         tags (those listed in the _HANDLED_TAGS set below), creates additional
         attributes for convenience. For example, .soname will contain the actual
         value of DT_SONAME (fetched from the dynamic symbol table).
+
+        If the entry holds d_tag as an integer (see ELFFile's raw_enums),
+        tag_name has to give its name for the special tags to be recognized.
     """
     _HANDLED_TAGS = frozenset(
         ['DT_NEEDED', 'DT_RPATH', 'DT_RUNPATH', 'DT_SONAME',
          'DT_SUNW_FILTER'])
 
-    def __init__(self, entry, stringtable):
+    def __init__(self, entry, stringtable, tag_name=None):
         if stringtable is None:
             raise ELFError('Creating DynamicTag without string table')
         self.entry = entry
-        if entry.d_tag in self._HANDLED_TAGS:
-            setattr(self, entry.d_tag[3:].lower(),
+        self._tag_name = entry.d_tag if tag_name is None else tag_name
+        if self._tag_name in self._HANDLED_TAGS:
+            setattr(self, self._tag_name[3:].lower(),
                     stringtable.get_string(self.entry.d_val))
 
     def __getitem__(self, name):
@@ -56,8 +76,8 @@ class DynamicTag(object):
         return '<DynamicTag (%s): %r>' % (self.entry.d_tag, self.entry)
 
     def __str__(self):
-        if self.entry.d_tag in self._HANDLED_TAGS:
-            s = '"%s"' % getattr(self, self.entry.d_tag[3:].lower())
+        if self._tag_name in self._HANDLED_TAGS:
+            s = '"%s"' % getattr(self, self._tag_name[3:].lower())
         else:
             s = '%#x' % self.entry.d_ptr
         return '<DynamicTag (%s) %s>' % (self.entry.d_tag, s)
@@ -126,7 +146,10 @@ class Dynamic(object):
         # dynamic string table.
         _, table_offset = self.get_table_offset('DT_STRTAB')
         if table_offset is not None:
-            self._stringtable = _DynamicStringTable(self._stream, table_offset)
+            strsz = next(self._iter_tags(type='DT_STRSZ'), None)
+            self._stringtable = _DynamicStringTable(
+                self._stream, table_offset,
+                None if strsz is None else strsz['d_val'])
             return self._stringtable
 
         # That didn't work for some reason.  Let's use the section header
@@ -139,18 +162,22 @@ class Dynamic(object):
         """
         if self._empty:
             return
+        enum_name = self.elfstructs.enum_name
         for n in itertools.count():
             tag = self._get_tag(n)
-            if type is None or tag['d_tag'] == type:
+            d_tag = tag['d_tag']
+            tag_name = enum_name('d_tag', d_tag)
+            if type is None or d_tag == type or tag_name == type:
                 yield tag
-            if tag['d_tag'] == 'DT_NULL':
+            if tag_name == 'DT_NULL':
                 break
 
     def iter_tags(self, type=None):
-        """ Yield all tags (limit to |type| if specified)
+        """ Yield all tags (limit to |type| if specified). With raw_enums,
+            |type| may be given as a name or an integer.
         """
         for tag in self._iter_tags(type=type):
-            yield DynamicTag(tag, self._get_stringtable())
+            yield self._make_tag(tag)
 
     def _get_tag(self, n):
         """ Get the raw tag at index #n from the file
@@ -159,14 +186,20 @@ class Dynamic(object):
             raise IndexError(n)
         offset = self._offset + n * self._tagsize
         return struct_parse(
-            self.elfstructs.Elf_Dyn,
+            self.elfstructs.Elf_Dyn_codec,
             self._stream,
             stream_pos=offset)
 
+    def _make_tag(self, tag):
+        """ Wrap the raw tag in a DynamicTag object
+        """
+        return DynamicTag(tag, self._get_stringtable(),
+                          self.elfstructs.enum_name('d_tag', tag['d_tag']))
+
     def get_tag(self, n):
         """ Get the tag at index #n from the file (DynamicTag object)
         """
-        return DynamicTag(self._get_tag(n), self._get_stringtable())
+        return self._make_tag(self._get_tag(n))
 
     def num_tags(self):
         """ Number of dynamic tags in the file, including the DT_NULL tag
@@ -176,7 +209,7 @@ class Dynamic(object):
 
         for n in itertools.count():
             tag = self.get_tag(n)
-            if tag.entry.d_tag == 'DT_NULL':
+            if self.elfstructs.enum_name('d_tag', tag['d_tag']) == 'DT_NULL':
                 self._num_tags = n + 1
                 return self._num_tags
 
@@ -223,7 +256,8 @@ class DynamicSection(Section, Dynamic):
         Section.__init__(self, header, name, elffile)
         stringtable = elffile.get_section(header['sh_link'])
         Dynamic.__init__(self, self.stream, self.elffile, stringtable,
-            self['sh_offset'], self['sh_type'] == 'SHT_NOBITS')
+            self['sh_offset'],
+            self.structs.enum_name('sh_type', self['sh_type']) == 'SHT_NOBITS')
 
 
 class DynamicSegment(Segment, Dynamic):
@@ -279,7 +313,8 @@ class DynamicSegment(Segment, Dynamic):
             nearest_ptr = None
             for tag in self.iter_tags():
                 tag_ptr = tag['d_ptr']
-                if tag['d_tag'] == 'DT_SYMENT':
+                if (self.elfstructs.enum_name('d_tag', tag['d_tag']) ==
+                        'DT_SYMENT'):
                     if self._symbol_size != tag['d_val']:
                         # DT_SYMENT is the size of one symbol entry. It must be
                         # the same as returned by Elf_Sym.sizeof.
@@ -312,7 +347,7 @@ class DynamicSegment(Segment, Dynamic):
             raise ELFError('Segment does not contain DT_SYMTAB.')
 
         symbol = struct_parse(
-            self.elfstructs.Elf_Sym,
+            self.elfstructs.Elf_Sym_codec,
             self._stream,
             stream_pos=tab_offset + index * self._symbol_size)
 
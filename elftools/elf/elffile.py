@@ -18,13 +18,15 @@ except ImportError:
         PAGESIZE = 4096
 
 from ..common.exceptions import ELFError, ELFParseError
-from ..common.utils import struct_parse, elf_assert
+from ..common.utils import struct_parse, elf_assert, read_stream_data
+from ..common.streams import MappedFileStream, LazyStream
 from .structs import ELFStructs
 from .sections import (
         Section, StringTableSection, SymbolTableSection,
         SymbolTableIndexSection, SUNWSyminfoTableSection, NullSection,
         NoteSection, StabSection, ARMAttributesSection)
 from .dynamic import DynamicSection, DynamicSegment
+from .symbolizer import Symbolizer
 from .relocation import (RelocationSection, RelocationHandler,
         RelrRelocationSection)
 from .gnuversions import (
@@ -46,11 +48,21 @@ class ELFFile(object):
         creating a new ELFFile. Currently, the only such relative file path is
         obtained from the supplementary object files.
 
+        If raw_enums is True, enumerated fields of section and program
+        headers, symbols and dynamic tags (sh_type, p_type, st_info['type'],
+        d_tag and so on) are returned as plain integers instead of names,
+        which saves translating them for every record. Compare them against
+        the ENUM_* dictionaries in elftools.elf.enums, e.g.
+        ENUM_ST_INFO_TYPE['STT_FUNC']. The type filters of iter_sections and
+        iter_segments accept either names or integers in this mode.
+
         Accessible attributes:
 
             stream:
                 The stream holding the data of the file - must be a binary
-                stream (bytes, not string).
+                stream (bytes, not string). A BufferStream (for example the
+                memory mapping set up by load_from_path(..., mmap=True)) makes
+                section and segment data zero-copy.
 
             elfclass:
                 32 or 64 - specifies the word size of the target machine
@@ -69,7 +81,7 @@ class ELFFile(object):
             e_ident_raw:
                 the raw e_ident field of the header
     """
-    def __init__(self, stream, stream_loader=None):
+    def __init__(self, stream, stream_loader=None, raw_enums=False):
         self.stream = stream
         self.stream.seek(0, io.SEEK_END)
         self.stream_len = self.stream.tell()
@@ -77,7 +89,8 @@ class ELFFile(object):
         self._identify_file()
         self.structs = ELFStructs(
             little_endian=self.little_endian,
-            elfclass=self.elfclass)
+            elfclass=self.elfclass,
+            raw_enums=raw_enums)
 
         self.structs.create_basic_structs()
         self.header = self._parse_elf_header()
@@ -88,26 +101,40 @@ class ELFFile(object):
         self.stream.seek(0)
         self.e_ident_raw = self.stream.read(16)
 
+        self._section_header_table = None
+        self._section_cache = {}
         self._section_header_stringtable = \
             self._get_section_header_stringtable()
         self._section_name_map = None
+        self._symbolizer = None
+        self._dwarf_info_cache = {}
         self.stream_loader = stream_loader
 
     @classmethod
-    def load_from_path(cls, path):
+    def load_from_path(cls, path, mmap=False, raw_enums=False):
         """Takes a path to a file on the local filesystem, and returns an
         ELFFile from it, setting up a correct stream_loader relative to the
         original file.
+
+        If mmap is True, the file is memory-mapped instead of read through a
+        regular file object. All parsing then reads straight from the
+        mapping, and Section.data() and Segment.data() return memoryview
+        slices of it instead of copies. Supplementary object files are
+        opened the same way.
         """
         base_directory = os.path.dirname(path)
+        def open_stream(elf_path):
+            if mmap:
+                return MappedFileStream(elf_path)
+            return open(elf_path, 'rb')
         def loader(elf_path):
             # FIXME: use actual path instead of str/bytes
             if not os.path.isabs(elf_path):
                 elf_path = os.path.join(base_directory,
                                         elf_path)
-            return open(elf_path, 'rb')
-        stream = open(path, 'rb')
-        return ELFFile(stream, loader)
+            return open_stream(elf_path)
+        stream = open_stream(path)
+        return ELFFile(stream, loader, raw_enums=raw_enums)
 
     def num_sections(self):
         """ Number of sections in the file
@@ -128,10 +155,14 @@ class ELFFile(object):
 
     def get_section(self, n):
         """ Get the section at index #n from the file (Section object or a
-            subclass)
+            subclass). Section objects are created once and cached, so asking
+            for the same section again returns the same object.
         """
-        section_header = self._get_section_header(n)
-        return self._make_section(section_header)
+        section = self._section_cache.get(n)
+        if section is None:
+            section = self._make_section(self._get_section_header(n))
+            self._section_cache[n] = section
+        return section
 
     def get_section_by_name(self, name):
         """ Get a section from the file, by name. Return None if no such
@@ -163,10 +194,15 @@ class ELFFile(object):
             name of the type as defined in the ELF specification, e.g.
             'SHT_SYMTAB'.
         """
-        for i in range(self.num_sections()):
-            section = self.get_section(i)
-            if type is None or section['sh_type'] == type:
-                yield section
+        if type is None:
+            for i in range(self.num_sections()):
+                yield self.get_section(i)
+        else:
+            # Filter on the raw headers, so that sections of other types are
+            # never built
+            for i, header in self._iter_section_headers():
+                if self._enum_matches('sh_type', header['sh_type'], type):
+                    yield self.get_section(i)
 
     def num_segments(self):
         """ Number of segments in the file
@@ -198,7 +234,8 @@ class ELFFile(object):
         """
         for i in range(self.num_segments()):
             segment = self.get_segment(i)
-            if type is None or segment['p_type'] == type:
+            if (type is None or
+                    self._enum_matches('p_type', segment['p_type'], type)):
                 yield segment
 
     def address_offsets(self, start, size=1):
@@ -214,6 +251,15 @@ class ELFFile(object):
                 end <= seg['p_vaddr'] + seg['p_filesz']):
                 yield start - seg['p_vaddr'] + seg['p_offset']
 
+    def get_symbolizer(self):
+        """ Get a Symbolizer for this file, mapping addresses to the
+            function or data symbols containing them. It is built on first
+            use and cached.
+        """
+        if self._symbolizer is None:
+            self._symbolizer = Symbolizer(self)
+        return self._symbolizer
+
     def has_dwarf_info(self):
         """ Check whether this file appears to have debugging information.
             We assume that if it has the .debug_info or .zdebug_info section, it
@@ -223,7 +269,8 @@ class ELFFile(object):
             self.get_section_by_name('.zdebug_info') or
             self.get_section_by_name('.eh_frame'))
 
-    def get_dwarf_info(self, relocate_dwarf_sections=True, follow_links=True):
+    def get_dwarf_info(self, relocate_dwarf_sections=True, follow_links=True,
+                       lazy=False):
         """ Return a DWARFInfo object representing the debugging information in
             this file.
 
@@ -232,6 +279,49 @@ class ELFFile(object):
 
             If follow_links is True, we will try to load the supplementary
             object file (if any), and use it to resolve references and imports.
+
+            If lazy is True, the debug sections are read (and relocated and
+            decompressed as needed) only when the DWARFInfo first accesses
+            them, so the stream of this file must stay open while the
+            DWARFInfo is in use. By default they are all read right away.
+
+            The DWARFInfo is cached: later calls with the same arguments
+            return the same object, along with everything it has parsed so
+            far. Use clear_dwarf_info_cache() to get a fresh one.
+        """
+        key = (bool(relocate_dwarf_sections), bool(follow_links), bool(lazy))
+        dwarfinfo = self._dwarf_info_cache.get(key)
+        if dwarfinfo is None:
+            dwarfinfo = self._make_dwarf_info(relocate_dwarf_sections,
+                                              follow_links, lazy)
+            self._dwarf_info_cache[key] = dwarfinfo
+        return dwarfinfo
+
+    def clear_dwarf_info_cache(self):
+        """ Drop the DWARFInfo objects cached by get_dwarf_info(), so that
+            the next call parses the debugging information anew.
+        """
+        self._dwarf_info_cache.clear()
+
+    def get_supplementary_dwarfinfo(self, dwarfinfo):
+        """
+        Read supplementary dwarfinfo, from either the standared .debug_sup
+        section or the GNU proprietary .gnu_debugaltlink.
+        """
+        supfilepath = dwarfinfo.parse_debugsupinfo()
+        if supfilepath is not None and self.stream_loader is not None:
+            stream = self.stream_loader(supfilepath)
+            supelffile = ELFFile(stream)
+            # The stream is closed right away, so read all the sections now
+            dwarf_info = supelffile._make_dwarf_info(
+                relocate_dwarf_sections=True, follow_links=True, lazy=False)
+            stream.close()
+            return dwarf_info
+        return None
+
+    def _make_dwarf_info(self, relocate_dwarf_sections, follow_links, lazy):
+        """ Create a DWARFInfo for get_dwarf_info(). If lazy is True, the
+            contents of the debug sections are only produced on first access.
         """
         # Expect that has_dwarf_info was called, so at least .debug_info is
         # present.
@@ -265,12 +355,11 @@ class ELFFile(object):
             if section is None:
                 debug_sections[secname] = None
             else:
-                dwarf_section = self._read_dwarf_section(
+                debug_sections[secname] = self._get_dwarf_section(
                     section,
-                    relocate_dwarf_sections)
-                if compressed and secname.startswith('.z'):
-                    dwarf_section = self._decompress_dwarf_section(dwarf_section)
-                debug_sections[secname] = dwarf_section
+                    relocate_dwarf_sections,
+                    compressed and secname.startswith('.z'),
+                    lazy)
 
         # Lookup if we have any of the .gnu_debugaltlink (GNU proprietary
         # implementation) or .debug_sup sections, referencing a supplementary
@@ -298,27 +387,14 @@ class ELFFile(object):
                 debug_loclists_sec=debug_sections[debug_loclists_sec_name],
                 debug_rnglists_sec=debug_sections[debug_rnglists_sec_name],
                 debug_sup_sec=debug_sections[debug_sup_name],
-                gnu_debugaltlink_sec=debug_sections[gnu_debugaltlink_name]
+                gnu_debugaltlink_sec=debug_sections[gnu_debugaltlink_name],
+                lazy=lazy
                 )
         if follow_links:
             dwarfinfo.supplementary_dwarfinfo = self.get_supplementary_dwarfinfo(dwarfinfo)
         return dwarfinfo
 
 
-    def get_supplementary_dwarfinfo(self, dwarfinfo):
-        """
-        Read supplementary dwarfinfo, from either the standared .debug_sup
-        section or the GNU proprietary .gnu_debugaltlink.
-        """
-        supfilepath = dwarfinfo.parse_debugsupinfo()
-        if supfilepath is not None and self.stream_loader is not None:
-            stream = self.stream_loader(supfilepath)
-            supelffile = ELFFile(stream)
-            dwarf_info = supelffile.get_dwarf_info()
-            stream.close()
-            return dwarf_info
-        return None
-
 
     def has_ehabi_info(self):
         """ Check whether this file appears to have arm exception handler index table.
@@ -582,6 +658,12 @@ class ELFFile(object):
         """
         return self['e_shoff'] + n * self['e_shentsize']
 
+    def _enum_matches(self, field, value, wanted):
+        """ Does |value| of enumerated header field |field| match |wanted|,
+            given as a name or (with raw_enums) an integer?
+        """
+        return value == wanted or self.structs.enum_name(field, value) == wanted
+
     def _segment_offset(self, n):
         """ Compute the offset of segment #n in the file
         """
@@ -590,7 +672,7 @@ class ELFFile(object):
     def _make_segment(self, segment_header):
         """ Create a Segment object of the appropriate type
         """
-        segtype = segment_header['p_type']
+        segtype = self.structs.enum_name('p_type', segment_header['p_type'])
         if segtype == 'PT_INTERP':
             return InterpSegment(segment_header, self.stream)
         elif segtype == 'PT_DYNAMIC':
@@ -603,16 +685,51 @@ class ELFFile(object):
     def _get_section_header(self, n):
         """ Find the header of section #n, parse it and return the struct
         """
+        table = self._get_section_header_table()
+        if 0 <= n < len(table):
+            return self.structs.Elf_Shdr_codec.decode(table[n])
 
+        # Not in the table (a bogus index, or a truncated table): parse from
+        # the stream, which reports errors the way callers expect.
         stream_pos = self._section_offset(n)
         if stream_pos > self.stream_len:
             return None
 
         return struct_parse(
-            self.structs.Elf_Shdr,
+            self.structs.Elf_Shdr_codec,
             self.stream,
             stream_pos=stream_pos)
 
+    def _get_section_header_table(self):
+        """ The raw field tuples of all the section headers, read from the
+            file in one go the first time they're needed.
+        """
+        if self._section_header_table is None:
+            self._section_header_table = self._read_section_header_table()
+        return self._section_header_table
+
+    def _read_section_header_table(self):
+        """ Read and unpack the whole section header table. Entries that
+            don't fit in the file are left out.
+        """
+        shoff = self['e_shoff']
+        entsize = self['e_shentsize']
+        codec = self.structs.Elf_Shdr_codec
+        if shoff == 0 or shoff > self.stream_len or entsize < codec.sizeof():
+            return []
+
+        count = self['e_shnum']
+        if count == 0:
+            try:
+                count = struct_parse(codec, self.stream, stream_pos=shoff)[
+                    'sh_size']
+            except ELFParseError:
+                return []
+        size = min(count * entsize, self.stream_len - shoff)
+
+        data = read_stream_data(self.stream, shoff, size)
+        return list(codec.iter_unpack(data, entsize))
+
     def _get_section_name(self, section_header):
         """ Given a section header, find this section's name in the file's
             string table
@@ -627,7 +744,7 @@ class ELFFile(object):
         """ Create a section object of the appropriate type
         """
         name = self._get_section_name(section_header)
-        sectype = section_header['sh_type']
+        sectype = self.structs.enum_name('sh_type', section_header['sh_type'])
 
         if sectype == 'SHT_STRTAB':
             return StringTableSection(section_header, name, self)
@@ -664,10 +781,20 @@ class ELFFile(object):
         else:
             return Section(section_header, name, self)
 
+    def _iter_section_headers(self):
+        """ Yield (index, header) pairs for all the sections in the file,
+            without creating Section objects
+        """
+        for i in range(self.num_sections()):
+            yield i, self._get_section_header(i)
+
     def _make_section_name_map(self):
+        """ Map section names to indices, looking only at the section
+            headers and the section header string table
+        """
         self._section_name_map = {}
-        for i, sec in enumerate(self.iter_sections()):
-            self._section_name_map[sec.name] = i
+        for i, header in self._iter_section_headers():
+            self._section_name_map[self._get_section_name(header)] = i
 
     def _make_symbol_table_section(self, section_header, name):
         """ Create a SymbolTableSection
@@ -745,7 +872,7 @@ class ELFFile(object):
         """ Find the header of segment #n, parse it and return the struct
         """
         return struct_parse(
-            self.structs.Elf_Phdr,
+            self.structs.Elf_Phdr_codec,
             self.stream,
             stream_pos=self._segment_offset(n))
 
@@ -770,21 +897,60 @@ class ELFFile(object):
         """
         return struct_parse(self.structs.Elf_Ehdr, self.stream, stream_pos=0)
 
+    def _get_dwarf_section(self, section, relocate_dwarf_sections, decompress,
+                           lazy):
+        """ Return a DebugSectionDescriptor for a DWARF section. With lazy,
+            its stream is a LazyStream that reads, relocates and (if
+            decompress is True) decompresses the section on first access.
+        """
+        def load():
+            dwarf_section = self._read_dwarf_section(section,
+                                                     relocate_dwarf_sections)
+            if decompress:
+                dwarf_section = self._decompress_dwarf_section(dwarf_section)
+            return dwarf_section
+
+        size = section.data_size
+        if decompress:
+            size = self._get_zdebug_section_size(section)
+        if not lazy or size is None:
+            return load()
+        return DebugSectionDescriptor(
+                stream=LazyStream(lambda: load().stream),
+                name=section.name,
+                global_offset=section['sh_offset'],
+                size=size,
+                address=section['sh_addr'])
+
+    def _get_zdebug_section_size(self, section):
+        """ Read the uncompressed size of a .zdebug section from its header,
+            or return None if the header isn't in the expected format (see
+            _decompress_dwarf_section).
+        """
+        if section.data_size <= 12:
+            return None
+        header = section.data()[:12]
+        if bytes(header[:4]) != b'ZLIB':
+            return None
+        return struct.unpack('>Q', header[4:12])[0]
+
     def _read_dwarf_section(self, section, relocate_dwarf_sections):
         """ Read the contents of a DWARF section from the stream and return a
             DebugSectionDescriptor. Apply relocations if asked to.
         """
         # The section data is read into a new stream, for processing
-        section_stream = BytesIO()
-        section_stream.write(section.data())
+        data = section.data()
 
         if relocate_dwarf_sections:
             reloc_handler = RelocationHandler(self)
             reloc_section = reloc_handler.find_relocations_for_section(section)
             if reloc_section is not None:
-                reloc_handler.apply_section_relocations(
-                        section_stream, reloc_section)
+                data = bytearray(data)
+                reloc_handler.apply_buffer_relocations(data, reloc_section)
 
+        # A BytesIO made from a bytes object shares it, so that
+        # DWARFInfo.get_section_data can use it without a copy
+        section_stream = BytesIO(bytes(data))
         return DebugSectionDescriptor(
                 stream=section_stream,
                 name=section.name,
@@ -810,16 +976,18 @@ class ELFFile(object):
         uncompressed_size = struct.unpack('>Q', section.stream.read(8))[0]
 
         decompressor = zlib.decompressobj()
-        uncompressed_stream = BytesIO()
+        chunks = []
         while True:
             chunk = section.stream.read(PAGESIZE)
             if not chunk:
                 break
-            uncompressed_stream.write(decompressor.decompress(chunk))
-        uncompressed_stream.write(decompressor.flush())
+            chunks.append(decompressor.decompress(chunk))
+        chunks.append(decompressor.flush())
 
-        uncompressed_stream.seek(0, io.SEEK_END)
-        size = uncompressed_stream.tell()
+        # Made from a bytes object, like the streams of _read_dwarf_section
+        data = b''.join(chunks)
+        uncompressed_stream = BytesIO(data)
+        size = len(data)
         assert uncompressed_size == size, \
                 'Wrong uncompressed size: expected %r, but got %r' % (
                     uncompressed_size, size,
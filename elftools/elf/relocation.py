@@ -1,8 +1,9 @@
 
 from collections import namedtuple
+import struct
 
-from ..common.exceptions import ELFRelocationError
-from ..common.utils import elf_assert, struct_parse
+from ..common.exceptions import ELFRelocationError, ELFParseError
+from ..common.utils import elf_assert, struct_parse, read_stream_data
 from .sections import Section
 from .enums import (
     ENUM_RELOC_TYPE_i386, ENUM_RELOC_TYPE_x64, ENUM_RELOC_TYPE_MIPS,
@@ -54,8 +55,10 @@ class RelocationTable(object):
 
         if is_rela:
             self.entry_struct = self._elfstructs.Elf_Rela
+            self._entry_codec = self._elfstructs.Elf_Rela_codec
         else:
             self.entry_struct = self._elfstructs.Elf_Rel
+            self._entry_codec = self._elfstructs.Elf_Rel_codec
 
         self.entry_size = self.entry_struct.sizeof()
 
@@ -74,7 +77,7 @@ class RelocationTable(object):
         """
         entry_offset = self._offset + n * self.entry_size
         entry = struct_parse(
-            self.entry_struct,
+            self._entry_codec,
             self._stream,
             stream_pos=entry_offset)
         return Relocation(entry, self._elffile)
@@ -82,8 +85,25 @@ class RelocationTable(object):
     def iter_relocations(self):
         """ Yield all the relocations in the section
         """
-        for i in range(self.num_relocations()):
-            yield self.get_relocation(i)
+        for entry in self._iter_entries():
+            yield Relocation(entry, self._elffile)
+
+    def _iter_entries(self):
+        """ Yield the parsed entries of the section
+        """
+        # Read the whole table at once and unpack it in bulk
+        num_relocations = self.num_relocations()
+        data = read_stream_data(self._stream, self._offset,
+                                num_relocations * self.entry_size)
+        n = 0
+        for entry in self._entry_codec.iter_parse(data):
+            yield entry
+            n += 1
+
+        # Entries past the end of the file: let get_relocation report the
+        # error.
+        for i in range(n, num_relocations):
+            yield self.get_relocation(i).entry
 
 
 class RelocationSection(Section, RelocationTable):
@@ -91,14 +111,15 @@ class RelocationSection(Section, RelocationTable):
     """
     def __init__(self, header, name, elffile):
         Section.__init__(self, header, name, elffile)
+        sectype = self.structs.enum_name('sh_type', header['sh_type'])
         RelocationTable.__init__(self, self.elffile,
-            self['sh_offset'], self['sh_size'], header['sh_type'] == 'SHT_RELA')
+            self['sh_offset'], self['sh_size'], sectype == 'SHT_RELA')
 
-        elf_assert(header['sh_type'] in ('SHT_REL', 'SHT_RELA'),
+        elf_assert(sectype in ('SHT_REL', 'SHT_RELA'),
             'Unknown relocation type section')
         elf_assert(header['sh_entsize'] == self.entry_size,
             'Expected sh_entsize of %s section to be %s' % (
-                header['sh_type'], self.entry_size))
+                sectype, self.entry_size))
 
 class RelrRelocationSection(Section):
     """ RELR compressed relocation section. This stores relative relocations
@@ -203,86 +224,119 @@ class RelocationHandler(object):
             to the given stream, that contains the data of the section that is
             being relocated. The stream is modified as a result.
         """
-        # The symbol table associated with this relocation section
-        symtab = self.elffile.get_section(reloc_section['sh_link'])
-        for reloc in reloc_section.iter_relocations():
-            self._do_apply_relocation(stream, reloc, symtab)
-
-    def _do_apply_relocation(self, stream, reloc, symtab):
-        # Preparations for performing the relocation: obtain the value of
-        # the symbol mentioned in the relocation, as well as the relocation
-        # recipe which tells us how to actually perform it.
-        # All peppered with some sanity checking.
-        if reloc['r_info_sym'] >= symtab.num_symbols():
-            raise ELFRelocationError(
-                'Invalid symbol reference in relocation: index %s' % (
-                    reloc['r_info_sym']))
-        sym_value = symtab.get_symbol(reloc['r_info_sym'])['st_value']
+        stream.seek(0)
+        data = bytearray(stream.read())
+        self.apply_buffer_relocations(data, reloc_section)
+        stream.seek(0)
+        stream.write(data)
 
-        reloc_type = reloc['r_info_type']
-        recipe = None
+    def apply_buffer_relocations(self, buffer, reloc_section):
+        """ Apply all relocations in reloc_section (a RelocationSection object)
+            in place to |buffer|, a bytearray (or other writable buffer)
+            holding the data of the section that is being relocated.
 
-        if self.elffile.get_machine_arch() == 'x86':
-            if reloc.is_RELA():
+            The recipes for the machine are looked up once, the values of all
+            the symbols are read up front, and relocated values are written
+            with struct.pack_into.
+        """
+        if reloc_section.num_relocations() == 0:
+            return
+        # The symbol table associated with this relocation section
+        symtab = self.elffile.get_section(reloc_section['sh_link'])
+        sym_values = symtab.as_columns().st_value.tolist()
+        num_symbols = len(sym_values)
+
+        recipes = self._get_recipes(reloc_section.is_RELA())
+        # Per relocation type: (value struct, calc_func, has_addend, mask)
+        actions = {}
+
+        for entry in reloc_section._iter_entries():
+            # Preparations for performing the relocation: obtain the value of
+            # the symbol mentioned in the relocation, as well as the relocation
+            # recipe which tells us how to actually perform it.
+            # All peppered with some sanity checking.
+            sym = entry['r_info_sym']
+            if sym >= num_symbols:
                 raise ELFRelocationError(
-                    'Unexpected RELA relocation for x86: %s' % reloc)
-            recipe = self._RELOCATION_RECIPES_X86.get(reloc_type, None)
-        elif self.elffile.get_machine_arch() == 'x64':
-            if not reloc.is_RELA():
+                    'Invalid symbol reference in relocation: index %s' % sym)
+
+            reloc_type = entry['r_info_type']
+            action = actions.get(reloc_type)
+            if action is None:
+                action = actions[reloc_type] = self._make_action(
+                    recipes.get(reloc_type), reloc_type)
+            value_struct, calc_func, has_addend, mask = action
+
+            # Read the value (with correct size and endianness), apply the
+            # relocation to it according to the recipe, and write it back.
+            offset = entry['r_offset']
+            try:
+                value = value_struct.unpack_from(buffer, offset)[0]
+            except struct.error:
+                raise ELFParseError(
+                    'Relocation offset %#x out of the section' % offset)
+            relocated_value = calc_func(
+                value=value,
+                sym_value=sym_values[sym],
+                offset=offset,
+                addend=entry['r_addend'] if has_addend else 0)
+
+            # Make sure the relocated value fits back by wrapping it around.
+            # This looks like a problem, but it seems to be the way this is
+            # done in binutils too.
+            value_struct.pack_into(buffer, offset, relocated_value & mask)
+
+    def _get_recipes(self, is_rela):
+        """ The relocation recipes for this file's machine, checking that
+            relocations of the given kind (REL or RELA) are expected there.
+        """
+        arch = self.elffile.get_machine_arch()
+        if arch == 'x86':
+            if is_rela:
                 raise ELFRelocationError(
-                    'Unexpected REL relocation for x64: %s' % reloc)
-            recipe = self._RELOCATION_RECIPES_X64.get(reloc_type, None)
-        elif self.elffile.get_machine_arch() == 'MIPS':
-            if reloc.is_RELA():
+                    'Unexpected RELA relocation for x86')
+            return self._RELOCATION_RECIPES_X86
+        elif arch == 'x64':
+            if not is_rela:
                 raise ELFRelocationError(
-                    'Unexpected RELA relocation for MIPS: %s' % reloc)
-            recipe = self._RELOCATION_RECIPES_MIPS.get(reloc_type, None)
-        elif self.elffile.get_machine_arch() == 'ARM':
-            if reloc.is_RELA():
+                    'Unexpected REL relocation for x64')
+            return self._RELOCATION_RECIPES_X64
+        elif arch == 'MIPS':
+            if is_rela:
                 raise ELFRelocationError(
-                    'Unexpected RELA relocation for ARM: %s' % reloc)
-            recipe = self._RELOCATION_RECIPES_ARM.get(reloc_type, None)
-        elif self.elffile.get_machine_arch() == 'AArch64':
-            recipe = self._RELOCATION_RECIPES_AARCH64.get(reloc_type, None)
-        elif self.elffile.get_machine_arch() == '64-bit PowerPC':
-            recipe = self._RELOCATION_RECIPES_PPC64.get(reloc_type, None)
-
+                    'Unexpected RELA relocation for MIPS')
+            return self._RELOCATION_RECIPES_MIPS
+        elif arch == 'ARM':
+            if is_rela:
+                raise ELFRelocationError(
+                    'Unexpected RELA relocation for ARM')
+            return self._RELOCATION_RECIPES_ARM
+        elif arch == 'AArch64':
+            return self._RELOCATION_RECIPES_AARCH64
+        elif arch == '64-bit PowerPC':
+            return self._RELOCATION_RECIPES_PPC64
+        return {}
+
+    def _make_action(self, recipe, reloc_type):
+        """ Prepare what's needed to apply relocations with the given recipe
+        """
         if recipe is None:
             raise ELFRelocationError(
                     'Unsupported relocation type: %s' % reloc_type)
 
-        # So now we have everything we need to actually perform the relocation.
-        # Let's get to it:
-
-        # 0. Find out which struct we're going to be using to read this value
-        #    from the stream and write it back.
+        # Find out which struct we're going to be using to read the value
+        # from the section and write it back.
         if recipe.bytesize == 4:
-            value_struct = self.elffile.structs.Elf_word('')
+            fmt = 'I'
         elif recipe.bytesize == 8:
-            value_struct = self.elffile.structs.Elf_word64('')
+            fmt = 'Q'
         else:
             raise ELFRelocationError('Invalid bytesize %s for relocation' %
                     recipe.bytesize)
-
-        # 1. Read the value from the stream (with correct size and endianness)
-        original_value = struct_parse(
-            value_struct,
-            stream,
-            stream_pos=reloc['r_offset'])
-        # 2. Apply the relocation to the value, acting according to the recipe
-        relocated_value = recipe.calc_func(
-            value=original_value,
-            sym_value=sym_value,
-            offset=reloc['r_offset'],
-            addend=reloc['r_addend'] if recipe.has_addend else 0)
-        # 3. Write the relocated value back into the stream
-        stream.seek(reloc['r_offset'])
-
-        # Make sure the relocated value fits back by wrapping it around. This
-        # looks like a problem, but it seems to be the way this is done in
-        # binutils too.
-        relocated_value = relocated_value % (2 ** (recipe.bytesize * 8))
-        value_struct.build_stream(relocated_value, stream)
+        value_struct = struct.Struct(
+            ('<' if self.elffile.little_endian else '>') + fmt)
+        return (value_struct, recipe.calc_func, recipe.has_addend,
+                (1 << (recipe.bytesize * 8)) - 1)
 
     # Relocations are represented by "recipes". Each recipe specifies:
     #  bytesize: The number of bytes to read (and write back) to the section.
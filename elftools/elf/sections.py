@@ -1,9 +1,12 @@
 
 from ..common.exceptions import ELFCompressionError
-from ..common.utils import struct_parse, elf_assert, parse_cstring_from_stream
+from ..common.stringtable import StringTable
+from ..common.utils import (struct_parse, elf_assert,
+    parse_cstring_from_stream, read_stream_data)
 from collections import defaultdict
 from .constants import SH_FLAGS
 from .notes import iter_notes
+from .symbolcolumns import SymbolColumns
 
 import zlib
 
@@ -66,9 +69,13 @@ class Section(object):
 
         Note that data is decompressed if the stored section data is
         compressed.
+
+        If the file is backed by a BufferStream (see
+        ELFFile.load_from_path(..., mmap=True)), uncompressed data is returned
+        as a memoryview slice of the underlying buffer rather than a copy.
         """
         # If this section is NOBITS, there is no data. provide a dummy answer
-        if self.header['sh_type'] == 'SHT_NOBITS':
+        if self.structs.enum_name('sh_type', self['sh_type']) == 'SHT_NOBITS':
             return b'\0'*self.data_size
 
         # If this section is compressed, deflate it
@@ -78,8 +85,9 @@ class Section(object):
                 # Read the data to decompress starting right after the
                 # compression header until the end of the section.
                 hdr_size = self.structs.Elf_Chdr.sizeof()
-                self.stream.seek(self['sh_offset'] + hdr_size)
-                compressed = self.stream.read(self['sh_size'] - hdr_size)
+                compressed = read_stream_data(self.stream,
+                                              self['sh_offset'] + hdr_size,
+                                              self['sh_size'] - hdr_size)
 
                 decomp = zlib.decompressobj()
                 result = decomp.decompress(compressed, self.data_size)
@@ -94,8 +102,8 @@ class Section(object):
                     ' long'.format(len(result), self._decompressed_size)
                 )
         else:
-            self.stream.seek(self['sh_offset'])
-            result = self.stream.read(self._decompressed_size)
+            result = read_stream_data(self.stream, self['sh_offset'],
+                                      self._decompressed_size)
 
         return result
 
@@ -127,14 +135,26 @@ class NullSection(Section):
 
 
 class StringTableSection(Section):
-    """ ELF string table section.
+    """ ELF string table section. The table is loaded into memory the first
+        time a string is requested.
     """
+    def __init__(self, header, name, elffile):
+        super(StringTableSection, self).__init__(header, name, elffile)
+        self._table = None
+
     def get_string(self, offset):
         """ Get the string stored at the given offset in this string table.
         """
-        table_offset = self['sh_offset']
-        s = parse_cstring_from_stream(self.stream, table_offset + offset)
-        return s.decode('utf-8', errors='replace') if s else ''
+        if self._table is None:
+            self._table = StringTable(self.data(), errors='replace',
+                                      fallback=self._read_string)
+        return self._table.get_string(offset)
+
+    def _read_string(self, offset):
+        """ Read a string that isn't within the section's data straight from
+            the file, like readelf does.
+        """
+        return parse_cstring_from_stream(self.stream, self['sh_offset'] + offset)
 
 
 class SymbolTableIndexSection(Section):
@@ -169,19 +189,29 @@ class SymbolTableSection(Section):
         elf_assert(self['sh_size'] % self['sh_entsize'] == 0,
                 'Expected section size to be a multiple of entry size in section %r' % name)
         self._symbol_name_map = None
+        self._columns = None
 
     def num_symbols(self):
         """ Number of symbols in the table
         """
         return self['sh_size'] // self['sh_entsize']
 
+    def as_columns(self):
+        """ Get a column-oriented view of the table (SymbolColumns object),
+            which takes far less memory than Symbol objects for large tables
+            and supports vectorized filtering.
+        """
+        if self._columns is None:
+            self._columns = SymbolColumns(self)
+        return self._columns
+
     def get_symbol(self, n):
         """ Get the symbol at index #n from the table (Symbol object)
         """
         # Grab the symbol's entry from the stream
         entry_offset = self['sh_offset'] + n * self['sh_entsize']
         entry = struct_parse(
-            self.structs.Elf_Sym,
+            self.structs.Elf_Sym_codec,
             self.stream,
             stream_pos=entry_offset)
         # Find the symbol name in the associated string table
@@ -205,7 +235,20 @@ class SymbolTableSection(Section):
     def iter_symbols(self):
         """ Yield all the symbols in the table
         """
-        for i in range(self.num_symbols()):
+        # Read the whole table at once and unpack it in bulk
+        num_symbols = self.num_symbols()
+        entsize = self['sh_entsize']
+        data = read_stream_data(self.stream, self['sh_offset'],
+                                num_symbols * entsize)
+        get_string = self.stringtable.get_string
+        n = 0
+        for entry in self.structs.Elf_Sym_codec.iter_parse(data, entsize):
+            yield Symbol(entry, get_string(entry['st_name']))
+            n += 1
+
+        # Entries the table claims but the file doesn't hold: let get_symbol
+        # report the error.
+        for i in range(n, num_symbols):
             yield self.get_symbol(i)
 
 
@@ -1,6 +1,6 @@
 
 from ..construct import CString
-from ..common.utils import struct_parse
+from ..common.utils import struct_parse, read_stream_data
 from .constants import SH_FLAGS
 from .notes import iter_notes
 
@@ -12,9 +12,12 @@ class Segment(object):
 
     def data(self):
         """ The segment data from the file.
+
+            For buffer-backed files (see BufferStream) this is a memoryview
+            slice of the underlying buffer rather than a copy.
         """
-        self.stream.seek(self['p_offset'])
-        return self.stream.read(self['p_filesz'])
+        return read_stream_data(self.stream, self['p_offset'],
+                                self['p_filesz'])
 
     def __getitem__(self, name):
         """ Implement dict-like access to header entries
@@ -29,8 +32,8 @@ class Segment(object):
             elf/include/internal.h in the source of binutils.
         """
         # Only the 'strict' checks from ELF_SECTION_IN_SEGMENT_1 are included
-        segtype = self['p_type']
-        sectype = section['sh_type']
+        segtype = section.structs.enum_name('p_type', self['p_type'])
+        sectype = section.structs.enum_name('sh_type', section['sh_type'])
         secflags = section['sh_flags']
 
         # Only PT_LOAD, PT_GNU_RELRO and PT_TLS segments can contain SHF_TLS
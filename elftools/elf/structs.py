@@ -1,10 +1,12 @@
 
+import struct
+
 from ..construct import (
     UBInt8, UBInt16, UBInt32, UBInt64,
     ULInt8, ULInt16, ULInt32, ULInt64,
     SBInt32, SLInt32, SBInt64, SLInt64,
     Struct, Array, Enum, Padding, BitStruct, BitField, Value, String, CString,
-    Switch, Field
+    Switch, Field, Container, FieldError, MappingError, Pass
     )
 from ..common.construct_utils import ULEB128
 from ..common.utils import roundup
@@ -32,20 +34,37 @@ class ELFStructs(object):
 
             Elf_Rel, Elf_Rela:
                 Entries in relocation sections
+
+            Elf_Shdr_codec, Elf_Phdr_codec, Elf_Sym_codec, Elf_Rel_codec,
+            Elf_Rela_codec, Elf_Dyn_codec:
+                RecordCodecs producing the same Containers as the
+                corresponding construct structs, an order of magnitude
+                faster. Used for tables of fixed-size records.
+
+        If raw_enums is True, the codecs leave enumerated fields (sh_type,
+        p_type, d_tag, st_shndx and the st_info and st_other bit fields) as
+        plain integers instead of translating them to names; compare them
+        against the ENUM_* dictionaries in elftools.elf.enums. enum_name()
+        translates such a value on demand.
     """
-    def __init__(self, little_endian=True, elfclass=32):
+    def __init__(self, little_endian=True, elfclass=32, raw_enums=False):
         assert elfclass == 32 or elfclass == 64
         self.little_endian = little_endian
         self.elfclass = elfclass
+        self.raw_enums = raw_enums
         self.e_type = None
         self.e_machine = None
         self.e_ident_osabi = None
+        self._enum_names = {}
 
     def __getstate__(self):
-        return self.little_endian, self.elfclass, self.e_type, self.e_machine, self.e_ident_osabi
+        return (self.little_endian, self.elfclass, self.e_type, self.e_machine,
+                self.e_ident_osabi, self.raw_enums)
 
     def __setstate__(self, state):
-        self.little_endian, self.elfclass, e_type, e_machine, e_osabi = state
+        (self.little_endian, self.elfclass, e_type, e_machine, e_osabi,
+            self.raw_enums) = state
+        self._enum_names = {}
         self.create_basic_structs()
         self.create_advanced_structs(e_type, e_machine, e_osabi)
 
@@ -103,8 +122,38 @@ class ELFStructs(object):
         self._create_elf_hash()
         self._create_gnu_hash()
 
+    def enum_name(self, field, value):
+        """ The name of |value| of the enumerated record field |field| (for
+            example 'sh_type' or 'd_tag'), whether or not raw_enums is on.
+            Values without a name are returned unchanged.
+        """
+        if self.raw_enums and not isinstance(value, str):
+            return self._enum_names[field](value)
+        return value
+
     #-------------------------------- PRIVATE --------------------------------#
 
+    def _enum_field(self, field, mapping):
+        """ Return the function the codecs use to decode enumerated
+            |field|, whose values are named by |mapping|. With raw_enums,
+            that is the identity.
+        """
+        decode = self._enum_names[field] = _enum_decoder(field, mapping)
+        return _raw_enum if self.raw_enums else decode
+
+    def _record_format(self, layout):
+        """ Translate a record layout into a struct module format string
+            for this file's endianness and class. Each character of |layout|
+            is one field: B (byte), H (half), I (word), i (sword), A (addr),
+            O (offset), X (xword) or S (sxword).
+        """
+        if self.elfclass == 32:
+            sizes = dict(A='I', O='I', X='I', S='i')
+        else:
+            sizes = dict(A='Q', O='Q', X='Q', S='q')
+        return ('<' if self.little_endian else '>') + ''.join(
+            sizes.get(c, c) for c in layout)
+
     def _create_ehdr(self):
         self.Elf_Ehdr = Struct('Elf_Ehdr',
             Struct('e_ident',
@@ -169,6 +218,24 @@ class ELFStructs(object):
                 self.Elf_xword('p_align'),
             )
 
+        p_type = self._enum_field('p_type', p_type_dict)
+        if self.elfclass == 32:
+            def decode_phdr(raw):
+                return Container(
+                    p_type=p_type(raw[0]), p_offset=raw[1], p_vaddr=raw[2],
+                    p_paddr=raw[3], p_filesz=raw[4], p_memsz=raw[5],
+                    p_flags=raw[6], p_align=raw[7])
+            layout = 'IOAAIIII'
+        else: # 64
+            def decode_phdr(raw):
+                return Container(
+                    p_type=p_type(raw[0]), p_flags=raw[1], p_offset=raw[2],
+                    p_vaddr=raw[3], p_paddr=raw[4], p_filesz=raw[5],
+                    p_memsz=raw[6], p_align=raw[7])
+            layout = 'IIOAAXXX'
+        self.Elf_Phdr_codec = RecordCodec(
+            self._record_format(layout), decode_phdr)
+
     def _create_shdr(self):
         """Section header parsing.
 
@@ -195,6 +262,16 @@ class ELFStructs(object):
             self.Elf_xword('sh_entsize'),
         )
 
+        sh_type = self._enum_field('sh_type', sh_type_dict)
+        def decode_shdr(raw):
+            return Container(
+                sh_name=raw[0], sh_type=sh_type(raw[1]), sh_flags=raw[2],
+                sh_addr=raw[3], sh_offset=raw[4], sh_size=raw[5],
+                sh_link=raw[6], sh_info=raw[7], sh_addralign=raw[8],
+                sh_entsize=raw[9])
+        self.Elf_Shdr_codec = RecordCodec(
+            self._record_format('IIXAOXIIXX'), decode_shdr)
+
     def _create_chdr(self):
         # Structure of compressed sections header. It is documented in Oracle
         # "Linker and Libraries Guide", Part IV ELF Application Binary
@@ -268,6 +345,43 @@ class ELFStructs(object):
         # For us, this is the same as self.Elf_addr (or self.Elf_xword).
         self.Elf_Relr = Struct('Elf_Relr', self.Elf_addr('r_offset'))
 
+        if self.elfclass == 32:
+            def decode_info(r_info):
+                return dict(r_info=r_info,
+                            r_info_sym=(r_info >> 8) & 0xFFFFFF,
+                            r_info_type=r_info & 0xFF)
+            info_layout = 'X'
+        elif self.e_machine == 'EM_MIPS': # ELF64 MIPS
+            def decode_info(r_sym, r_ssym, r_type3, r_type2, r_type):
+                return dict(r_sym=r_sym, r_ssym=r_ssym, r_type3=r_type3,
+                            r_type2=r_type2, r_type=r_type,
+                            r_info_sym=r_sym, r_info_ssym=r_ssym,
+                            r_info_type=r_type, r_info_type2=r_type2,
+                            r_info_type3=r_type3,
+                            r_info=(r_sym << 32) | (r_ssym << 24)
+                                   | (r_type3 << 16) | (r_type2 << 8)
+                                   | r_type)
+            info_layout = 'IBBBB'
+        else: # Other 64 ELFs
+            def decode_info(r_info):
+                return dict(r_info=r_info,
+                            r_info_sym=(r_info >> 32) & 0xFFFFFFFF,
+                            r_info_type=r_info & 0xFFFFFFFF)
+            info_layout = 'X'
+        num_info = len(info_layout)
+
+        def decode_rel(raw):
+            return Container(r_offset=raw[0], **decode_info(*raw[1:]))
+        def decode_rela(raw):
+            entry = Container(r_offset=raw[0],
+                              **decode_info(*raw[1:num_info + 1]))
+            entry['r_addend'] = raw[num_info + 1]
+            return entry
+        self.Elf_Rel_codec = RecordCodec(
+            self._record_format('A' + info_layout), decode_rel)
+        self.Elf_Rela_codec = RecordCodec(
+            self._record_format('A' + info_layout + 'S'), decode_rela)
+
     def _create_dyn(self):
         d_tag_dict = dict(ENUM_D_TAG_COMMON)
         if self.e_machine in ENUMMAP_EXTRA_D_TAG_MACHINE:
@@ -281,6 +395,12 @@ class ELFStructs(object):
             Value('d_ptr', lambda ctx: ctx['d_val']),
         )
 
+        d_tag = self._enum_field('d_tag', d_tag_dict)
+        def decode_dyn(raw):
+            return Container(d_tag=d_tag(raw[0]), d_val=raw[1], d_ptr=raw[1])
+        self.Elf_Dyn_codec = RecordCodec(
+            self._record_format('SX'), decode_dyn)
+
     def _create_sym(self):
         # st_info is hierarchical. To access the type, use
         # container['st_info']['type']
@@ -314,6 +434,40 @@ class ELFStructs(object):
                 self.Elf_xword('st_size'),
             )
 
+        # The bit fields of st_info and st_other are decoded by table lookup
+        bind = self._enum_field('bind', ENUM_ST_INFO_BIND)
+        type = self._enum_field('type', ENUM_ST_INFO_TYPE)
+        local = self._enum_field('local', ENUM_ST_LOCAL)
+        visibility = self._enum_field('visibility', ENUM_ST_VISIBILITY)
+        st_info_table = [(bind(b >> 4), type(b & 0xF)) for b in range(256)]
+        st_other_table = [(local(b >> 5), visibility(b & 0x7))
+                          for b in range(256)]
+        st_shndx = self._enum_field('st_shndx', ENUM_ST_SHNDX)
+
+        if self.elfclass == 32:
+            def decode_sym(raw):
+                info = st_info_table[raw[3]]
+                other = st_other_table[raw[4]]
+                return Container(
+                    st_name=raw[0], st_value=raw[1], st_size=raw[2],
+                    st_info=Container(bind=info[0], type=info[1]),
+                    st_other=Container(local=other[0], visibility=other[1]),
+                    st_shndx=st_shndx(raw[5]))
+            layout = 'IAIBBH'
+        else:
+            def decode_sym(raw):
+                info = st_info_table[raw[1]]
+                other = st_other_table[raw[2]]
+                return Container(
+                    st_name=raw[0],
+                    st_info=Container(bind=info[0], type=info[1]),
+                    st_other=Container(local=other[0], visibility=other[1]),
+                    st_shndx=st_shndx(raw[3]), st_value=raw[4],
+                    st_size=raw[5])
+            layout = 'IBBHAX'
+        self.Elf_Sym_codec = RecordCodec(
+            self._record_format(layout), decode_sym)
+
     def _create_sunw_syminfo(self):
         self.Elf_Sunw_Syminfo = Struct('Elf_Sunw_Syminfo',
             Enum(self.Elf_half('si_boundto'), **ENUM_SUNW_SYMINFO_BOUNDTO),
@@ -532,3 +686,84 @@ class ELFStructs(object):
                                self.Elf_word('bloom_shift'),
                                Array(lambda ctx: ctx['bloom_size'], self.Elf_xword('bloom')),
                                Array(lambda ctx: ctx['nbuckets'], self.Elf_word('buckets')))
+
+
+class RecordCodec(object):
+    """ Decodes a fixed-layout ELF record with a precompiled struct.Struct
+        instead of a construct Struct.
+
+        decode is a function turning the tuple of raw field values into the
+        same Container the equivalent construct Struct would produce. Since
+        parse_stream is supported, a codec can be passed to struct_parse.
+
+        Accessible attributes:
+
+            struct:
+                The underlying struct.Struct, for unpacking raw tuples
+
+            decode:
+                The raw tuple -> Container function
+    """
+    def __init__(self, fmt, decode):
+        self.struct = struct.Struct(fmt)
+        self.decode = decode
+
+    def sizeof(self):
+        return self.struct.size
+
+    def parse(self, data, offset=0):
+        """ Decode the record at |offset| in the bytes-like |data|
+        """
+        return self.decode(self.struct.unpack_from(data, offset))
+
+    def parse_stream(self, stream):
+        size = self.struct.size
+        data = stream.read(size)
+        if len(data) != size:
+            raise FieldError('expected %d, found %d' % (size, len(data)))
+        return self.decode(self.struct.unpack(data))
+
+    def iter_unpack(self, data, stride=None):
+        """ Yield raw field tuples for consecutive records in |data|, which
+            is cut to a whole number of records. |stride| is the distance
+            between records, when larger than the record itself (as allowed
+            by the e_shentsize/sh_entsize fields).
+        """
+        size = self.struct.size
+        if stride is None or stride == size:
+            data = memoryview(data)
+            return self.struct.iter_unpack(data[:len(data) - len(data) % size])
+        unpack_from = self.struct.unpack_from
+        return (unpack_from(data, offset)
+                for offset in range(0, len(data) - size + 1, stride))
+
+    def iter_parse(self, data, stride=None):
+        """ Like iter_unpack, but yield decoded Containers
+        """
+        decode = self.decode
+        for raw in self.iter_unpack(data, stride):
+            yield decode(raw)
+
+
+def _raw_enum(value):
+    return value
+
+
+def _enum_decoder(name, mapping):
+    """ Return a function translating raw values of field |name| the way
+        Enum(..., **mapping) does.
+    """
+    mapping = dict(mapping)
+    default = mapping.pop('_default_', NotImplemented)
+    decoding = dict((v, k) for k, v in mapping.items())
+    def decode(value):
+        try:
+            return decoding[value]
+        except KeyError:
+            if default is Pass:
+                return value
+            if default is NotImplemented:
+                raise MappingError('no decoding mapping for %r [%s]' % (
+                    value, name))
+            return default
+    return decode
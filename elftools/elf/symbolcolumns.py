@@ -0,0 +1,190 @@
+
+from array import array
+
+from ..common.exceptions import ELFParseError
+from ..common.utils import read_stream_data
+from .enums import ENUM_ST_INFO_BIND, ENUM_ST_INFO_TYPE, ENUM_ST_SHNDX
+
+
+# Layout of Elf32_Sym and Elf64_Sym: (name, offset, size) of each field
+_SYM_FIELDS = {
+    32: (('st_name', 0, 4), ('st_value', 4, 4), ('st_size', 8, 4),
+         ('st_info', 12, 1), ('st_other', 13, 1), ('st_shndx', 14, 2)),
+    64: (('st_name', 0, 4), ('st_info', 4, 1), ('st_other', 5, 1),
+         ('st_shndx', 6, 2), ('st_value', 8, 8), ('st_size', 16, 8)),
+}
+
+
+class SymbolColumns(object):
+    """ A column-oriented view of a symbol table: one array per field of the
+        symbol entries instead of a Symbol object per entry. Created by
+        SymbolTableSection.as_columns().
+
+        The columns are NumPy arrays if NumPy is installed, otherwise
+        array.array objects. Values are the raw integers from the file (no
+        enum translation); st_info and st_other are the undecoded bytes.
+        Symbol names are only looked up in the string table on demand.
+
+        Accessible attributes:
+
+            st_name, st_value, st_size, st_info, st_other, st_shndx:
+                The columns, indexed by symbol number
+
+            uses_numpy:
+                Whether the columns are NumPy arrays
+    """
+    def __init__(self, symtab):
+        self._symtab = symtab
+        self._stringtable = symtab.stringtable
+        numpy = _import_numpy()
+        self.uses_numpy = numpy is not None
+
+        num_symbols = symtab.num_symbols()
+        entsize = symtab['sh_entsize']
+        fields = _SYM_FIELDS[symtab.structs.elfclass]
+        if entsize < symtab.structs.Elf_Sym_codec.sizeof():
+            raise ELFParseError(
+                'Symbol table entry size %d is too small' % entsize)
+        data = read_stream_data(symtab.stream, symtab['sh_offset'],
+                                num_symbols * entsize)
+        if len(data) < num_symbols * entsize:
+            raise ELFParseError(
+                'Symbol table %r extends past the end of the file' %
+                symtab.name)
+
+        if self.uses_numpy:
+            byteorder = '<' if symtab.structs.little_endian else '>'
+            dtype = numpy.dtype(dict(
+                names=[name for name, _, _ in fields],
+                formats=['%su%d' % (byteorder, size) for _, _, size in fields],
+                offsets=[offset for _, offset, _ in fields],
+                itemsize=entsize))
+            if num_symbols:
+                records = numpy.frombuffer(data, dtype=dtype,
+                                           count=num_symbols)
+            else:
+                records = numpy.zeros(0, dtype=dtype)
+            for name, _, size in fields:
+                # Copy each field into a native, contiguous array so that
+                # nothing refers to the file data any more
+                setattr(self, name,
+                        records[name].astype('u%d' % size))
+        else:
+            columns = [array(_typecode(size)) for _, _, size in fields]
+            appenders = [column.append for column in columns]
+            for raw in symtab.structs.Elf_Sym_codec.iter_unpack(data,
+                                                                entsize):
+                for append, value in zip(appenders, raw):
+                    append(value)
+            for (name, _, _), column in zip(fields, columns):
+                setattr(self, name, column)
+
+    def __len__(self):
+        return len(self.st_name)
+
+    @property
+    def st_bind(self):
+        """ The binding of each symbol (upper half of st_info), as integers
+        """
+        if self.uses_numpy:
+            return self.st_info >> 4
+        return array('B', (info >> 4 for info in self.st_info))
+
+    @property
+    def st_type(self):
+        """ The type of each symbol (lower half of st_info), as integers
+        """
+        if self.uses_numpy:
+            return self.st_info & 0xF
+        return array('B', (info & 0xF for info in self.st_info))
+
+    def get_name(self, n):
+        """ Get the name of symbol #n
+        """
+        return self._stringtable.get_string(self.st_name[n])
+
+    def get_names(self, indices):
+        """ Get the names of the symbols with the given numbers, as a list
+        """
+        get_string = self._stringtable.get_string
+        st_name = self.st_name
+        return [get_string(st_name[i]) for i in indices]
+
+    def get_symbol(self, n):
+        """ Get symbol #n as a regular Symbol object
+        """
+        return self._symtab.get_symbol(int(n))
+
+    def select(self, type=None, bind=None, shndx=None):
+        """ Return the numbers of the symbols matching all the given criteria
+            (a NumPy integer array, or a list without NumPy).
+
+            type and bind can be given as names ('STT_FUNC', 'STB_GLOBAL') or
+            integers; shndx as a section index or a special index name
+            ('SHN_UNDEF', 'SHN_ABS', ...). Each may also be a tuple/list of
+            such values, matching any of them.
+        """
+        # Type and binding are both checked on st_info: collect the st_info
+        # bytes that satisfy them
+        types = (range(16) if type is None
+                 else _enum_values(type, ENUM_ST_INFO_TYPE))
+        binds = (range(16) if bind is None
+                 else _enum_values(bind, ENUM_ST_INFO_BIND))
+        conditions = []
+        if type is not None or bind is not None:
+            conditions.append((self.st_info,
+                               [b << 4 | t for b in binds for t in types]))
+        if shndx is not None:
+            conditions.append(
+                (self.st_shndx, _enum_values(shndx, ENUM_ST_SHNDX)))
+
+        if self.uses_numpy:
+            numpy = _import_numpy()
+            mask = numpy.ones(len(self), dtype=bool)
+            for column, values in conditions:
+                mask &= numpy.isin(column, values)
+            return numpy.flatnonzero(mask)
+
+        indices = range(len(self))
+        for column, values in conditions:
+            values = frozenset(values)
+            indices = [i for i in indices if column[i] in values]
+        return list(indices)
+
+
+#-------------------------------- PRIVATE --------------------------------#
+
+# The numpy module, False if it isn't installed, None until first needed
+_numpy = None
+
+
+def _import_numpy():
+    """ Import NumPy on first use, so that importing pyelftools doesn't pay
+        for it. Return the module, or None if NumPy isn't installed.
+    """
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+            _numpy = numpy
+        except ImportError:
+            _numpy = False
+    return _numpy or None
+
+def _typecode(size):
+    """ The array typecode of an unsigned integer of |size| bytes
+    """
+    for typecode in 'BHILQ':
+        if array(typecode).itemsize == size:
+            return typecode
+    raise ValueError('No unsigned array type of size %d' % size)
+
+
+def _enum_values(wanted, mapping):
+    """ Translate a value or list of values given as names or integers into
+        a list of integers
+    """
+    if not isinstance(wanted, (list, tuple, set, frozenset)):
+        wanted = [wanted]
+    return [mapping[value] if isinstance(value, str) else value
+            for value in wanted]
@@ -0,0 +1,149 @@
+
+from array import array
+from bisect import bisect_right
+
+from .enums import ENUM_ST_INFO_BIND, ENUM_ST_INFO_TYPE, ENUM_ST_SHNDX
+
+
+_SYMBOL_TYPES = (ENUM_ST_INFO_TYPE['STT_FUNC'], ENUM_ST_INFO_TYPE['STT_OBJECT'])
+
+# When several symbols start at the same address, the one reported is the
+# largest, then the one from .symtab, then the one with the strongest binding
+_BIND_RANK = {
+    ENUM_ST_INFO_BIND['STB_GLOBAL']: 0,
+    ENUM_ST_INFO_BIND['STB_WEAK']: 1,
+    ENUM_ST_INFO_BIND['STB_LOCAL']: 2,
+}
+
+
+class Symbolizer(object):
+    """ Maps addresses to the function or data symbol containing them.
+        Created by ELFFile.get_symbolizer().
+
+        The index covers the defined STT_FUNC and STT_OBJECT symbols of all
+        the symbol tables in the file (.symtab and .dynsym), or of the
+        dynamic segment if the file has no section headers. Each symbol
+        covers [st_value, st_value + st_size); a symbol of size 0 only
+        covers its own address. On ARM, the Thumb bit of function addresses
+        is ignored.
+
+        Lookups are a binary search over the symbols sorted by address.
+    """
+    def __init__(self, elffile):
+        self._sources = []
+        entries = []
+        symtabs = (list(elffile.iter_sections('SHT_SYMTAB')) +
+                   list(elffile.iter_sections('SHT_DYNSYM')))
+        if symtabs:
+            for symtab in symtabs:
+                self._add_columns(entries, symtab.as_columns())
+        else:
+            for segment in elffile.iter_segments('PT_DYNAMIC'):
+                self._add_symbols(entries, segment)
+
+        thumb = elffile['e_machine'] == 'EM_ARM'
+        func = ENUM_ST_INFO_TYPE['STT_FUNC']
+        if thumb:
+            entries = [(start & ~1 if type == func else start, size, rank,
+                        source, index, type)
+                       for start, size, rank, source, index, type in entries]
+        entries.sort(key=lambda e: (e[0], -e[1], e[2]))
+
+        self._starts = array('Q')
+        self._ends = array('Q')
+        self._source = array('H')
+        self._index = array('L')
+        # Index of the nearest earlier symbol containing each symbol's start
+        # address, or -1; followed when symbols nest or overlap.
+        self._parent = array('l')
+        open_symbols = []
+        for start, size, _, source, index, _ in entries:
+            if self._starts and self._starts[-1] == start:
+                continue
+            while open_symbols and self._ends[open_symbols[-1]] <= start:
+                open_symbols.pop()
+            n = len(self._starts)
+            self._parent.append(open_symbols[-1] if open_symbols else -1)
+            self._starts.append(start)
+            self._ends.append(start + max(size, 1))
+            self._source.append(source)
+            self._index.append(index)
+            open_symbols.append(n)
+
+        self._symbols = {}
+
+    def __len__(self):
+        return len(self._starts)
+
+    def lookup(self, addr):
+        """ Return the symbol containing |addr| (a Symbol object), or None
+        """
+        n = bisect_right(self._starts, addr) - 1
+        ends = self._ends
+        parent = self._parent
+        while n >= 0 and addr >= ends[n]:
+            n = parent[n]
+        if n < 0:
+            return None
+        return self._get_symbol(n)
+
+    def lookup_many(self, addrs):
+        """ Look up each address in the iterable |addrs|; return a list with
+            a Symbol object or None for each of them.
+        """
+        lookup = self.lookup
+        found = {}
+        result = []
+        for addr in addrs:
+            try:
+                symbol = found[addr]
+            except KeyError:
+                symbol = found[addr] = lookup(addr)
+            result.append(symbol)
+        return result
+
+    #-------------------------------- PRIVATE --------------------------------#
+
+    def _get_symbol(self, n):
+        symbol = self._symbols.get(n)
+        if symbol is None:
+            source = self._sources[self._source[n]]
+            symbol = self._symbols[n] = source.get_symbol(self._index[n])
+        return symbol
+
+    def _add_columns(self, entries, columns):
+        """ Add the FUNC and OBJECT symbols of a SymbolColumns to |entries|
+        """
+        source = len(self._sources)
+        self._sources.append(columns)
+        undef = ENUM_ST_SHNDX['SHN_UNDEF']
+        st_value = columns.st_value
+        st_size = columns.st_size
+        st_info = columns.st_info
+        st_shndx = columns.st_shndx
+        for i in columns.select(type=_SYMBOL_TYPES):
+            if st_shndx[i] == undef:
+                continue
+            info = int(st_info[i])
+            entries.append((int(st_value[i]), int(st_size[i]),
+                            (source, _BIND_RANK.get(info >> 4, 3)),
+                            source, int(i), info & 0xF))
+
+    def _add_symbols(self, entries, dynamic):
+        """ Add the FUNC and OBJECT symbols of a DynamicSegment to |entries|
+        """
+        source = len(self._sources)
+        self._sources.append(dynamic)
+        for i, symbol in enumerate(dynamic.iter_symbols()):
+            type = dynamic.elfstructs.enum_name('type',
+                                                symbol['st_info']['type'])
+            shndx = dynamic.elfstructs.enum_name('st_shndx',
+                                                 symbol['st_shndx'])
+            if type not in ('STT_FUNC', 'STT_OBJECT') or shndx == 'SHN_UNDEF':
+                continue
+            bind = dynamic.elfstructs.enum_name('bind',
+                                                symbol['st_info']['bind'])
+            entries.append((symbol['st_value'], symbol['st_size'],
+                            (source, _BIND_RANK.get(ENUM_ST_INFO_BIND.get(bind),
+                                                    3)),
+                            source, i, ENUM_ST_INFO_TYPE[type]))
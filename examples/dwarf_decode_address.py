@@ -6,7 +6,6 @@ import sys
 sys.path[0:0] = ['.', '..']
 
 from elftools.common.utils import bytes2str
-from elftools.dwarf.descriptions import describe_form_class
 from elftools.elf.elffile import ELFFile
 
 
@@ -32,66 +31,39 @@ def process_file(filename, address):
 
 
 def decode_funcname(dwarfinfo, address):
-    # Go over all DIEs in the DWARF information, looking for a subprogram
-    # entry with an address range that includes the given address. Note that
-    # this simplifies things by disregarding subprograms that may have
-    # split address ranges.
-    for CU in dwarfinfo.iter_CUs():
-        for DIE in CU.iter_DIEs():
-            try:
-                if DIE.tag == 'DW_TAG_subprogram':
-                    lowpc = DIE.attributes['DW_AT_low_pc'].value
-
-                    # DWARF v4 in section 2.17 describes how to interpret the
-                    # DW_AT_high_pc attribute based on the class of its form.
-                    # For class 'address' it's taken as an absolute address
-                    # (similarly to DW_AT_low_pc); for class 'constant', it's
-                    # an offset from DW_AT_low_pc.
-                    highpc_attr = DIE.attributes['DW_AT_high_pc']
-                    highpc_attr_class = describe_form_class(highpc_attr.form)
-                    if highpc_attr_class == 'address':
-                        highpc = highpc_attr.value
-                    elif highpc_attr_class == 'constant':
-                        highpc = lowpc + highpc_attr.value
-                    else:
-                        print('Error: invalid DW_AT_high_pc class:',
-                              highpc_attr_class)
-                        continue
-
-                    if lowpc <= address < highpc:
-                        return DIE.attributes['DW_AT_name'].value
-            except KeyError:
-                continue
-    return None
+    # The address index maps an address to the DIEs of the frames covering
+    # it, innermost first: the inlined subroutines, if any, then the
+    # subprogram they are inlined in. The index is built the first time it's
+    # asked for, from the address ranges (DW_AT_low_pc and DW_AT_high_pc, or
+    # DW_AT_ranges) of the DIEs of all CUs.
+    frames = dwarfinfo.get_address_index().frames_at(address)
+    if not frames:
+        return None
+
+    # The DIE of an out-of-line instance of an inline function, or of the
+    # definition of a C++ method, may have its name in the DIE it refers to.
+    DIE = frames[-1]
+    while 'DW_AT_name' not in DIE.attributes:
+        for attrname in ('DW_AT_abstract_origin', 'DW_AT_specification'):
+            if attrname in DIE.attributes:
+                DIE = DIE.get_DIE_from_attribute(attrname)
+                break
+        else:
+            return None
+    return DIE.attributes['DW_AT_name'].value
 
 
 def decode_file_line(dwarfinfo, address):
     # Go over all the line programs in the DWARF information, looking for
     # one that describes the given address.
     for CU in dwarfinfo.iter_CUs():
-        # First, look at line programs to find the file/line for the address
+        # lookup() does a binary search in the rows of the line table, the
+        # row found describing the addresses up to those of the next row.
         lineprog = dwarfinfo.line_program_for_CU(CU)
-        prevstate = None
-        for entry in lineprog.get_entries():
-            # We're interested in those entries where a new state is assigned
-            if entry.state is None:
-                continue
-            # Looking for a range of addresses in two consecutive states that
-            # contain the required address.
-            if prevstate and prevstate.address <= address < entry.state.address:
-                filename = lineprog['file_entry'][prevstate.file - 1].name
-                line = prevstate.line
-                return filename, line
-            if entry.state.end_sequence:
-                # For the state with `end_sequence`, `address` means the address
-                # of the first byte after the target machine instruction
-                # sequence and other information is meaningless. We clear
-                # prevstate so that it's not used in the next iteration. Address
-                # info is used in the above comparison to see if we need to use
-                # the line information for the prevstate.
-                prevstate = None
-            else:
-                prevstate = entry.state
+        row = lineprog.lookup(address)
+        if row is not None:
+            filename = lineprog['file_entry'][row.file - 1].name
+            return filename, row.line
     return None, None
 
 
@@ -327,7 +327,7 @@ class ReadElf(object):
         """
         self.elffile = ELFFile(file)
         self.output = output
-        self._dwarfinfo = self.elffile.get_dwarf_info()
+        self._dwarfinfo = self.elffile.get_dwarf_info(lazy=True)
         arches = {"EM_386": "i386", "EM_X86_64": "x86-64", "EM_ARM": "littlearm", "EM_AARCH64": "littleaarch64"}
         arch = arches[self.elffile['e_machine']]
         bits = self.elffile.elfclass
@@ -1063,7 +1063,7 @@ class ReadElf(object):
             return
 
         if self.elffile.has_dwarf_info():
-            self._dwarfinfo = self.elffile.get_dwarf_info()
+            self._dwarfinfo = self.elffile.get_dwarf_info(lazy=True)
         else:
             self._dwarfinfo = None
 
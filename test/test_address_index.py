@@ -0,0 +1,66 @@
+import os
+import unittest
+
+from elftools.elf.elffile import ELFFile
+from elftools.dwarf.dwarf_util import _get_DIE_ranges
+
+
+class TestAddressIndex(unittest.TestCase):
+    def _dwarfinfo(self, name):
+        f = open(os.path.join('test', 'testfiles_for_unittests', name), 'rb')
+        self.addCleanup(f.close)
+        return ELFFile(f).get_dwarf_info()
+
+    def _get_ranges(self, dwarfinfo, die):
+        low_pc = die.cu.get_top_DIE().attributes.get('DW_AT_low_pc')
+        return _get_DIE_ranges(die, dwarfinfo.range_lists(),
+                               low_pc.value if low_pc else 0)
+
+    def test_frames_at(self):
+        dwarfinfo = self._dwarfinfo('debug_info.elf')
+        index = dwarfinfo.get_address_index()
+        self.assertIs(dwarfinfo.get_address_index(), index)
+
+        frames = index.frames_at(0x1524)
+        self.assertEqual([die.tag for die in frames],
+                         ['DW_TAG_inlined_subroutine', 'DW_TAG_subprogram'])
+        self.assertEqual(frames[0].get_parent(), frames[1])
+        self.assertEqual(index.frames_at(0), [])
+
+    def test_scopes_like_DIEs(self):
+        # Compare with the ranges of all the DIEs: the innermost scope is the
+        # deepest covering the address, and its enclosing scopes are its
+        # ancestors
+        dwarfinfo = self._dwarfinfo('debug_info.elf')
+        index = dwarfinfo.get_address_index()
+        scopes = []
+        addresses = set()
+        for cu in dwarfinfo.iter_CUs():
+            for die, depth in cu.iter_DIEs(with_depth=True):
+                if die.tag in ('DW_TAG_subprogram', 'DW_TAG_lexical_block',
+                               'DW_TAG_inlined_subroutine'):
+                    for begin, end in self._get_ranges(dwarfinfo, die):
+                        scopes.append((begin, end, depth, die))
+                        addresses.update((begin - 1, begin, end - 1, end))
+        self.assertGreater(len(scopes), 10)
+
+        for address in sorted(addresses):
+            covering = [(depth, die.offset) for begin, end, depth, die
+                        in scopes if begin <= address < end]
+            dies = index.scopes_at(address)
+            if not covering:
+                self.assertEqual(dies, [])
+                continue
+            self.assertEqual(dies[0].offset, max(covering)[1])
+            self.assertEqual(dies[-1].tag, 'DW_TAG_subprogram')
+            for die, parent in zip(dies, dies[1:]):
+                ancestor = die.get_parent()
+                while ancestor.offset != parent.offset:
+                    ancestor = ancestor.get_parent()
+            self.assertEqual(
+                index.frames_at(address),
+                [die for die in dies if die.tag != 'DW_TAG_lexical_block'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import io
+import unittest
+
+from elftools.common.bufferreader import BufferReader, stream_contents
+from elftools.common.exceptions import ELFParseError
+
+
+class TestBufferReader(unittest.TestCase):
+    def test_fixed_size(self):
+        data = b'\x01\x02\x03\x04\x05\x06\x07\x08\xff\xff'
+        for little_endian, expected in (
+                (True, (0x01, 0x0302, 0x07060504)),
+                (False, (0x01, 0x0203, 0x04050607))):
+            reader = BufferReader(data, little_endian=little_endian)
+            self.assertEqual((reader.u8(), reader.u16(), reader.u32()),
+                             expected)
+            self.assertEqual(reader.offset, 7)
+            reader.offset = 8
+            self.assertEqual(reader.sint(2), -1)
+            self.assertTrue(reader.at_end())
+            byteorder = 'little' if little_endian else 'big'
+            reader.offset = 0
+            self.assertEqual(reader.u64(), int.from_bytes(data[:8], byteorder))
+            reader.offset = 3
+            self.assertEqual(reader.uint(4), expected[2])
+
+    def test_leb128(self):
+        # Examples from the DWARF specification
+        for encoded, value in ((b'\x02', 2), (b'\x7f', 127), (b'\x80\x01', 128),
+                               (b'\x81\x01', 129), (b'\x82\x01', 130),
+                               (b'\xb9\x64', 12857)):
+            reader = BufferReader(b'\xaa' + encoded, offset=1)
+            self.assertEqual(reader.uleb(), value)
+            self.assertEqual(reader.offset, 1 + len(encoded))
+        for encoded, value in ((b'\x02', 2), (b'\x7e', -2), (b'\xff\x00', 127),
+                               (b'\x81\x7f', -127), (b'\x80\x01', 128),
+                               (b'\x80\x7f', -128), (b'\x81\x01', 129),
+                               (b'\xff\x7e', -129)):
+            reader = BufferReader(encoded)
+            self.assertEqual(reader.sleb(), value)
+            self.assertTrue(reader.at_end())
+
+    def test_strings_and_bytes(self):
+        for data in (b'abc\x00\x00xy', memoryview(b'abc\x00\x00xy')):
+            reader = BufferReader(data)
+            self.assertEqual(reader.cstring(), b'abc')
+            self.assertEqual(reader.cstring(), b'')
+            self.assertEqual(reader.read(2), b'xy')
+            self.assertEqual(reader.offset, 7)
+
+    def test_truncated(self):
+        reader = BufferReader(b'\x01\x80')
+        reader.offset = 1
+        for read in (reader.u16, reader.u32, reader.uleb, reader.cstring,
+                     lambda: reader.read(2)):
+            with self.assertRaises(ELFParseError):
+                read()
+            self.assertEqual(reader.offset, 1)
+        reader.offset = 2
+        with self.assertRaises(ELFParseError):
+            reader.u8()
+
+    def test_from_stream(self):
+        stream = io.BytesIO(b'\x00\x2a\x00')
+        stream.seek(2)
+        self.assertIs(stream_contents(stream), stream.getvalue())
+        self.assertEqual(stream.tell(), 2)
+        reader = BufferReader.from_stream(stream, offset=1, little_endian=False)
+        self.assertEqual(reader.u16(), 0x2a00)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+import os
+import unittest
+
+from elftools.elf.elffile import ELFFile
+
+
+class TestParseAll(unittest.TestCase):
+    def _dwarfinfo(self, name):
+        f = open(os.path.join('test', 'testfiles_for_unittests', name), 'rb')
+        self.addCleanup(f.close)
+        return ELFFile(f).get_dwarf_info()
+
+    def _walk_children(self, die):
+        """ The DIEs of the subtree of |die| found with iter_children
+        """
+        dies = [die]
+        if die.has_children:
+            for child in die.iter_children():
+                dies.extend(self._walk_children(child))
+            dies.append(die._terminator)
+        return dies
+
+    def test_parse_all(self):
+        for name in ('lambda.elf', 'debug_info.elf', 'dwarfv5_basic.elf'):
+            linear = self._dwarfinfo(name)
+            walked = self._dwarfinfo(name)
+            for cu, walked_cu in zip(linear.iter_CUs(), walked.iter_CUs()):
+                # DIEs parsed before the full pass are reused
+                top = cu.get_top_DIE()
+                cu.parse_all()
+                dies = list(cu.iter_DIEs())
+                self.assertIs(dies[0], top)
+                self.assertEqual(dies, cu._dielist)
+                for i, die in enumerate(dies):
+                    self.assertEqual(cu._diemap[die.offset], i)
+                    self.assertIs(cu._get_cached_DIE(die.offset), die)
+
+                walked_dies = self._walk_children(walked_cu.get_top_DIE())
+                self.assertEqual([die.offset for die in dies],
+                                 [die.offset for die in walked_dies])
+                for die, walked_die in zip(dies, walked_dies):
+                    self.assertEqual(die.tag, walked_die.tag)
+                    self.assertEqual(
+                        getattr(die._parent, 'offset', None),
+                        getattr(walked_die._parent, 'offset', None))
+                    self.assertEqual(
+                        getattr(die._terminator, 'offset', None),
+                        getattr(walked_die._terminator, 'offset', None))
+
+    def test_partial_iteration(self):
+        dwarfinfo = self._dwarfinfo('lambda.elf')
+        cu = next(dwarfinfo.iter_CUs())
+        dies = cu.iter_DIEs()
+        first = [next(dies) for _ in range(3)]
+        self.assertIsNone(cu._dielist)
+        self.assertEqual(list(cu.iter_DIEs())[:3], first)
+        self.assertIsNotNone(cu._dielist)
+
+    def test_with_depth(self):
+        dwarfinfo = self._dwarfinfo('debug_info.elf')
+        for cu in dwarfinfo.iter_CUs():
+            parsing = list(cu.iter_DIEs(with_depth=True))
+            self.assertEqual(list(cu.iter_DIEs(with_depth=True)), parsing)
+            self.assertEqual([die for die, _ in parsing], list(cu.iter_DIEs()))
+            for die, depth in parsing:
+                ancestors = 0
+                parent = die._parent
+                while parent is not None:
+                    ancestors += 1
+                    parent = parent._parent
+                self.assertEqual(depth, ancestors)
+
+    def test_filter(self):
+        is_function = lambda tag: tag == 'DW_TAG_subprogram'
+        for name in ('lambda.elf', 'debug_info.elf', 'dwarfv5_basic.elf'):
+            for tags, prune in ((['DW_TAG_subprogram'], None),
+                                (['DW_TAG_variable', 'DW_TAG_base_type'],
+                                 is_function),
+                                (None, is_function)):
+                scanned = self._dwarfinfo(name)
+                parsed = self._dwarfinfo(name)
+                for cu, parsed_cu in zip(scanned.iter_CUs(),
+                                         parsed.iter_CUs()):
+                    dies = list(cu.iter_DIEs(with_depth=True, tags=tags,
+                                             prune=prune))
+                    # The DIEs that aren't returned aren't created
+                    self.assertLessEqual(len(cu._dies), len(dies) + 1)
+
+                    parsed_cu.parse_all()
+                    expected = []
+                    pruned_depth = None
+                    for die, depth in parsed_cu.iter_DIEs(with_depth=True):
+                        if pruned_depth is not None and depth > pruned_depth:
+                            continue
+                        pruned_depth = None
+                        if tags is None or die.tag in tags:
+                            expected.append((die.offset, depth))
+                        if die.has_children and prune and prune(die.tag):
+                            pruned_depth = depth
+                    self.assertEqual(
+                        [(die.offset, depth) for die, depth in dies],
+                        expected)
+                    self.assertEqual(
+                        list(parsed_cu.iter_DIEs(tags=tags, prune=prune)),
+                        [die for die, _ in parsed_cu.iter_DIEs(
+                            with_depth=True, tags=tags, prune=prune)])
+                    self.assertEqual(
+                        [die.offset for die in parsed_cu.iter_DIEs(
+                            tags=tags, prune=prune)],
+                        [offset for offset, _ in expected])
+
+    def test_skip_children(self):
+        # No DW_AT_sibling here, the subtrees of the children are skipped
+        # without creating their DIEs
+        skipped = self._dwarfinfo('lambda.elf')
+        parsed = self._dwarfinfo('lambda.elf')
+        for cu, parsed_cu in zip(skipped.iter_CUs(), parsed.iter_CUs()):
+            top = cu.get_top_DIE()
+            children = list(top.iter_children())
+            self.assertEqual(len(cu._dies), len(children) + 2)
+            self.assertIs(cu._dies[top._terminator.offset], top._terminator)
+            self.assertTrue(any(child.has_children for child in children))
+
+            parsed_cu.parse_all()
+            self.assertEqual(
+                [child.offset for child in children],
+                [die.offset for die, depth in parsed_cu.iter_DIEs(
+                    with_depth=True) if depth == 1 and not die.is_null()])
+            self.assertEqual(list(top.iter_children()), children)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+import os
+from collections import OrderedDict
+
+from elftools.elf.elffile import ELFFile
+from elftools.dwarf.die import AttributeValue, _UNTRANSLATED
+
+
+class TestDIEAttributes(unittest.TestCase):
+    def _iter_DIEs(self, filename, lazy=False):
+        with open(os.path.join('test', 'testfiles_for_unittests', filename),
+                  'rb') as f:
+            dwarfinfo = ELFFile(f).get_dwarf_info(lazy=lazy)
+            for cu in dwarfinfo.iter_CUs():
+                for die in cu.iter_DIEs():
+                    yield die
+
+    def test_view(self):
+        for die in self._iter_DIEs('dwarfv5_basic.elf'):
+            self.assertFalse(hasattr(die, '__dict__'))
+            attributes = die.attributes
+            if die.is_null():
+                self.assertEqual(len(attributes), 0)
+                self.assertEqual(dict(attributes), {})
+                continue
+
+            decl = die.cu.get_abbrev_table().get_abbrev(die.abbrev_code)
+            self.assertEqual(list(attributes), list(decl.attr_names))
+            self.assertEqual(len(attributes), len(decl.attr_names))
+            for name, attr in attributes.items():
+                self.assertIsInstance(attr, AttributeValue)
+                self.assertEqual(attr.name, name)
+                self.assertIn(name, attributes)
+                self.assertEqual(attributes.get(name), attr)
+            self.assertNotIn('DW_AT_no_such_attribute', attributes)
+            self.assertIsNone(attributes.get('DW_AT_no_such_attribute'))
+            with self.assertRaises(KeyError):
+                attributes['DW_AT_no_such_attribute']
+            self.assertEqual(attributes, OrderedDict(attributes.items()))
+            self.assertEqual(attributes.copy(), attributes)
+
+    def test_lazy_decoding(self):
+        for die in self._iter_DIEs('dwarfv5_basic.elf', lazy=True):
+            if die.is_null() or die.tag != 'DW_TAG_compile_unit':
+                continue
+            self.assertIsNone(die._values)
+            self.assertEqual(die.attributes['DW_AT_name'].value, b'hello.c')
+            self.assertIn(_UNTRANSLATED, die._values)
+            for name in die.attributes:
+                self.assertIsNotNone(die.attributes[name].value)
+            self.assertNotIn(_UNTRANSLATED, die._values)
+
+        # Without lazy, the values are decoded and translated on creation
+        for die in self._iter_DIEs('dwarfv5_basic.elf'):
+            if not die.is_null():
+                self.assertNotIn(_UNTRANSLATED, die._values)
+
+    def test_modify(self):
+        die = next(self._iter_DIEs('dwarfv5_basic.elf'))
+        attributes = die.attributes
+        names = list(attributes)
+        name = names[0]
+        attr = attributes[name]._replace(value='changed')
+        attributes[name] = attr
+        self.assertIsInstance(die.attributes, OrderedDict)
+        self.assertEqual(die.attributes[name].value, 'changed')
+        self.assertEqual(attributes[name].value, 'changed')
+        self.assertEqual(list(die.attributes), names)
+
+        del die.attributes[name]
+        self.assertNotIn(name, attributes)
+
+        die.attributes = OrderedDict()
+        self.assertEqual(len(die.attributes), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,4 +1,6 @@
+import io
 import os
+import struct
 import unittest
 
 from elftools.elf.elffile import ELFFile
@@ -32,5 +34,35 @@ class TestRangeLists(unittest.TestCase):
             self.assertIsNotNone(aranges.cu_offset_at_addr(address_a))
             self.assertIsNotNone(aranges.cu_offset_at_addr(address_b))
 
+    def test_cu_for_address(self):
+        for name in ('aranges_absent.elf', 'aranges_partial.elf',
+                     'aranges_complete.elf'):
+            with open(os.path.join('test', 'testfiles_for_unittests', name), 'rb') as f:
+                dwarfinfo = ELFFile(f).get_dwarf_info()
+                cu_a = dwarfinfo.cu_for_address(address_a)
+                cu_b = dwarfinfo.cu_for_address(address_b)
+                self.assertEqual(cu_a.cu_offset, 0)
+                self.assertEqual(cu_b.cu_offset, 90)
+                self.assertIs(cu_a, dwarfinfo.get_CU_at(0))
+                self.assertIs(cu_b, dwarfinfo.get_CU_at(90))
+                self.assertIs(dwarfinfo.cu_for_address(address_a), cu_a)
+                self.assertIsNone(dwarfinfo.cu_for_address(0x1000))
+
+    def test_cu_for_address_listed_cu(self):
+        # The first CU is listed in aranges, but for its first byte only:
+        # address_a is found by the ranges of its top DIE
+        with open(os.path.join('test', 'testfiles_for_unittests', 'aranges_complete.elf'), 'rb') as f:
+            dwarfinfo = ELFFile(f).get_dwarf_info()
+            section = dwarfinfo.debug_aranges_sec
+            data = bytearray(section.stream.getvalue())
+            data[24:32] = struct.pack('<Q', 1)
+            dwarfinfo.debug_aranges_sec = section._replace(
+                stream=io.BytesIO(bytes(data)))
+            self.assertIsNone(
+                dwarfinfo.get_aranges().cu_offset_at_addr(address_a))
+            self.assertEqual(dwarfinfo.cu_for_address(address_a).cu_offset, 0)
+            self.assertEqual(dwarfinfo.cu_for_address(address_b).cu_offset, 90)
+
+
 if __name__ == '__main__':
     unittest.main()
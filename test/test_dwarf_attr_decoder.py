@@ -0,0 +1,73 @@
+import unittest
+import os
+from unittest import mock
+
+from elftools.elf.elffile import ELFFile
+from elftools.common.bufferreader import decode_uleb128
+from elftools.dwarf.abbrevtable import AbbrevDecl
+
+
+class TestAttrDecoder(unittest.TestCase):
+    """ DIEs decoded by the compiled per-abbreviation decoders must be
+        identical to those parsed from the stream one attribute at a time.
+    """
+    def _read_DIEs(self, filename):
+        with open(os.path.join('test', 'testfiles_for_unittests', filename),
+                  'rb') as f:
+            dies = []
+            decoded = 0
+            for cu in ELFFile(f).get_dwarf_info().iter_CUs():
+                for die in cu.iter_DIEs():
+                    dies.append((die.offset, die.size, die.tag,
+                                 die.abbrev_code, list(die.attributes.items())))
+                    if not die.is_null():
+                        decl = cu.get_abbrev_table().get_abbrev(
+                            die.abbrev_code)
+                        if decl.get_decoder(cu.structs) is not None:
+                            decoded += 1
+            return dies, decoded
+
+    def _check_file(self, filename):
+        dies, decoded = self._read_DIEs(filename)
+        with mock.patch.object(AbbrevDecl, 'get_decoder', return_value=None):
+            parsed, _ = self._read_DIEs(filename)
+        self.assertEqual(dies, parsed)
+        return decoded
+
+    def test_decoded_like_parsed(self):
+        for filename in ('dwarf_v5_forms.debug', 'dwarfv5_basic.elf',
+                         'dwarf_lineprog_data16.elf', 'lambda.elf',
+                         'exe_solaris32_cc.sparc.elf', 'debug_info.elf'):
+            self.assertGreater(self._check_file(filename), 0)
+
+    def test_skip(self):
+        with open(os.path.join('test', 'testfiles_for_unittests',
+                               'dwarfv5_basic.elf'), 'rb') as f:
+            dwarfinfo = ELFFile(f).get_dwarf_info()
+            fixed_size = 0
+            for cu in dwarfinfo.iter_CUs():
+                data = dwarfinfo.get_section_data('debug_info_sec')
+                for die in cu.iter_DIEs():
+                    if die.is_null():
+                        continue
+                    decl = cu.get_abbrev_table().get_abbrev(die.abbrev_code)
+                    decoder = decl.get_decoder(cu.structs)
+                    _, start = decode_uleb128(data, die.offset)
+                    end = die.offset + die.size
+                    self.assertEqual(decoder.skip(data, start), end)
+                    size = decl.get_fixed_size(cu.structs)
+                    if size is not None:
+                        self.assertEqual(end - start, size)
+                        fixed_size += 1
+                    self.assertRaises(IndexError, decoder.skip,
+                                      data[:end - 1], start)
+            self.assertGreater(fixed_size, 0)
+
+    def test_indirect_forms(self):
+        # DW_FORM_indirect can't be compiled, these DIEs are parsed from the
+        # stream
+        self._check_file('arm_with_form_indirect.elf')
+
+
+if __name__ == '__main__':
+    unittest.main()
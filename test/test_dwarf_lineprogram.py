@@ -1,17 +1,22 @@
 
+import os
 import unittest
 from io import BytesIO
 
-from elftools.dwarf.lineprogram import LineProgram, LineState, LineProgramEntry
+from elftools.common.exceptions import ELFParseError
+from elftools.elf.elffile import ELFFile
+from elftools.dwarf.lineprogram import (
+    LineProgram, LineState, LineProgramEntry, LineTableRow)
 from elftools.dwarf.structs import DWARFStructs
 from elftools.dwarf.constants import *
 
 
 class TestLineProgram(unittest.TestCase):
-    def _make_program_in_stream(self, stream):
+    def _make_program_in_stream(self, stream, address_size=4):
         """ Create a LineProgram from the given program encoded in a stream
         """
-        ds = DWARFStructs(little_endian=True, dwarf_format=32, address_size=4)
+        ds = DWARFStructs(little_endian=True, dwarf_format=32,
+                          address_size=address_size)
         header = ds.Dwarf_lineprog_header.parse(
             b'\x04\x10\x00\x00' +    # initial length
             b'\x03\x00' +            # version
@@ -116,6 +121,83 @@ class TestLineProgram(unittest.TestCase):
         self.assertLineState(linetable[0].state, discriminator=0x05)
         self.assertLineState(linetable[1].state, discriminator=0x00, end_sequence=True)
 
+    def test_sequences(self):
+        # Sample in figure 59 of DWARFv3, twice
+        s = BytesIO()
+        s.write(
+            (b'\x02\xb9\x04' +
+             b'\x0b' +
+             b'\x38' +
+             b'\x82' +
+             b'\x73' +
+             b'\x02\x02' +
+             b'\x00\x01\x01') * 2)
+
+        lp = self._make_program_in_stream(s)
+        sequences = lp.get_sequences()
+        self.assertEqual(len(sequences), 2)
+        seq = sequences[0]
+        self.assertEqual(list(seq.address), [0x239, 0x23c, 0x244, 0x24b])
+        self.assertEqual(list(seq.line), [3, 5, 6, 7])
+        self.assertEqual(seq.end_address, 0x24d)
+        self.assertEqual(seq.get_row(1), LineTableRow(
+            address=0x23c, file=1, line=5, column=0, is_stmt=True,
+            basic_block=False, prologue_end=False, epilogue_begin=False))
+
+        self.assertEqual(lp.lookup(0x23b).line, 3)
+        self.assertEqual(lp.lookup(0x24c).line, 7)
+        self.assertIsNone(lp.lookup(0x238))
+        self.assertIsNone(lp.lookup(0x24d))
+
+    def test_sequences_truncated(self):
+        # DW_LNS_advance_pc with an unterminated operand
+        s = BytesIO()
+        s.write(b'\x0b\x02\xb9')
+        lp = self._make_program_in_stream(s)
+        self.assertRaises(ELFParseError, lp.get_sequences)
+
+    def test_sequences_tombstone(self):
+        # A sequence of discarded code at address -1 is dropped, the next one
+        # is kept
+        s = BytesIO()
+        s.write(
+            b'\x00\x09\x02' + b'\xff' * 8 +   # DW_LNE_set_address -1
+            b'\x38\x82' +                     # special opcodes
+            b'\x00\x01\x01' +                 # DW_LNE_end_sequence
+            b'\x00\x09\x02' + b'\x00\x10' + b'\x00' * 6 +
+            b'\x38\x82' +
+            b'\x00\x01\x01')
+        lp = self._make_program_in_stream(s, address_size=8)
+        self.assertEqual(len(lp.get_entries()), 8)
+        sequences = lp.get_sequences()
+        self.assertEqual(len(sequences), 1)
+        self.assertEqual(list(sequences[0].address), [0x1003, 0x100b])
+        self.assertEqual(lp.lookup(0x1003).line, 3)
+        self.assertIsNone(lp.lookup(0xffffffffffffffff))
+
+    def test_sequences_like_entries(self):
+        with open(os.path.join('test', 'testfiles_for_unittests',
+                               'lambda.elf'), 'rb') as f:
+            dwarfinfo = ELFFile(f).get_dwarf_info()
+            for cu in dwarfinfo.iter_CUs():
+                lp = dwarfinfo.line_program_for_CU(cu)
+                rows = []
+                for entry in lp.get_entries():
+                    state = entry.state
+                    if state is None or state.end_sequence:
+                        continue
+                    rows.append(LineTableRow(
+                        state.address, state.file, state.line, state.column,
+                        bool(state.is_stmt), state.basic_block,
+                        state.prologue_end, state.epilogue_begin))
+                    self.assertEqual(lp.lookup(state.address).address,
+                                     state.address)
+                self.assertGreater(len(rows), 0)
+                self.assertEqual(
+                    sorted(seq.get_row(i) for seq in lp.get_sequences()
+                           for i in range(len(seq))),
+                    sorted(rows))
+
 
 if __name__ == '__main__':
     unittest.main()
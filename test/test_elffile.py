@@ -56,5 +56,68 @@ class TestSectionFilter(unittest.TestCase):
             self.assertEqual(len(list(elf.iter_sections('SHT_ARM_EXIDX'))), 1)
             self.assertTrue(elf.has_ehabi_info())
 
+class TestSectionHeaderTable(unittest.TestCase):
+
+    def test_sections_are_cached(self):
+        with open(os.path.join('test', 'testfiles_for_unittests',
+                               'arm_exidx_test.so'), 'rb') as f:
+            elf = ELFFile(f)
+            sections = list(elf.iter_sections())
+            for i, section in enumerate(sections):
+                self.assertIs(elf.get_section(i), section)
+            self.assertIs(elf.get_section_by_name('.text'),
+                          elf.get_section(elf.get_section_index('.text')))
+
+    def test_lookups_build_no_other_sections(self):
+        with open(os.path.join('test', 'testfiles_for_unittests',
+                               'arm_exidx_test.so'), 'rb') as f:
+            elf = ELFFile(f)
+            self.assertEqual(elf.get_section_index('.dynsym'), 3)
+            self.assertEqual(len(list(elf.iter_sections('SHT_REL'))), 2)
+            self.assertEqual(elf.get_section_by_name('.text').name, '.text')
+            self.assertEqual(
+                sorted(elf._section_cache),
+                sorted([elf.get_section_index('.text')] +
+                       [elf.get_section_index(name)
+                        for name in ('.rel.dyn', '.rel.plt')]))
+
+    def test_bulk_headers_match_parsed_headers(self):
+        from elftools.common.utils import struct_parse
+        testdir = os.path.join('test', 'testfiles_for_unittests')
+        for filename in ('arm_exidx_test.so', 'simple_gcc.elf.arm',
+                         'sample_exe64.elf', 'exe_solaris32_cc.sparc.elf'):
+            with open(os.path.join(testdir, filename), 'rb') as f:
+                elf = ELFFile(f)
+                for i in range(elf.num_sections()):
+                    expected = struct_parse(
+                        elf.structs.Elf_Shdr, elf.stream,
+                        stream_pos=elf._section_offset(i))
+                    self.assertEqual(elf._get_section_header(i), expected)
+
+
+class TestDWARFInfoCache(unittest.TestCase):
+    def test_get_dwarf_info_is_cached(self):
+        with open(os.path.join('test', 'testfiles_for_unittests',
+                               'dwarf_gnuops1.o'), 'rb') as f:
+            elf = ELFFile(f)
+            dwarfinfo = elf.get_dwarf_info()
+            self.assertIs(elf.get_dwarf_info(), dwarfinfo)
+            self.assertIs(elf.get_dwarf_info(relocate_dwarf_sections=True,
+                                              follow_links=True),
+                          dwarfinfo)
+
+            unrelocated = elf.get_dwarf_info(relocate_dwarf_sections=False)
+            self.assertIsNot(unrelocated, dwarfinfo)
+            self.assertIs(elf.get_dwarf_info(relocate_dwarf_sections=False),
+                          unrelocated)
+
+            cu = next(dwarfinfo.iter_CUs())
+            self.assertIs(next(elf.get_dwarf_info().iter_CUs()), cu)
+
+            elf.clear_dwarf_info_cache()
+            fresh = elf.get_dwarf_info()
+            self.assertIsNot(fresh, dwarfinfo)
+            self.assertEqual(next(fresh.iter_CUs()).cu_offset, cu.cu_offset)
+
 if __name__ == '__main__':
     unittest.main()
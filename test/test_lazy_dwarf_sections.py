@@ -0,0 +1,55 @@
+import os
+import unittest
+
+from elftools.elf.elffile import ELFFile
+
+
+class TestLazyDWARFSections(unittest.TestCase):
+    def _open(self, name):
+        return open(os.path.join('test', 'testfiles_for_unittests', name),
+                    'rb')
+
+    def _section_contents(self, dwarfinfo):
+        contents = {}
+        for name, section in vars(dwarfinfo).items():
+            if name.endswith('_sec') and section is not None:
+                section.stream.seek(0)
+                contents[name] = (section.size, section.stream.read())
+        return contents
+
+    def test_sections_load_on_access(self):
+        with self._open('dwarf_gnuops1.o') as f:
+            dwarfinfo = ELFFile(f).get_dwarf_info(lazy=True)
+            self.assertFalse(dwarfinfo.debug_info_sec.stream.loaded)
+            self.assertFalse(dwarfinfo.debug_loc_sec.stream.loaded)
+
+            for cu in dwarfinfo.iter_CUs():
+                dwarfinfo.line_program_for_CU(cu)
+            self.assertTrue(dwarfinfo.debug_info_sec.stream.loaded)
+            self.assertTrue(dwarfinfo.debug_line_sec.stream.loaded)
+            self.assertFalse(dwarfinfo.debug_loc_sec.stream.loaded)
+
+    def test_same_contents_as_eager(self):
+        for name in ('dwarf_gnuops1.o', 'compressed_64.o', 'sample_exe64.elf'):
+            with self._open(name) as f:
+                elf = ELFFile(f)
+                for relocate in (True, False):
+                    lazy = elf.get_dwarf_info(relocate_dwarf_sections=relocate,
+                                              lazy=True)
+                    eager = elf.get_dwarf_info(relocate_dwarf_sections=relocate)
+                    self.assertEqual(self._section_contents(lazy),
+                                     self._section_contents(eager))
+
+    def test_eager_by_default(self):
+        # The sections are read on creation, so the DWARFInfo can be used
+        # after the file is closed
+        with self._open('dwarf_gnuops1.o') as f:
+            dwarfinfo = ELFFile(f).get_dwarf_info()
+        names = [die.attributes['DW_AT_name'].value
+                 for cu in dwarfinfo.iter_CUs()
+                 for die in cu.iter_DIEs() if 'DW_AT_name' in die.attributes]
+        self.assertGreater(len(names), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import io
+import unittest
+
+from elftools.common.bufferreader import decode_uleb128, decode_sleb128
+from elftools.common.construct_utils import ULEB128, SLEB128
+from elftools.common.exceptions import ELFParseError
+from elftools.common.utils import struct_parse
+
+
+def encode_uleb128(value):
+    data = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            data.append(byte | 0x80)
+        else:
+            data.append(byte)
+            return bytes(data)
+
+
+def encode_sleb128(value):
+    data = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if (value == 0 and not byte & 0x40) or (value == -1 and byte & 0x40):
+            data.append(byte)
+            return bytes(data)
+        data.append(byte | 0x80)
+
+
+class TestLEB128(unittest.TestCase):
+    values = [0, 1, 63, 64, 127, 128, 129, 8191, 8192, 16383, 16384,
+              2**32 - 1, 2**63, 2**64 - 1, 2**100 + 12345]
+
+    def test_decode(self):
+        for value in self.values:
+            encoded = encode_uleb128(value)
+            for data in (b'\xff' + encoded + b'\x00',
+                         memoryview(b'\xff' + encoded)):
+                self.assertEqual(decode_uleb128(data, 1),
+                                 (value, 1 + len(encoded)))
+            for value in (value, -value, -value - 1):
+                encoded = encode_sleb128(value)
+                self.assertEqual(decode_sleb128(b'\xff' + encoded, 1),
+                                 (value, 1 + len(encoded)))
+
+    def test_decode_truncated(self):
+        for decode in (decode_uleb128, decode_sleb128):
+            self.assertRaises(IndexError, decode, b'', 0)
+            self.assertRaises(IndexError, decode, b'\x80\x80', 0)
+
+    def test_construct(self):
+        for value in self.values:
+            stream = io.BytesIO(encode_uleb128(value) + b'\x01')
+            self.assertEqual(struct_parse(ULEB128('v'), stream), value)
+            self.assertEqual(stream.read(), b'\x01')
+            stream = io.BytesIO(encode_sleb128(-value) + b'\x01')
+            self.assertEqual(struct_parse(SLEB128('v'), stream), -value)
+            self.assertEqual(stream.read(), b'\x01')
+
+        for leb128 in (ULEB128('v'), SLEB128('v')):
+            for data in (b'', b'\x80', b'\xff\xff'):
+                self.assertRaises(ELFParseError,
+                                  struct_parse, leb128, io.BytesIO(data))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import os
+import unittest
+
+from elftools.elf.elffile import ELFFile
+
+
+class TestLineIndex(unittest.TestCase):
+    def _dwarfinfo(self, name):
+        f = open(os.path.join('test', 'testfiles_for_unittests', name), 'rb')
+        self.addCleanup(f.close)
+        return ELFFile(f).get_dwarf_info()
+
+    def test_paths(self):
+        index = self._dwarfinfo('dwarfv5_basic.elf').build_line_index()
+        self.assertEqual(index.get_paths(), ['/junk/hello.c'])
+        for path in ('/junk/hello.c', 'junk/hello.c', b'hello.c',
+                     '/junk/./hello.c'):
+            self.assertEqual(index.match_paths(path), ['/junk/hello.c'])
+        for path in ('unk/hello.c', 'hello', '/hello.c'):
+            self.assertEqual(index.match_paths(path), [])
+
+        # Include directories are joined to the file names, and normalized
+        index = self._dwarfinfo('lambda.elf').build_line_index()
+        self.assertIn('/tmp/lambda.cpp', index.get_paths())
+        self.assertEqual(index.get_paths('/usr/include/c++/7.4.0/bits/'), [
+            '/usr/include/c++/7.4.0/bits/exception_ptr.h',
+            '/usr/include/c++/7.4.0/bits/ios_base.h',
+            '/usr/include/c++/7.4.0/bits/std_abs.h'])
+        self.assertEqual(index.match_paths('stdlib.h'), [
+            '/usr/include/c++/7.4.0/stdlib.h', '/usr/include/stdlib.h'])
+
+    def test_lookup_like_entries(self):
+        dwarfinfo = self._dwarfinfo('lambda.elf')
+        index = dwarfinfo.build_line_index()
+        self.assertIs(dwarfinfo.build_line_index(), index)
+        # The rows are only decoded for lookups of the files of the CU
+        self.assertEqual(index.lookup_line('no_such_file.c', 1), [])
+        self.assertFalse(index._units[0][3])
+        self.assertEqual(index.lookup_line('lambda.cpp', 100000), [])
+        self.assertTrue(index._units[0][3])
+
+        # The ranges covered by the rows of each line of lambda.cpp (file #35)
+        expected = {}
+        lineprog = dwarfinfo.line_program_for_CU(next(dwarfinfo.iter_CUs()))
+        previous = None
+        for entry in lineprog.get_entries():
+            state = entry.state
+            if state is None:
+                continue
+            if previous is not None and previous.file == 35 and \
+                    previous.address < state.address:
+                expected.setdefault(previous.line, []).append(
+                    (previous.address, state.address))
+            previous = None if state.end_sequence else state
+        self.assertGreater(len(expected), 5)
+
+        for line, ranges in expected.items():
+            merged = []
+            for begin, end in sorted(ranges):
+                if merged and begin <= merged[-1][1]:
+                    merged[-1] = (merged[-1][0], max(end, merged[-1][1]))
+                else:
+                    merged.append((begin, end))
+            self.assertEqual(index.lookup_line('/tmp/lambda.cpp', line),
+                             merged)
+            self.assertEqual(index.lookup_line('lambda.cpp', line), merged)
+
+
+if __name__ == '__main__':
+    unittest.main()
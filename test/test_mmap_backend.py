@@ -0,0 +1,76 @@
+import os
+import unittest
+
+from elftools.elf.elffile import ELFFile
+from elftools.common.streams import BufferStream, MappedFileStream
+
+
+class TestMmapBackend(unittest.TestCase):
+    def _path(self, name):
+        return os.path.join('test', 'testfiles_for_unittests', name)
+
+    def test_section_and_segment_data(self):
+        path = self._path('sample_exe64.elf')
+        with open(path, 'rb') as f:
+            elf = ELFFile(f)
+            expected_sections = [(s.name, s.data()) for s in elf.iter_sections()]
+            expected_segments = [seg.data() for seg in elf.iter_segments()]
+
+        with ELFFile.load_from_path(path, mmap=True) as elf:
+            self.assertIsInstance(elf.stream, MappedFileStream)
+            sections = [(s.name, s.data()) for s in elf.iter_sections()]
+            self.assertEqual(len(sections), len(expected_sections))
+            for (name, data), (exp_name, exp_data) in zip(sections,
+                                                          expected_sections):
+                self.assertEqual(name, exp_name)
+                if elf.get_section_by_name(name)['sh_type'] != 'SHT_NOBITS':
+                    self.assertIsInstance(data, memoryview)
+                self.assertEqual(bytes(data), exp_data)
+
+            segments = [seg.data() for seg in elf.iter_segments()]
+            self.assertEqual([bytes(d) for d in segments], expected_segments)
+            for data in segments:
+                self.assertIsInstance(data, memoryview)
+
+    def test_symbols(self):
+        path = self._path('simple_gcc.elf.arm')
+        with open(path, 'rb') as f:
+            symtab = ELFFile(f).get_section_by_name('.symtab')
+            expected = [(s.name, s['st_value']) for s in symtab.iter_symbols()]
+
+        with ELFFile.load_from_path(path, mmap=True) as elf:
+            symtab = elf.get_section_by_name('.symtab')
+            self.assertEqual(
+                [(s.name, s['st_value']) for s in symtab.iter_symbols()],
+                expected)
+
+    def test_compressed_section(self):
+        path = self._path('compressed_64.o')
+        with open(path, 'rb') as f:
+            expected = ELFFile(f).get_section_by_name('.debug_info').data()
+
+        with ELFFile.load_from_path(path, mmap=True) as elf:
+            section = elf.get_section_by_name('.debug_info')
+            self.assertTrue(section.compressed)
+            self.assertEqual(section.data(), expected)
+
+    def test_buffer_stream(self):
+        stream = BufferStream(b'\x7fELF\x02\x01')
+        self.assertEqual(stream.read(4), b'\x7fELF')
+        self.assertEqual(stream.tell(), 4)
+        self.assertEqual(stream.read(10), b'\x02\x01')
+        self.assertEqual(stream.read(1), b'')
+        self.assertEqual(stream.seek(-2, os.SEEK_END), 4)
+        self.assertEqual(bytes(stream.view(1, 3)), b'ELF')
+
+    def test_data_outlives_close(self):
+        path = self._path('sample_exe64.elf')
+        elf = ELFFile.load_from_path(path, mmap=True)
+        data = elf.get_section_by_name('.text').data()
+        expected = bytes(data)
+        elf.close()
+        self.assertEqual(bytes(data), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import os
+import unittest
+
+from elftools.elf.elffile import ELFFile
+from elftools.elf.enums import (
+    ENUM_SH_TYPE_BASE, ENUM_ST_INFO_TYPE, ENUM_P_TYPE_BASE, ENUM_D_TAG)
+
+
+class TestRawEnums(unittest.TestCase):
+    def _open(self, name, raw_enums):
+        return ELFFile(open(os.path.join('test', 'testfiles_for_unittests',
+                                         name), 'rb'),
+                       raw_enums=raw_enums)
+
+    def test_same_records_as_integers(self):
+        named = self._open('sample_exe64.elf', raw_enums=False)
+        raw = self._open('sample_exe64.elf', raw_enums=True)
+        try:
+            for sec, raw_sec in zip(named.iter_sections(),
+                                    raw.iter_sections()):
+                self.assertIsInstance(raw_sec['sh_type'], int)
+                self.assertEqual(
+                    raw.structs.enum_name('sh_type', raw_sec['sh_type']),
+                    sec['sh_type'])
+                self.assertIs(type(raw_sec), type(sec))
+
+            symbols = list(named.get_section_by_name('.symtab').iter_symbols())
+            raw_symbols = list(
+                raw.get_section_by_name('.symtab').iter_symbols())
+            self.assertEqual(len(symbols), len(raw_symbols))
+            for sym, raw_sym in zip(symbols, raw_symbols):
+                self.assertEqual(sym.name, raw_sym.name)
+                self.assertEqual(sym['st_value'], raw_sym['st_value'])
+                self.assertEqual(
+                    raw.structs.enum_name('type', raw_sym['st_info']['type']),
+                    sym['st_info']['type'])
+            self.assertEqual(
+                sum(1 for sym in raw_symbols
+                    if sym['st_info']['type'] == ENUM_ST_INFO_TYPE['STT_FUNC']),
+                sum(1 for sym in symbols
+                    if sym['st_info']['type'] == 'STT_FUNC'))
+        finally:
+            named.stream.close()
+            raw.stream.close()
+
+    def test_type_filters(self):
+        elf = self._open('sample_exe64.elf', raw_enums=True)
+        try:
+            by_name = list(elf.iter_sections('SHT_SYMTAB'))
+            self.assertEqual(len(by_name), 1)
+            self.assertEqual(by_name[0].name, '.symtab')
+            self.assertEqual(
+                [s.name for s in elf.iter_sections(
+                    ENUM_SH_TYPE_BASE['SHT_SYMTAB'])],
+                ['.symtab'])
+            self.assertEqual(
+                len(list(elf.iter_segments('PT_LOAD'))),
+                len(list(elf.iter_segments(ENUM_P_TYPE_BASE['PT_LOAD']))))
+            self.assertTrue(list(elf.iter_segments('PT_LOAD')))
+        finally:
+            elf.stream.close()
+
+    def test_dynamic_tags(self):
+        elf = self._open('aarch64_super_stripped.elf', raw_enums=True)
+        try:
+            dynamic = next(elf.iter_segments('PT_DYNAMIC'))
+            needed = [tag.needed for tag in dynamic.iter_tags('DT_NEEDED')]
+            self.assertEqual(
+                needed,
+                [tag.needed for tag in dynamic.iter_tags(
+                    ENUM_D_TAG['DT_NEEDED'])])
+            self.assertIn('libc.so.6', needed)
+            self.assertEqual(dynamic.num_tags(),
+                             len(list(dynamic.iter_tags())))
+        finally:
+            elf.stream.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import os
+import unittest
+
+from elftools.elf.elffile import ELFFile
+
+
+class TestRecordCodecs(unittest.TestCase):
+    """ The struct.Struct codecs must decode records exactly like the
+        construct structs they stand in for.
+    """
+    def _check_codecs(self, filename):
+        with open(os.path.join('test', 'testfiles_for_unittests', filename),
+                  'rb') as f:
+            elf = ELFFile(f)
+            f.seek(0)
+            data = f.read()
+        for name in ('Shdr', 'Phdr', 'Sym', 'Rel', 'Rela', 'Dyn'):
+            struct = getattr(elf.structs, 'Elf_' + name)
+            codec = getattr(elf.structs, 'Elf_%s_codec' % name)
+            size = struct.sizeof()
+            self.assertEqual(codec.sizeof(), size)
+            for offset in range(0, min(len(data) - size, 0x4000), 7):
+                expected = struct.parse(data[offset:offset + size])
+                entry = codec.parse(data, offset)
+                self.assertEqual(entry, expected)
+                self.assertEqual(list(entry.keys()), list(expected.keys()))
+
+    def test_elf32_little_endian(self):
+        self._check_codecs('simple_gcc.elf.arm')
+
+    def test_elf64_little_endian(self):
+        self._check_codecs('sample_exe64.elf')
+
+    def test_elf32_big_endian(self):
+        self._check_codecs('exe_solaris32_cc.sparc.elf')
+
+    def test_elf64_big_endian(self):
+        self._check_codecs('aarch64_be_gnu_hash.so.elf')
+
+    def test_iter_symbols_and_relocations(self):
+        with open(os.path.join('test', 'testfiles_for_unittests',
+                               'arm_exidx_test.so'), 'rb') as f:
+            elf = ELFFile(f)
+            for section in elf.iter_sections():
+                if section['sh_type'] in ('SHT_SYMTAB', 'SHT_DYNSYM'):
+                    symbols = list(section.iter_symbols())
+                    self.assertEqual(len(symbols), section.num_symbols())
+                    for i, symbol in enumerate(symbols):
+                        expected = section.get_symbol(i)
+                        self.assertEqual(symbol.name, expected.name)
+                        self.assertEqual(symbol.entry, expected.entry)
+                elif section['sh_type'] in ('SHT_REL', 'SHT_RELA'):
+                    relocations = list(section.iter_relocations())
+                    self.assertEqual(len(relocations),
+                                     section.num_relocations())
+                    for i, reloc in enumerate(relocations):
+                        self.assertEqual(reloc.entry,
+                                         section.get_relocation(i).entry)
+
+
+if __name__ == '__main__':
+    unittest.main()
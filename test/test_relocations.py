@@ -1,10 +1,13 @@
 import os
 from io import BytesIO
+import struct
 import sys
 import unittest
 
 from elftools.elf.elffile import ELFFile
 from elftools.elf.dynamic import DynamicSegment, DynamicSection
+from elftools.elf.enums import ENUM_RELOC_TYPE_x64
+from elftools.elf.relocation import RelocationHandler
 
 
 class TestRelocation(unittest.TestCase):
@@ -44,5 +47,34 @@ class TestRelocation(unittest.TestCase):
                     relos = sect.get_relocation_tables()
                     self.assertEqual(set(relos), {'JMPREL', 'REL'})
 
+    def test_apply_buffer_relocations(self):
+        """Verify that relocations are applied in place to a buffer, the same
+        way as to a stream"""
+
+        test_dir = os.path.join('test', 'testfiles_for_unittests')
+        with open(os.path.join(test_dir, 'dwarf_gnuops1.o'), 'rb') as f:
+            elff = ELFFile(f)
+            handler = RelocationHandler(elff)
+            section = elff.get_section_by_name('.debug_info')
+            reloc_section = handler.find_relocations_for_section(section)
+            self.assertEqual(reloc_section['sh_type'], 'SHT_RELA')
+
+            data = bytearray(section.data())
+            handler.apply_buffer_relocations(data, reloc_section)
+            stream = BytesIO(section.data())
+            handler.apply_section_relocations(stream, reloc_section)
+            self.assertEqual(bytes(data), stream.getvalue())
+            self.assertNotEqual(bytes(data), section.data())
+
+            symtab = elff.get_section(reloc_section['sh_link'])
+            for reloc in reloc_section.iter_relocations():
+                if reloc['r_info_type'] != ENUM_RELOC_TYPE_x64['R_X86_64_32']:
+                    continue
+                sym_value = symtab.get_symbol(reloc['r_info_sym'])['st_value']
+                offset = reloc['r_offset']
+                self.assertEqual(
+                    struct.unpack_from('<I', data, offset)[0],
+                    (sym_value + reloc['r_addend']) & 0xFFFFFFFF)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,68 @@
+import os
+import unittest
+
+from elftools.common.stringtable import StringTable
+from elftools.common.utils import parse_cstring_from_stream
+from elftools.elf.elffile import ELFFile
+
+
+class TestStringTable(unittest.TestCase):
+    def _check_table(self, data):
+        table = StringTable(data, errors='replace')
+        self.assertEqual(table.get_bytes(0), b'')
+        self.assertEqual(table.get_string(0), '')
+        self.assertEqual(table.get_string(1), 'foo')
+        self.assertEqual(table.get_string(3), 'o')
+        self.assertEqual(table.get_bytes(5), b'b\xffr')
+        self.assertEqual(table.get_string(5), 'b�r')
+        # Unterminated, or past the end of the table
+        self.assertIsNone(table.get_bytes(9))
+        self.assertIsNone(table.get_bytes(100))
+        self.assertEqual(table.get_string(100), '')
+
+    def test_bytes(self):
+        self._check_table(b'\x00foo\x00b\xffr\x00baz')
+
+    def test_memoryview(self):
+        self._check_table(memoryview(bytearray(b'\x00foo\x00b\xffr\x00baz')))
+
+    def test_fallback_and_memo(self):
+        calls = []
+        def fallback(offset):
+            calls.append(offset)
+            return b'outside'
+        table = StringTable(b'a\x00', fallback=fallback)
+        self.assertEqual(table.get_string(0), 'a')
+        self.assertEqual(table.get_string(10), 'outside')
+        self.assertEqual(table.get_string(10), 'outside')
+        self.assertEqual(calls, [10])
+
+        table = StringTable(b'a\x00', fallback=fallback, maxsize=0)
+        self.assertEqual(table.get_string(10), 'outside')
+        self.assertEqual(table.get_string(10), 'outside')
+        self.assertEqual(calls, [10, 10, 10])
+
+        # The memo holds at most maxsize strings
+        table = StringTable(b'a\x00', fallback=fallback, maxsize=2)
+        for offset in range(10, 20):
+            self.assertEqual(table.get_string(offset), 'outside')
+        del calls[:]
+        for offset in range(19, 9, -1):
+            self.assertEqual(table.get_string(offset), 'outside')
+        self.assertEqual(calls, list(range(17, 9, -1)))
+
+    def test_section_strings(self):
+        with open(os.path.join('test', 'testfiles_for_unittests',
+                               'arm_exidx_test.so'), 'rb') as f:
+            elf = ELFFile(f)
+            dynstr = elf.get_section_by_name('.dynstr')
+            for offset in range(0, dynstr['sh_size'], 7):
+                s = parse_cstring_from_stream(elf.stream,
+                                              dynstr['sh_offset'] + offset)
+                self.assertEqual(
+                    dynstr.get_string(offset),
+                    s.decode('utf-8', errors='replace') if s else '')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import os
+import unittest
+
+from elftools.elf.elffile import ELFFile
+from elftools.elf.enums import ENUM_ST_INFO_TYPE, ENUM_ST_SHNDX
+
+
+class TestSymbolColumns(unittest.TestCase):
+    def _check_columns(self, filename):
+        with open(os.path.join('test', 'testfiles_for_unittests', filename),
+                  'rb') as f:
+            elf = ELFFile(f)
+            symtab = elf.get_section_by_name('.symtab')
+            symbols = list(symtab.iter_symbols())
+            columns = symtab.as_columns()
+            self.assertIs(symtab.as_columns(), columns)
+            self.assertEqual(len(columns), len(symbols))
+
+            for i, sym in enumerate(symbols):
+                self.assertEqual(columns.st_value[i], sym['st_value'])
+                self.assertEqual(columns.st_size[i], sym['st_size'])
+                self.assertEqual(columns.st_name[i], sym['st_name'])
+                self.assertEqual(columns.get_name(i), sym.name)
+                self.assertEqual(columns.st_type[i],
+                                 ENUM_ST_INFO_TYPE[sym['st_info']['type']])
+                shndx = sym['st_shndx']
+                self.assertEqual(columns.st_shndx[i],
+                                 ENUM_ST_SHNDX.get(shndx, shndx))
+
+            funcs = [i for i, sym in enumerate(symbols)
+                     if sym['st_info']['type'] == 'STT_FUNC' and
+                        sym['st_info']['bind'] == 'STB_GLOBAL']
+            self.assertTrue(funcs)
+            self.assertEqual(
+                list(columns.select(type='STT_FUNC', bind='STB_GLOBAL')),
+                funcs)
+
+            undefined = [i for i, sym in enumerate(symbols)
+                         if sym['st_shndx'] == 'SHN_UNDEF']
+            self.assertEqual(list(columns.select(shndx='SHN_UNDEF')),
+                             undefined)
+            objects = [i for i, sym in enumerate(symbols)
+                       if sym['st_info']['type'] in ('STT_OBJECT', 'STT_FUNC')]
+            self.assertEqual(
+                list(columns.select(type=('STT_OBJECT', 'STT_FUNC'))),
+                objects)
+            self.assertEqual(
+                columns.get_names(columns.select(type='STT_FUNC')),
+                [sym.name for sym in symbols
+                 if sym['st_info']['type'] == 'STT_FUNC'])
+
+    def test_elf32(self):
+        self._check_columns('simple_gcc.elf.arm')
+
+    def test_elf64(self):
+        self._check_columns('sample_exe64.elf')
+
+    def test_elf32_big_endian(self):
+        self._check_columns('exe_solaris32_cc.sparc.elf')
+
+
+if __name__ == '__main__':
+    unittest.main()
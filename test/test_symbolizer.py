@@ -0,0 +1,73 @@
+import os
+import unittest
+
+from elftools.elf.elffile import ELFFile
+
+
+class TestSymbolizer(unittest.TestCase):
+    def _open(self, name):
+        return open(os.path.join('test', 'testfiles_for_unittests', name),
+                    'rb')
+
+    def _defined_symbols(self, elf):
+        symbols = []
+        for symtab in (list(elf.iter_sections('SHT_SYMTAB')) +
+                       list(elf.iter_sections('SHT_DYNSYM'))):
+            for sym in symtab.iter_symbols():
+                if (sym['st_info']['type'] in ('STT_FUNC', 'STT_OBJECT') and
+                        sym['st_shndx'] != 'SHN_UNDEF'):
+                    symbols.append(sym)
+        return symbols
+
+    def test_lookup(self):
+        with self._open('sample_exe64.elf') as f:
+            elf = ELFFile(f)
+            symbolizer = elf.get_symbolizer()
+            self.assertIs(elf.get_symbolizer(), symbolizer)
+
+            symbols = self._defined_symbols(elf)
+            self.assertEqual(len(symbolizer),
+                             len(set(sym['st_value'] for sym in symbols)))
+            main = [sym for sym in symbols if sym.name == 'main'][0]
+            for addr in (main['st_value'],
+                         main['st_value'] + main['st_size'] - 1):
+                self.assertEqual(symbolizer.lookup(addr).name, 'main')
+            self.assertIsNone(symbolizer.lookup(0))
+            self.assertNotEqual(
+                getattr(symbolizer.lookup(main['st_value'] + main['st_size']),
+                        'name', None),
+                'main')
+
+            for sym in symbols:
+                found = symbolizer.lookup(sym['st_value'])
+                self.assertEqual(found['st_value'], sym['st_value'])
+                self.assertGreaterEqual(found['st_size'], sym['st_size'])
+
+    def test_lookup_many(self):
+        with self._open('arm_exidx_test.so') as f:
+            elf = ELFFile(f)
+            symbolizer = elf.get_symbolizer()
+            addrs = [sym['st_value'] + sym['st_size'] // 2
+                     for sym in self._defined_symbols(elf)] + [0, 0]
+            self.assertEqual(
+                [sym and sym.name for sym in symbolizer.lookup_many(addrs)],
+                [sym and sym.name for sym in map(symbolizer.lookup, addrs)])
+
+            # Thumb function addresses have their low bit set
+            func = [sym for sym in self._defined_symbols(elf)
+                    if sym['st_info']['type'] == 'STT_FUNC' and
+                       sym['st_value'] & 1 and sym['st_size'] > 2][0]
+            self.assertEqual(
+                symbolizer.lookup(func['st_value'] & ~1)['st_value'],
+                func['st_value'])
+
+    def test_no_section_headers(self):
+        with self._open('aarch64_super_stripped.elf') as f:
+            symbolizer = ELFFile(f).get_symbolizer()
+            # Only undefined symbols in the dynamic symbol table
+            self.assertEqual(len(symbolizer), 0)
+            self.assertIsNone(symbolizer.lookup(0x400000))
+
+
+if __name__ == '__main__':
+    unittest.main()